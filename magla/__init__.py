@@ -7,29 +7,52 @@ core of Magla's design. The idea is that with any given MaglaEntity one can trav
 the related entities as they exist in the DB. This is achieved with a Postgres + SQLAlchemy
 combination allowing for an excellent object-oriented interface with powerful SQL queries and
 relationships behind it.
+
+Importing `magla` itself is cheap: the names below, and the `core`, `db` and `utils` submodules,
+are only imported the first time they are accessed. `magla.test` (which needs `MAGLA_TEST_DIR`)
+is only imported when one of the test fixtures is accessed. `magla.profile` (see
+`magla.db.profile`) records the queries issued within a block.
 """
-from .core import (Assignment, Config, Context, Data, Dependency, Directory,
-                   Entity, Facility, FileType, Machine, Project, Root,
-                   Settings2D, Shot, ShotVersion, Timeline, Tool, ToolConfig,
-		   ToolVersion, ToolVersionInstallation, User)
-
-from .test import MaglaTestFixture, MaglaEntityTestFixture
-
-# register all sub-entities here
-Entity.__types__ = {
-	"Assignment": Assignment,
-	"Directory": Directory,
-	"Facility": Facility,
-	"Machine": Machine,
-	"Project": Project,
-	"Context": Context,
-	"Settings2D": Settings2D,
-	"Shot": Shot,
-	"ShotVersion": ShotVersion,
- 	"Timeline": Timeline,
-	"Tool": Tool,
-	"ToolConfig": ToolConfig,
-	"ToolVersion": ToolVersion,
-	"ToolVersionInstallation": ToolVersionInstallation,
-	"User": User
-}
+import importlib
+import sys
+import types
+
+# public names and the submodule each one is imported from on first access
+_EXPORTS = dict(
+    [(name, "core") for name in (
+        "Assignment", "Config", "Context", "Data", "Dependency", "Directory", "Entity",
+        "Facility", "FileType", "Machine", "Project", "Root", "Settings2D", "Shot",
+        "ShotVersion", "Timeline", "Tool", "ToolConfig", "ToolVersion",
+        "ToolVersionInstallation", "User")]
+    + [(name, "test") for name in ("MaglaTestFixture", "MaglaEntityTestFixture")]
+    + [("profile", "db.profile")])
+_SUBMODULES = ("core", "db", "utils", "trace", "memory", "test")
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    """Import the requested name or submodule the first time it is accessed (PEP 562)."""
+    if name in _SUBMODULES:
+        return importlib.import_module(".{0}".format(name), __name__)
+    if name not in _EXPORTS:
+        raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+    module = importlib.import_module(".{0}".format(_EXPORTS[name]), __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | set(_SUBMODULES))
+
+
+if sys.version_info < (3, 7):
+    # module-level `__getattr__` needs python 3.7, give the module a class that forwards to it
+    class _LazyModule(types.ModuleType):
+        def __getattr__(self, name):
+            return __getattr__(name)
+
+        def __dir__(self):
+            return __dir__()
+
+    sys.modules[__name__].__class__ = _LazyModule
@@ -0,0 +1,653 @@
+"""Benchmarks for catching startup and throughput regressions.
+
+Cold-start stages are timed in fresh interpreters, because everything worth measuring there
+(imports, the first connection, the first query) only happens once per process. Each run is
+repeated and summarized, and results are written as `JSON` which a later run can be compared
+against.
+
+    Example:
+        ```
+        python -m magla.bench cold-start --repeat 10 --output cold_start.json
+        python -m magla.bench cold-start --baseline cold_start.json
+        ```
+
+The environment of the current process (`MAGLA_DB_*`, `MAGLA_MACHINE_CONFIG_DIR`, ...) is passed
+on to the fresh interpreters, so they connect to the same backend.
+
+Throughput is measured against synthetic data (see `generate`) written to a dedicated database,
+by default `magla_bench`, so that benchmarks never touch production or test data. `throughput`
+switches to it by itself (see `database`), `generate` writes to whichever database is connected
+unless run within `database` too. Run it once per backend to compare them.
+
+    Example:
+        ```
+        python -m magla.bench throughput --projects 2 --shots 50 --versions 3
+        python -m magla.bench throughput --dialect postgres --db-name magla_bench
+        ```
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+# stages timed by `cold_start`, in the order they run within a fresh interpreter
+COLD_START_STAGES = ("import_magla", "connect", "first_entity", "tool_env")
+
+# operations timed by `throughput`
+THROUGHPUT_STAGES = ("create_shot", "version_up", "timeline_build", "context", "root_all")
+
+# database synthetic data is generated in, by default
+DEFAULT_DB_NAME = "magla_bench"
+
+# executed with `python -c` so that nothing is imported before `import magla` is timed
+_COLD_START_SCRIPT = """
+import json
+import sys
+import time
+
+options = json.loads(sys.argv[1])
+timings = {}
+state = {}
+
+
+def import_magla():
+    import magla
+    state["magla"] = magla
+
+
+def connect():
+    state["magla"].Entity.connect()
+    # the connection and schema verification are deferred until the session is first used
+    state["magla"].Entity._orm.session
+
+
+def first_entity():
+    magla = state["magla"]
+    magla.Entity.type(options["entity_type"])(id=options["entity_id"])
+
+
+def tool_env():
+    magla = state["magla"]
+    magla.ToolConfig(id=options["tool_config_id"]).build_env()
+
+
+for name in options["stages"]:
+    start = time.perf_counter()
+    try:
+        globals()[name]()
+    except Exception as err:
+        timings[name] = {"error": "{0}: {1}".format(type(err).__name__, err)}
+        break
+    timings[name] = time.perf_counter() - start
+sys.stdout.write("\\n" + json.dumps(timings))
+"""
+
+
+class MaglaBenchError(Exception):
+    """An error accured preventing a benchmark to continue."""
+
+
+def summarize(samples):
+    """Summarize given timings.
+
+    Parameters
+    ----------
+    samples : list of float
+        The timings in seconds
+
+    Returns
+    -------
+    dict
+        Dictionary containing `min`, `median`, `mean`, `max` and `runs`
+    """
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.mean(samples),
+        "max": max(samples),
+        "runs": len(samples)
+    }
+
+
+def environment():
+    """Describe the current interpreter and machine, to store alongside results.
+
+    Returns
+    -------
+    dict
+        Dictionary containing `python`, `platform`, `machine` and `time`
+    """
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.node(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+
+
+def cold_start(repeat=5, stages=COLD_START_STAGES, entity_type="User", entity_id=1,
+               tool_config_id=1, python=None):
+    """Time the cold-start stages in `repeat` fresh interpreters.
+
+    Stages:
+    -------
+        - import_magla: `import magla`
+        - connect: the first `MaglaEntity.connect()` and session use
+        - first_entity: loading the first entity, `entity_type` with `entity_id`
+        - tool_env: building the launch environment of `MaglaToolConfig` `tool_config_id`, as
+          done by `MaglaTool.start`
+
+    Parameters
+    ----------
+    repeat : int, optional
+        Number of fresh interpreters to run, by default 5
+    stages : tuple of str, optional
+        The stages to time, a stage only runs if the previous ones succeeded, by default all
+    entity_type : str, optional
+        The entity type loaded by `first_entity`, by default "User"
+    entity_id : int, optional
+        The id of the entity loaded by `first_entity`, by default 1
+    tool_config_id : int, optional
+        The id of the `MaglaToolConfig` used by `tool_env`, by default 1
+    python : str, optional
+        The interpreter to run, by default `sys.executable`
+
+    Returns
+    -------
+    dict
+        Dictionary containing the `environment` and a summary per stage (see `summarize`), or the
+        `error` a stage failed with
+    """
+    options = json.dumps({
+        "stages": list(stages),
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "tool_config_id": tool_config_id
+    })
+    samples = dict((stage, []) for stage in stages)
+    errors = {}
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [python or sys.executable, "-c", _COLD_START_SCRIPT, options],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
+            env=dict(os.environ))
+        if proc.returncode:
+            raise MaglaBenchError(proc.stderr)
+        timings = json.loads(proc.stdout.strip().splitlines()[-1])
+        for stage, timing in timings.items():
+            if isinstance(timing, dict):
+                errors[stage] = timing["error"]
+            else:
+                samples[stage].append(timing)
+    results = {"environment": environment(), "stages": {}}
+    for stage in stages:
+        if samples[stage]:
+            results["stages"][stage] = summarize(samples[stage])
+        elif stage in errors:
+            results["stages"][stage] = {"error": errors[stage]}
+    return results
+
+
+def project_settings(root_dir):
+    """Build the settings of a synthetic project, following `example.py`.
+
+    Parameters
+    ----------
+    root_dir : str
+        The directory to create project trees in
+
+    Returns
+    -------
+    dict
+        The project settings
+    """
+    return {
+        "project_directory": os.path.join(root_dir, "{project.name}"),
+        "project_directory_tree": [
+            {"shots": []},
+            {"audio": []},
+            {"preproduction": [
+                {"mood": []},
+                {"reference": []},
+                {"edit": []}]
+             }],
+        "frame_sequence_re": r"(\w+\W)(\#+)(.+)",
+        "shot_directory": "{shot.project.directory.path}/shots/{shot.name}",
+        "shot_directory_tree": [
+            {"_current": [
+                {"h265": []},
+                {"png": []},
+                {"webm": []}]
+             }],
+        "shot_version_directory": "{shot_version.shot.directory.path}/{shot_version.num}",
+        "shot_version_directory_tree": [
+            {"_in": [
+                {"plate": []},
+                {"subsets": []}
+            ]},
+            {"_out": [
+                {"representations": [
+                    {"exr": []},
+                    {"png": []},
+                    {"mov": []}]
+                 }]
+             }],
+        "shot_version_bookmarks": {
+            "png_representation": "representations/png_sequence/_out/png/"
+                                  "{shot_version.full_name}.####.png"
+        }
+    }
+
+
+@contextlib.contextmanager
+def database(db_name=DEFAULT_DB_NAME, dialect=None, data_dir=None):
+    """Connect `magla` to given database within this context, reconnecting to the previous after.
+
+    The database is created on first use if needed. Cached entity data is dropped on entering and
+    leaving, as it belongs to the other database.
+
+    Parameters
+    ----------
+    db_name : str, optional
+        The database to connect to, by default `DEFAULT_DB_NAME`
+    dialect : str, optional
+        The backend, "sqlite" or "postgres", by default the currently configured one
+    data_dir : str, optional
+        The directory of `sqlite` databases, by default the currently configured one or else the
+        temporary directory
+
+    Yields
+    ------
+    magla.db.orm.MaglaORM
+        The connection to given database
+    """
+    from magla.core.data import MaglaData
+    from magla.core.entity import MaglaEntity
+    from magla.db.orm import MaglaORM
+
+    config = dict(MaglaORM.CONFIG)
+    engine, session_factory = MaglaORM._Engine, MaglaORM._Session
+    # `connect` may have set `_orm` on sub-classes as well as on `MaglaEntity`
+    classes = [MaglaEntity]
+    for cls in classes:
+        classes.extend(cls.__subclasses__())
+    connections = dict((cls, vars(cls)["_orm"]) for cls in classes if "_orm" in vars(cls))
+
+    dialect = dialect or config["dialect"]
+    MaglaORM.CONFIG.update(dialect=dialect, db_name=db_name)
+    if dialect == "sqlite":
+        MaglaORM.CONFIG["data_dir"] = data_dir or config["data_dir"] or tempfile.gettempdir()
+    MaglaORM._Engine = MaglaORM._Session = None
+    for cls in connections:
+        cls._orm = None
+    MaglaData._cache.clear()
+    try:
+        MaglaEntity.connect()
+        yield MaglaEntity._orm
+    finally:
+        orm = MaglaEntity._orm
+        if orm is not None and orm._session is not None:
+            orm._session.close()
+        if MaglaORM._Engine is not None:
+            MaglaORM._Engine.dispose()
+        MaglaORM.CONFIG.clear()
+        MaglaORM.CONFIG.update(config)
+        MaglaORM._Engine, MaglaORM._Session = engine, session_factory
+        for cls in classes:
+            if cls in connections:
+                cls._orm = connections[cls]
+            elif "_orm" in vars(cls):
+                del cls._orm
+        MaglaData._cache.clear()
+
+
+def generate(projects=1, shots=10, versions=3, tools=2, users=2, root_dir=None, timings=None):
+    """Create a synthetic ecosystem of given size through `MaglaRoot`.
+
+    Every run uses unique names, so it can be called repeatedly against the same backend. The
+    current machine's uuid is reused if it has one. Data is written to the connected database, run
+    within `database` to keep it apart.
+
+    Parameters
+    ----------
+    projects : int, optional
+        Number of projects to create, by default 1
+    shots : int, optional
+        Number of shots to create per project, by default 10
+    versions : int, optional
+        Number of versions to create per shot after the initial version 0, by default 3
+    tools : int, optional
+        Number of tools to create, each with a tool config per project, by default 2
+    users : int, optional
+        Number of users to create, each assigned to a shot and with their context set to it, by
+        default 2
+    root_dir : str, optional
+        The directory to create directory trees in, by default a new temporary directory
+    timings : dict, optional
+        If given, the seconds taken by each `create_shot` and `version_up` call are appended to
+        its lists of the same name
+
+    Returns
+    -------
+    dict
+        Dictionary containing the ids of the created `projects`, `shots`, `shot_versions`,
+        `tool_configs` and `users`, and the `root_dir`
+    """
+    import magla
+    from magla.core.machine import MaglaMachine
+
+    root_dir = root_dir or tempfile.mkdtemp(prefix="magla_bench_")
+    timings = timings if timings is not None else {}
+    timings.setdefault("create_shot", [])
+    timings.setdefault("version_up", [])
+    token = uuid.uuid4().hex[:8]
+    r = magla.Root()
+    generated = dict((key, []) for key in (
+        "projects", "shots", "shot_versions", "tool_configs", "users"))
+    generated["root_dir"] = root_dir
+
+    facility = r.create_facility("bench_facility_{0}".format(token), settings={
+        "tool_install_directory_label": "{tool_version.tool.name}_{tool_version.string}"})
+    r.create(MaglaMachine, {
+        "uuid": MaglaMachine.current_uuid(),
+        "facility_id": facility.id
+    })
+    tool_versions = [r.create_tool(
+        tool_name="bench_tool_{0}_{1}".format(token, index),
+        install_dir=os.path.join(root_dir, "tools", "bench_tool_{0}".format(index)),
+        exe_path=os.path.join(root_dir, "tools", "bench_tool_{0}".format(index), "bin", "tool"),
+        version_string="1.0.{0}".format(index),
+        file_extension=".bench") for index in range(tools)]
+
+    for project_index in range(projects):
+        name = "bench_{0}_{1:03d}".format(token, project_index)
+        project = r.create_project(name, os.path.join(root_dir, name), project_settings(root_dir))
+        generated["projects"].append(project.id)
+        r.create(magla.Settings2D, {
+            "label": "Bench HD @24FPS",
+            "width": 1920,
+            "height": 1080,
+            "rate": 24,
+            "project_id": project.id
+        })
+        for tool_version in tool_versions:
+            generated["tool_configs"].append(r.create_tool_config(
+                tool_version_id=tool_version.id,
+                project_id=project.id,
+                tool_subdir="{tool_version.full_name}",
+                bookmarks={"{tool_version.full_name}": "{shot_version.full_name}.bench"},
+                directory_tree=[{"_in": []}, {"_out": []}]).id)
+        for shot_index in range(shots):
+            start = time.perf_counter()
+            shot = r.create_shot(project.id, "{0}_sh{1:04d}".format(name, shot_index))
+            timings["create_shot"].append(time.perf_counter() - start)
+            generated["shots"].append(shot.id)
+            generated["shot_versions"].append(shot.latest().id)
+            for num in range(1, versions + 1):
+                start = time.perf_counter()
+                shot_version = r.version_up(shot.id, num)
+                timings["version_up"].append(time.perf_counter() - start)
+                generated["shot_versions"].append(shot_version.id)
+
+    for user_index in range(users):
+        user = r.create_user("bench_{0}_user_{1:03d}".format(token, user_index))
+        generated["users"].append(user.id)
+        if generated["shots"]:
+            shot_id = generated["shots"][user_index % len(generated["shots"])]
+            assignment = r.create_assignment(shot_id, user.id)
+            generated["shot_versions"].append(assignment.shot_version.id)
+            context = magla.Context(id=user.id)
+            context.data.assignment_id = assignment.id
+            context.data.push()
+    return generated
+
+
+def throughput(projects=1, shots=10, versions=3, tools=2, users=2, repeat=5, root_dir=None,
+               db_name=DEFAULT_DB_NAME, dialect=None, data_dir=None):
+    """Generate synthetic data (see `generate`) and time common operations against it.
+
+    Stages:
+    -------
+        - create_shot: each `MaglaRoot.create_shot` call while generating
+        - version_up: each `MaglaRoot.version_up` call while generating
+        - timeline_build: `MaglaTimeline.build` of each project's shots, `repeat` times
+        - context: resolving each user's `MaglaContext` down to its project, shot and shot
+          version, `repeat` times
+        - root_all: `MaglaRoot.all` for everything in the backend, `repeat` times
+
+    Everything runs within `database`, connected to given database rather than the configured one.
+
+    Parameters
+    ----------
+    projects : int, optional
+        Number of projects to generate, by default 1
+    shots : int, optional
+        Number of shots to generate per project, by default 10
+    versions : int, optional
+        Number of versions to generate per shot, by default 3
+    tools : int, optional
+        Number of tools to generate, by default 2
+    users : int, optional
+        Number of users to generate, by default 2
+    repeat : int, optional
+        Number of times to run the stages which don't create data, by default 5
+    root_dir : str, optional
+        The directory to create directory trees in, by default a temporary directory which is
+        removed afterwards
+    db_name : str, optional
+        The database to generate data in, by default `DEFAULT_DB_NAME`
+    dialect : str, optional
+        The backend, "sqlite" or "postgres", by default the currently configured one
+    data_dir : str, optional
+        The directory of `sqlite` databases, see `database`
+
+    Returns
+    -------
+    dict
+        Dictionary containing the `environment`, `backend`, generated `sizes` and a summary per
+        stage (see `summarize`)
+    """
+    import opentimelineio as otio
+
+    import magla
+
+    keep = root_dir is not None
+    root_dir = root_dir or tempfile.mkdtemp(prefix="magla_bench_")
+    samples = dict((stage, []) for stage in THROUGHPUT_STAGES)
+    try:
+        with database(db_name, dialect, data_dir) as orm:
+            backend = orm.CONFIG["dialect"]
+            generated = generate(projects, shots, versions, tools, users, root_dir, samples)
+            r = magla.Root()
+            for _ in range(repeat):
+                for project_id in generated["projects"]:
+                    project = magla.Project(id=project_id)
+                    timeline = project.timeline
+                    timeline.data.otio = otio.schema.Timeline(name=project.name)
+                    shots_ = project.shots
+                    start = time.perf_counter()
+                    timeline.build(shots_)
+                    samples["timeline_build"].append(time.perf_counter() - start)
+                for user_id in generated["users"]:
+                    start = time.perf_counter()
+                    context = magla.Context(id=user_id)
+                    # only resolving the properties is timed, their values aren't needed
+                    context.project, context.shot, context.shot_version
+                    samples["context"].append(time.perf_counter() - start)
+                start = time.perf_counter()
+                r.all()
+                samples["root_all"].append(time.perf_counter() - start)
+    finally:
+        if not keep:
+            shutil.rmtree(root_dir, ignore_errors=True)
+
+    results = {
+        "environment": environment(),
+        "backend": backend,
+        "sizes": dict((key, len(value)) for key, value in generated.items()
+                      if isinstance(value, list)),
+        "stages": {}
+    }
+    for stage in THROUGHPUT_STAGES:
+        if samples[stage]:
+            results["stages"][stage] = summarize(samples[stage])
+    return results
+
+
+def compare(results, baseline, tolerance=0.2, key="median"):
+    """Compare given results to a baseline, listing the timings which got slower.
+
+    Parameters
+    ----------
+    results : dict
+        Results of a benchmark run, such as `cold_start`
+    baseline : dict
+        Results of an earlier run of the same benchmark
+    tolerance : float, optional
+        Allowed slowdown as a fraction of the baseline, by default 0.2 (20%)
+    key : str, optional
+        The summary value to compare, by default "median"
+
+    Returns
+    -------
+    list of dict
+        Dictionary per regression containing `name`, `baseline`, `result` and `ratio`
+    """
+    regressions = []
+    for name, summary in sorted(results.get("stages", {}).items()):
+        previous = baseline.get("stages", {}).get(name)
+        if not previous or key not in summary or key not in previous or not previous[key]:
+            continue
+        ratio = summary[key] / previous[key]
+        if ratio > 1 + tolerance:
+            regressions.append({
+                "name": name,
+                "baseline": previous[key],
+                "result": summary[key],
+                "ratio": ratio
+            })
+    return regressions
+
+
+def write(results, path):
+    """Write given results to a `JSON` file.
+
+    Parameters
+    ----------
+    results : dict
+        Results of a benchmark run
+    path : str
+        Path of the `JSON` file
+    """
+    with open(path, "w") as fo:
+        json.dump(results, fo, indent=2, sort_keys=True)
+
+
+def read(path):
+    """Read results previously written by `write`.
+
+    Parameters
+    ----------
+    path : str
+        Path of the `JSON` file
+
+    Returns
+    -------
+    dict
+        The results
+    """
+    with open(path) as fo:
+        return json.load(fo)
+
+
+def _report(results, regressions):
+    """Print a readable table of given results and regressions."""
+    for name, summary in results["stages"].items():
+        if "error" in summary:
+            sys.stdout.write("{0:<28} error: {1}\n".format(name, summary["error"]))
+            continue
+        sys.stdout.write("{0:<28} median {1:9.4f}s  min {2:9.4f}s  max {3:9.4f}s\n".format(
+            name, summary["median"], summary["min"], summary["max"]))
+    for regression in regressions:
+        sys.stdout.write("REGRESSION {name}: {baseline:.4f}s -> {result:.4f}s "
+                         "({ratio:.2f}x)\n".format(**regression))
+
+
+def main(argv=None):
+    """Command-line entry point, see `python -m magla.bench --help`.
+
+    Returns
+    -------
+    int
+        Exit code, 1 if any regressions were found
+    """
+    parser = argparse.ArgumentParser(prog="python -m magla.bench", description=__doc__.split(
+        "\n")[0])
+    subparsers = parser.add_subparsers(dest="command")
+    cold_start_parser = subparsers.add_parser("cold-start", help="time startup stages")
+    cold_start_parser.add_argument("--repeat", type=int, default=5)
+    cold_start_parser.add_argument("--stages", nargs="+", default=list(COLD_START_STAGES),
+                                   choices=COLD_START_STAGES)
+    cold_start_parser.add_argument("--entity-type", default="User")
+    cold_start_parser.add_argument("--entity-id", type=int, default=1)
+    cold_start_parser.add_argument("--tool-config-id", type=int, default=1)
+    throughput_parser = subparsers.add_parser(
+        "throughput", help="time common operations against synthetic data")
+    throughput_parser.add_argument("--projects", type=int, default=1)
+    throughput_parser.add_argument("--shots", type=int, default=10)
+    throughput_parser.add_argument("--versions", type=int, default=3)
+    throughput_parser.add_argument("--tools", type=int, default=2)
+    throughput_parser.add_argument("--users", type=int, default=2)
+    throughput_parser.add_argument("--repeat", type=int, default=5)
+    throughput_parser.add_argument("--root-dir", help="create directory trees in this directory")
+    throughput_parser.add_argument("--dialect", choices=("sqlite", "postgres"),
+                                   help="by default the configured one")
+    throughput_parser.add_argument("--data-dir", help="directory of sqlite databases")
+    throughput_parser.add_argument("--db-name", default=DEFAULT_DB_NAME,
+                                   help="database to generate data in, by default '{0}'".format(
+                                       DEFAULT_DB_NAME))
+    for subparser in (cold_start_parser, throughput_parser):
+        subparser.add_argument("--output", help="write results to this JSON file")
+        subparser.add_argument("--baseline", help="compare results to this JSON file")
+        subparser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    if args.command == "cold-start":
+        results = cold_start(
+            repeat=args.repeat,
+            stages=tuple(args.stages),
+            entity_type=args.entity_type,
+            entity_id=args.entity_id,
+            tool_config_id=args.tool_config_id)
+    elif args.command == "throughput":
+        results = throughput(
+            projects=args.projects,
+            shots=args.shots,
+            versions=args.versions,
+            tools=args.tools,
+            users=args.users,
+            repeat=args.repeat,
+            root_dir=args.root_dir,
+            db_name=args.db_name,
+            dialect=args.dialect,
+            data_dir=args.data_dir)
+    else:
+        parser.print_help()
+        return 2
+    regressions = compare(results, read(args.baseline), args.tolerance) if args.baseline else []
+    if args.output:
+        write(results, args.output)
+    _report(results, regressions)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,29 +1,58 @@
 """Core module for `magla`"""
-from .assignment import MaglaAssignment as Assignment
-from .config import MaglaConfig as Config
-from .context import MaglaContext as Context
-from .data import MaglaData as Data
-from .dependency import MaglaDependency as Dependency
-from .directory import MaglaDirectory as Directory
-from .entity import MaglaEntity as Entity
-from .episode import MaglaEpisode as Episode
-from .facility import MaglaFacility as Facility
-from .file_type import MaglaFileType as FileType
-from .machine import MaglaMachine as Machine
-from .project import MaglaProject as Project
-from .root import MaglaRoot as Root
-from .settings_2d import MaglaSettings2D as Settings2D
-from .sequence import MaglaSequence as Sequence
-from .shot import MaglaShot as Shot
-from .shot_version import MaglaShotVersion as ShotVersion
-from .timeline import MaglaTimeline as Timeline
-from .tool import MaglaTool as Tool
-from .tool_config import MaglaToolConfig as ToolConfig
-from .tool_version import MaglaToolVersion as ToolVersion
-from .tool_version_installation import MaglaToolVersionInstallation as ToolVersionInstallation
-from .user import MaglaUser as User
-
-from ..utils import get_machine_uuid, write_machine_uuid
-
-if not get_machine_uuid():
-    write_machine_uuid()
+import importlib
+import sys
+import types
+
+# public names, and the `magla.core` module and class each one is imported from on first access
+_EXPORTS = {
+    "Assignment": ("assignment", "MaglaAssignment"),
+    "Config": ("config", "MaglaConfig"),
+    "Context": ("context", "MaglaContext"),
+    "Data": ("data", "MaglaData"),
+    "Dependency": ("dependency", "MaglaDependency"),
+    "Directory": ("directory", "MaglaDirectory"),
+    "Entity": ("entity", "MaglaEntity"),
+    "Episode": ("episode", "MaglaEpisode"),
+    "Facility": ("facility", "MaglaFacility"),
+    "FileType": ("file_type", "MaglaFileType"),
+    "Machine": ("machine", "MaglaMachine"),
+    "Project": ("project", "MaglaProject"),
+    "Root": ("root", "MaglaRoot"),
+    "Settings2D": ("settings_2d", "MaglaSettings2D"),
+    "Sequence": ("sequence", "MaglaSequence"),
+    "Shot": ("shot", "MaglaShot"),
+    "ShotVersion": ("shot_version", "MaglaShotVersion"),
+    "Timeline": ("timeline", "MaglaTimeline"),
+    "Tool": ("tool", "MaglaTool"),
+    "ToolConfig": ("tool_config", "MaglaToolConfig"),
+    "ToolVersion": ("tool_version", "MaglaToolVersion"),
+    "ToolVersionInstallation": ("tool_version_installation", "MaglaToolVersionInstallation"),
+    "User": ("user", "MaglaUser")
+}
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    """Import the requested class the first time it is accessed (PEP 562)."""
+    if name not in _EXPORTS:
+        raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+    module_name, class_name = _EXPORTS[name]
+    value = getattr(importlib.import_module(".{0}".format(module_name), __name__), class_name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if sys.version_info < (3, 7):
+    # module-level `__getattr__` needs python 3.7, give the module a class that forwards to it
+    class _LazyModule(types.ModuleType):
+        def __getattr__(self, name):
+            return __getattr__(name)
+
+        def __dir__(self):
+            return __dir__()
+
+    sys.modules[__name__].__class__ = _LazyModule
@@ -0,0 +1,250 @@
+"""A bounded, time-limited read-through cache of entity data shared by every session in a process.
+
+Mostly static configuration - project settings, 2d settings, tool configs and facility settings - is
+read far more often than it changes. Entity types which set `__cacheable__ = True` can have the
+data of each record kept here by (table, id) for `MaglaCache.ttl` seconds, so that instantiating
+them again with an `id` doesn't query the backend.
+
+Entries are invalidated whenever a record of their table is updated, inserted or deleted through
+`SQLAlchemy` in this process - including `MaglaData.push`. With Postgres, `listen` also
+invalidates them when other processes change records, via `LISTEN/NOTIFY`. Changes made to the
+backend by other processes without `listen`, or by other means, are only picked up once the entry
+expires - until then stale data is returned. The cache is therefore opt-in: set `MAGLA_CACHE_TTL`
+to the staleness that is acceptable, ideally together with `MAGLA_CACHE_LISTEN` on Postgres.
+
+The cache is configured with these environment variables:
+    - `MAGLA_CACHE_TTL`: seconds entries live, by default 0 which disables the cache
+    - `MAGLA_CACHE_SIZE`: maximum number of entries, by default 1024
+    - `MAGLA_CACHE_LISTEN`: if set, `listen` is called with the Postgres engine on connect
+"""
+import collections
+import copy
+import logging
+import os
+import select
+import threading
+import time
+
+from sqlalchemy import event
+
+from .errors import MaglaError
+
+# channel used by `listen` for cross-process invalidation
+NOTIFY_CHANNEL = "magla_cache"
+
+
+class MaglaCacheError(MaglaError):
+    """An error accured preventing MaglaCache to continue."""
+
+
+class MaglaCache(object):
+    """Entity data by (table, id), evicting the least recently used entries beyond `max_size`."""
+
+    def __init__(self, ttl=60.0, max_size=1024):
+        """Initialize with given limits.
+
+        Parameters
+        ----------
+        ttl : float, optional
+            Seconds an entry lives, 0 to disable the cache, by default 60.0
+        max_size : int, optional
+            Maximum number of entries, by default 1024
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._watched = set()
+        self._notify_channel = None
+        self._listener = None
+        self._stop_event = threading.Event()
+
+    def __repr__(self):
+        return "<MaglaCache: entries={0}, ttl={1}, max_size={2}, hits={3}, misses={4}>".format(
+            len(self._entries), self.ttl, self.max_size, self.hits, self.misses)
+
+    def __str__(self):
+        return self.__repr__()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def enabled(self):
+        """Determine if entries are kept at all.
+
+        Returns
+        -------
+        bool
+            True if `ttl` and `max_size` are positive
+        """
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, table, id_):
+        """Retrieve a copy of the data of given record, if cached and not expired.
+
+        Parameters
+        ----------
+        table : str
+            The record's table name
+        id_ : int
+            The record's id
+
+        Returns
+        -------
+        dict
+            The record's data with `opentimelineio` objects as dicts, or None
+        """
+        key = (table, id_)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            data = entry[1]
+        return copy.deepcopy(data)
+
+    def set(self, table, id_, data):
+        """Keep a copy of the data of given record.
+
+        Parameters
+        ----------
+        table : str
+            The record's table name
+        id_ : int
+            The record's id
+        data : dict
+            The record's data with `opentimelineio` objects as dicts
+        """
+        if not self.enabled:
+            return
+        data = copy.deepcopy(data)
+        with self._lock:
+            self._entries[(table, id_)] = (time.monotonic() + self.ttl, data)
+            self._entries.move_to_end((table, id_))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, table, id_=None):
+        """Drop the entry of given record, or of all records in given table.
+
+        Parameters
+        ----------
+        table : str
+            The table name
+        id_ : int, optional
+            The record's id, by default None (the whole table)
+        """
+        with self._lock:
+            if id_ is not None:
+                self._entries.pop((table, id_), None)
+                return
+            for key in [key for key in self._entries if key[0] == table]:
+                del self._entries[key]
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def watch(self, schema):
+        """Invalidate entries of given mapped schema whenever one of its records is written.
+
+        Parameters
+        ----------
+        schema : sqlalchemy.ext.declarative.api.Base
+            The mapped entity class (defined in 'magla/db/')
+        """
+        if schema in self._watched:
+            return
+        self._watched.add(schema)
+        for name in ("after_insert", "after_update", "after_delete"):
+            event.listen(schema, name, self._on_write)
+        metadata = schema.metadata
+        if metadata not in self._watched:
+            self._watched.add(metadata)
+            event.listen(metadata, "after_drop", lambda *args, **kwargs: self.clear())
+
+    def listen(self, engine, channel=NOTIFY_CHANNEL):
+        """Invalidate entries when other processes write records, and notify them of local writes.
+
+        Only available with Postgres: local writes to watched tables send `pg_notify` within their
+        transaction, and a background thread `LISTEN`s for the notifications of other processes.
+
+        Parameters
+        ----------
+        engine : sqlalchemy.engine.Engine
+            The Postgres engine
+        channel : str, optional
+            The notification channel, by default `NOTIFY_CHANNEL`
+
+        Raises
+        ------
+        MaglaCacheError
+            The engine doesn't connect to Postgres
+        """
+        if engine.dialect.name != "postgresql":
+            raise MaglaCacheError("LISTEN/NOTIFY requires postgres, not: '{0}'".format(
+                engine.dialect.name))
+        self._notify_channel = channel
+        if self._listener and self._listener.is_alive():
+            return
+        self._stop_event.clear()
+        self._listener = threading.Thread(
+            target=self._listen, args=(engine, channel), name="magla-cache-listener", daemon=True)
+        self._listener.start()
+
+    def stop_listening(self):
+        """Stop the `LISTEN` thread and sending notifications."""
+        self._notify_channel = None
+        self._stop_event.set()
+        if self._listener:
+            self._listener.join()
+            self._listener = None
+
+    def _on_write(self, mapper, connection, target):
+        table = mapper.local_table.name
+        self.invalidate(table, target.id)
+        if self._notify_channel and connection.dialect.name == "postgresql":
+            connection.exec_driver_sql("SELECT pg_notify(%s, %s)", (
+                self._notify_channel, "{0}:{1}".format(table, target.id)))
+
+    def _listen(self, engine, channel):
+        """Invalidate the entries named by notifications until `stop_listening` is called."""
+        raw_connection = engine.raw_connection()
+        try:
+            connection = raw_connection.driver_connection
+            connection.autocommit = True
+            connection.cursor().execute("LISTEN {0}".format(channel))
+            while not self._stop_event.is_set():
+                if not select.select([connection], [], [], 1.0)[0]:
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    payload = connection.notifies.pop(0).payload
+                    table, _, id_ = payload.rpartition(":")
+                    try:
+                        self.invalidate(table, int(id_))
+                    except ValueError:
+                        logging.warning("Ignoring cache notification: '{0}'".format(payload))
+        finally:
+            raw_connection.close()
+
+
+def from_environment():
+    """Construct a `MaglaCache` configured by the `MAGLA_CACHE_*` environment variables.
+
+    Returns
+    -------
+    MaglaCache
+        The cache
+    """
+    return MaglaCache(
+        ttl=float(os.getenv("MAGLA_CACHE_TTL", 0)),
+        max_size=int(os.getenv("MAGLA_CACHE_SIZE", 1024)))
@@ -2,11 +2,21 @@
 import json
 import os
 
-import yaml
-
 from .errors import ConfigPathError, ConfigReadError
 
 
+def _yaml_load(config_fo):
+    """Load `YAML`, importing `yaml` only once a `YAML` config is actually read."""
+    import yaml
+    return yaml.safe_load(config_fo)
+
+
+def _yaml_dump(config_dict):
+    """Dump `YAML`, importing `yaml` only once a `YAML` config is actually written."""
+    import yaml
+    return yaml.dump(config_dict)
+
+
 class MaglaConfig(object):
     """Provide an interface to multiple types of config filetypes.
 
@@ -17,11 +27,11 @@ class MaglaConfig(object):
     """
     _loaders = {
         "json": json.load,
-        "yaml": yaml.safe_load
+        "yaml": _yaml_load
     }
     _writers = {
         "json": json.dumps,
-        "yaml": yaml.dump
+        "yaml": _yaml_dump
     }
 
     def __init__(self, path):
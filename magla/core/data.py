@@ -9,7 +9,9 @@ from pprint import pformat
 
 from sqlalchemy.orm.exc import NoResultFound
 
-from ..utils import apply_dict_to_record, record_to_dict, otio_to_dict
+from ..trace import traced
+from ..utils import apply_dict_to_record, dict_to_otio, record_to_dict, otio_to_dict
+from .cache import from_environment
 from .errors import MaglaError
 
 
@@ -120,9 +122,12 @@ class MaglaData(CustomDict):
         The returned record from the session query (containing data directly from backend)
     __session : sqlalchemy.orm.session.Session
         https://docs.sqlalchemy.org/en/13/orm/session_basics.html
+    _cache : magla.core.cache.MaglaCache
+        Data of cacheable records shared by all sessions (see `magla.core.cache`)
     """
+    _cache = from_environment()
 
-    def __init__(self, schema, data, session, *args, **kwargs):
+    def __init__(self, schema, data, session, cache=False, *args, **kwargs):
         """Initialize with `magla.db` schema, `data` to query with, and `session`
 
         Parameters
@@ -133,6 +138,8 @@ class MaglaData(CustomDict):
             data to query with
         session : sqlalchemy.orm.session.Session
             The `SQLAlchemy` session managing all of our transactions
+        cache : bool, optional
+            Flag for reading through and populating `_cache` when pulling by `id`, by default False
 
         Raises
         ------
@@ -146,8 +153,11 @@ class MaglaData(CustomDict):
                 type(data))
             raise MaglaDataError(msg)
         self._schema = schema
+        self._cacheable = cache and self._cache.enabled
         self.__record = None
         self.__session = session
+        if self._cacheable:
+            self._cache.watch(schema)
         super(MaglaData, self).__init__(data, *args, **kwargs)
 
         # attempt to pull from DB
@@ -200,13 +210,15 @@ class MaglaData(CustomDict):
 
     @property
     def record(self):
-        """Retrieve record.
+        """Retrieve record, querying for it now if the data was pulled from the cache.
 
         Returns
         -------
         sqlalchemy.ext.declarative.api.Base
             The returned record from the session query (containing data directly from backend)
         """
+        if self.__record is None and self._store.get("id") is not None:
+            self.__record = self.session.get(self._schema, self._store["id"])
         return self.__record
 
     def dict(self):
@@ -236,13 +248,17 @@ class MaglaData(CustomDict):
         """Output formatted data to `stdout`."""
         sys.stdout.write("{0}\n".format(pformat(self.dict(), width=1)))
 
+    @traced("MaglaData.pull")
     def pull(self):
         """Pull and update data from backend.
 
+        Cacheable data queried by `id` is read from `_cache` if possible, the record itself is then
+        only queried once `record` is accessed.
+
         Returns
         -------
         sqlalchemy.ext.declarative.api.Base
-            The record retrieved from the query
+            The record retrieved from the query, or None if the data was read from the cache
 
         Raises
         ------
@@ -250,6 +266,14 @@ class MaglaData(CustomDict):
             No record was found matching given data.
         """
         query_dict = otio_to_dict(self._store)
+        if self._cacheable and query_dict.get("id") is not None:
+            cached = self._cache.get(self._schema.__tablename__, query_dict["id"])
+            if cached is not None and all(
+                    cached.get(key) == value for key, value in query_dict.items()):
+                self.__record = None
+                self.update(dict((key, dict_to_otio(value) if isinstance(value, dict) else value)
+                                 for key, value in cached.items()))
+                return None
         record = self.session.query(self._schema).filter_by(**query_dict).first()
         if not record:
             raise NoRecordFoundError(
@@ -258,8 +282,12 @@ class MaglaData(CustomDict):
         self.__record = record
         backend_data = record_to_dict(record, otio_as_dict=False)
         self.update(backend_data)
+        if self._cacheable:
+            self._cache.set(self._schema.__tablename__, record.id,
+                            record_to_dict(record, otio_as_dict=True))
         return record
 
+    @traced("MaglaData.push")
     def push(self):
         """Push local data to update backend.
 
@@ -268,8 +296,8 @@ class MaglaData(CustomDict):
         sqlalchemy.ext.declarative.api.Base
             The record retrieved from the update
         """
-        temp = self.__record
-        self.__record = apply_dict_to_record(self.__record, self._store, otio_as_dict=True)
+        temp = self.record
+        self.__record = apply_dict_to_record(temp, self._store, otio_as_dict=True)
         self.session.commit()
         self.__record = temp
 
@@ -5,12 +5,31 @@ There should never be any hard-coded paths anywhere except by users via settings
 relies on accessing local directories then a `MaglaDirectory` record must first be created and
 associated.
 """
+import atexit
+import collections
+import datetime
+import functools
+import json
+import logging
 import os
+import queue
+import re
 import shutil
+import string
 import sys
+import threading
+import types
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event
 
 from ..db.directory import Directory
-from ..utils import open_directory_location
+from ..db.directory_usage import DirectoryUsage
+from ..db.orm import MaglaORM
+from ..trace import traced
+from ..utils import (TRASH_DIR_NAME, measure_tree, mount_point, move_to_trash,
+                     open_directory_location, remove_tree)
 from .entity import MaglaEntity
 from .errors import MaglaError
 
@@ -19,6 +38,231 @@ class MaglaDirectoryError(MaglaError):
     """An error accured preventing MaglaDirectory to continue."""
 
 
+class MaglaPathValues(types.SimpleNamespace):
+    """Plain attribute values captured from entities, see `MaglaPathTemplate.capture`.
+
+    Unlike entities they are compared and hashed by value, so paths resolved from them can be
+    cached without going stale when the entities they were captured from change.
+    """
+
+    def __hash__(self):
+        return hash(tuple(sorted(vars(self).items())))
+
+
+class MaglaPathTemplate(object):
+    """A path containing string-formatting tokens, parsed once and formatted many times.
+
+    Formatting gives the same result as `str.format` but the template is only parsed when it is
+    compiled, and attribute lookups shared between fields (such as `shot_version.shot` in
+    '{shot_version.shot.directory.path}/{shot_version.shot.name}') are only resolved once per
+    call. Each lookup on an entity can mean a query, so this matters on the creation paths.
+    Like `str.format`, '.name' only looks up attributes and '[key]' only looks up items.
+
+    Example:
+        ```
+        template = MaglaPathTemplate.compile(project.settings["shot_version_directory"])
+        path = template.format(shot_version=shot_version)
+        ```
+    """
+    _CONVERSIONS = {"r": repr, "s": str, "a": ascii}
+    _LOOKUP_RE = re.compile(r"\.([^.\[]+)|\[([^\]]+)\]")
+
+    def __init__(self, template):
+        """Parse given template into literal text and pre-split field lookups.
+
+        Parameters
+        ----------
+        template : str
+            The string containing `str.format` tokens
+        """
+        self.template = template
+        self.parts = []
+        for literal, field_name, format_spec, conversion in string.Formatter().parse(template):
+            if field_name is None:
+                self.parts.append((literal, None, None, None))
+                continue
+            if not field_name or field_name.isdigit() or "{" in format_spec:
+                # positional or nested fields are left to `str.format`
+                self.parts = None
+                break
+            self.parts.append((literal, self._split_field(field_name), format_spec, conversion))
+
+    def __repr__(self):
+        return "<{0}: {1}>".format(self.__class__.__name__, self.template)
+
+    @classmethod
+    @functools.lru_cache(maxsize=512)
+    def compile(cls, template):
+        """Retrieve the compiled template for given string, parsing it only the first time.
+
+        Parameters
+        ----------
+        template : str
+            The string containing `str.format` tokens
+
+        Returns
+        -------
+        MaglaPathTemplate
+            The cached compiled template
+        """
+        return cls(template)
+
+    @classmethod
+    def _split_field(cls, field_name):
+        """Split a field name into its keyword and a tuple of attribute or item lookups.
+
+        Parameters
+        ----------
+        field_name : str
+            The field name as written in the template, e.g. 'shot_version.shot.directory.path'
+
+        Returns
+        -------
+        tuple
+            Tuple of `(is_attribute, key)` pairs, the first being the keyword argument name
+        """
+        first = re.match(r"[^.\[]*", field_name).group()
+        lookups = [(False, first)]
+        for attr, item in cls._LOOKUP_RE.findall(field_name[len(first):]):
+            if attr:
+                lookups.append((True, attr))
+            else:
+                lookups.append((False, int(item) if item.isdigit() else item))
+        return tuple(lookups)
+
+    @property
+    def fields(self):
+        """Retrieve the keyword names this template needs to be formatted.
+
+        Returns
+        -------
+        set of str
+            The keyword argument names
+        """
+        if self.parts is None:
+            return set(field_name.split(".")[0].split("[")[0] for _, field_name, _, _
+                       in string.Formatter().parse(self.template) if field_name)
+        return set(lookups[0][1] for _, lookups, _, _ in self.parts if lookups)
+
+    @classmethod
+    def capture(cls, templates, **kwargs):
+        """Capture the attributes given templates look up on given objects as plain values.
+
+        Each attribute chain is resolved once for all templates. Objects which are formatted
+        themselves, looked up with items ('[key]') or used by templates which can't be compiled
+        are passed on as given.
+
+        Parameters
+        ----------
+        templates : list of str
+            The strings containing `str.format` tokens
+        **kwargs
+            The objects to capture from, for example `shot_version=MaglaShotVersion(...)`
+
+        Returns
+        -------
+        dict
+            The keyword arguments, with `MaglaPathValues` in place of the captured objects
+        """
+        chains = {}
+        live = set()
+        for template in templates:
+            template = cls.compile(template)
+            if template.parts is None:
+                live.update(template.fields)
+                continue
+            for _, lookups, _, _ in template.parts:
+                if lookups is None:
+                    continue
+                if len(lookups) == 1 or not all(attribute for attribute, _ in lookups[1:]):
+                    live.add(lookups[0][1])
+                chains.setdefault(lookups[0][1], set()).add(lookups)
+        captured = dict(kwargs)
+        resolved = {}
+        for name, lookups_set in chains.items():
+            if name in live or name not in kwargs:
+                continue
+            tree = {}
+            for lookups in sorted(lookups_set, key=len):
+                node = tree
+                for _, attribute in lookups[1:-1]:
+                    node = node.setdefault(attribute, {})
+                    if not isinstance(node, dict):
+                        break
+                else:
+                    if lookups[-1][1] not in node:
+                        node[lookups[-1][1]] = cls._resolve(lookups, kwargs, resolved)
+                        continue
+                # an attribute which is formatted itself and also looked into
+                break
+            else:
+                captured[name] = cls._freeze(tree)
+        return captured
+
+    @classmethod
+    def _freeze(cls, tree):
+        """Convert nested dicts of captured attributes to `MaglaPathValues`."""
+        return MaglaPathValues(**dict(
+            (key, cls._freeze(value) if isinstance(value, dict) else value)
+            for key, value in tree.items()))
+
+    def format(self, **kwargs):
+        """Format the template with given keyword arguments.
+
+        Parameters
+        ----------
+        **kwargs
+            The objects to inject, for example `shot_version=MaglaShotVersion(...)`
+
+        Returns
+        -------
+        str
+            The formatted string
+        """
+        if self.parts is None:
+            return self.template.format(**kwargs)
+        resolved = {}
+        formatted = []
+        for literal, lookups, format_spec, conversion in self.parts:
+            formatted.append(literal)
+            if lookups is None:
+                continue
+            value = self._resolve(lookups, kwargs, resolved)
+            if conversion:
+                value = self._CONVERSIONS[conversion](value)
+            formatted.append(format(value, format_spec))
+        return "".join(formatted)
+
+    @staticmethod
+    def _resolve(lookups, kwargs, resolved):
+        """Resolve given lookups, re-using any prefix already resolved during this call.
+
+        Parameters
+        ----------
+        lookups : tuple
+            Tuple of `(is_attribute, key)` pairs from `_split_field`
+        kwargs : dict
+            The keyword arguments given to `format`
+        resolved : dict
+            Values resolved so far, keyed by their lookups prefix
+
+        Returns
+        -------
+        object
+            The resolved value
+        """
+        value = kwargs[lookups[0][1]]
+        for i in range(1, len(lookups)):
+            prefix = lookups[:i + 1]
+            if prefix in resolved:
+                value = resolved[prefix]
+                continue
+            is_attribute, key = lookups[i]
+            value = getattr(value, key) if is_attribute else value[key]
+            resolved[prefix] = value
+        return value
+
+
 class MaglaDirectory(MaglaEntity):
     """Provide an interface for interacting with local filesystem.
 
@@ -80,6 +324,19 @@ class MaglaDirectory(MaglaEntity):
             ```
     """
     __schema__ = Directory
+    # files and directories removed per second by the background trash reaper
+    TRASH_FILES_PER_SECOND = 500
+
+    # number of resolved bookmark paths kept by `resolve_bookmark`
+    BOOKMARK_CACHE_SIZE = 4096
+
+    _bookmark_cache = collections.OrderedDict()
+    _bookmark_lock = threading.Lock()
+    _bookmark_watched = False
+    _trash_queue = queue.Queue()
+    _trash_pending = set()
+    _trash_reaper = None
+    _trash_lock = threading.Lock()
 
     def __init__(self, data=None, **kwargs):
         """Initialize with given data.
@@ -152,6 +409,18 @@ class MaglaDirectory(MaglaEntity):
         """
         return self.data.bookmarks
 
+    @property
+    def usage(self):
+        """Retrieve the last measured disk usage of this directory tree.
+
+        Returns
+        -------
+        dict or None
+            Dictionary containing `directory_id`, `bytes`, `files`, `dirs` and `measured_at`, or
+            None if the tree was never measured. See `measure`
+        """
+        return self.usage_dict(self.data.record.usage)
+
     # SQAlchemy relationship back-references
     @property
     def machine(self):
@@ -184,10 +453,12 @@ class MaglaDirectory(MaglaEntity):
     # MaglaDirectory-specific methods ______________________________________________________________
     def bookmark(self, name):
         """Retrieve and convert given bookmark to absolute path.
+
         Parameters
         ----------
         name : str
             The bookmark key name
+
         Returns
         -------
         str
@@ -196,34 +467,429 @@ class MaglaDirectory(MaglaEntity):
         """
         return os.path.join(self.path, self.bookmarks.get(name, name))
 
+    def resolve_bookmark(self, name, **kwargs):
+        """Retrieve given bookmark as an absolute path with its formatting tokens resolved.
+
+        Resolved paths are cached by the backend, this directory's id, the bookmark's text and
+        the identity of the given values. Values are best captured as plain values with
+        `MaglaPathTemplate.capture`, which are identified by value. `MaglaEntity` objects are
+        identified by their type and id, so resolving the same bookmark for the same entities again
+        doesn't touch their attributes, which can each mean a query - the cache is then cleared
+        whenever any record is updated or deleted, so renamed entities aren't resolved to stale
+        paths. Other plain values, such as a dict for bookmarks which look up keys like
+        '{shot[name]}', can also be given.
+
+        Parameters
+        ----------
+        name : str
+            The bookmark key name
+        **kwargs
+            The values to inject, for example `shot_version=MaglaShotVersion(...)`
+
+        Returns
+        -------
+        str
+            The resolved absolute path of the bookmark
+        """
+        self._watch_records()
+        bookmark = self.bookmark(name)
+        try:
+            key = (str(self.orm._Engine.url), self.id, name, bookmark) + tuple(
+                (k, self._cache_identity(v)) for k, v in sorted(kwargs.items()))
+            hash(key)
+        except TypeError:
+            # unhashable plain values, resolve without caching
+            return MaglaPathTemplate.compile(bookmark).format(**kwargs)
+        with self._bookmark_lock:
+            if key in self._bookmark_cache:
+                self._bookmark_cache.move_to_end(key)
+                return self._bookmark_cache[key]
+        resolved = MaglaPathTemplate.compile(bookmark).format(**kwargs)
+        with self._bookmark_lock:
+            self._bookmark_cache[key] = resolved
+            while len(self._bookmark_cache) > self.BOOKMARK_CACHE_SIZE:
+                self._bookmark_cache.popitem(last=False)
+        return resolved
+
+    @classmethod
+    def clear_bookmark_cache(cls):
+        """Forget all bookmark paths resolved by `resolve_bookmark`."""
+        with cls._bookmark_lock:
+            cls._bookmark_cache.clear()
+
+    @classmethod
+    def _watch_records(cls):
+        """Clear the bookmark cache whenever a record is updated or deleted, once per process."""
+        if cls._bookmark_watched:
+            return
+        with cls._bookmark_lock:
+            if cls._bookmark_watched:
+                return
+            for name in ("after_update", "after_delete"):
+                event.listen(MaglaORM._Base, name, cls._on_record_write, propagate=True)
+            cls._bookmark_watched = True
+
+    @classmethod
+    def _on_record_write(cls, mapper, connection, target):
+        cls.clear_bookmark_cache()
+
+    @staticmethod
+    def _cache_identity(value):
+        """Identify given formatting value for the bookmark cache.
+
+        Parameters
+        ----------
+        value : object
+            `MaglaEntity` object, `MaglaPathValues`, dict or plain value
+
+        Returns
+        -------
+        object
+            Hashable identity of the value
+        """
+        if isinstance(value, MaglaEntity):
+            return (value.__class__.__name__, value.id)
+        if isinstance(value, dict):
+            return tuple(sorted(value.items()))
+        return value
+
     def open(self):
         """Open the directory location in the os file browser."""
         open_directory_location(self.path)
 
-    def make_tree(self):
-        """Create the directory tree on the machine's filesystem."""
-        if not os.path.isdir(self.path):
-            os.makedirs(self.path)
-        self._recursive_make_tree(self.path, self.tree or [])
+    @traced("MaglaDirectory.make_tree")
+    def make_tree(self, max_workers=None):
+        """Create the directory tree on the machine's filesystem.
 
-    def bookmark(self, name):
-        """Retrieve and convert given bookmark to absolute path.
+        The tree is flattened into a list of paths once, existing paths are filtered out with a
+        single `os.scandir` per parent directory, and the remaining directories are created
+        concurrently. Each created directory is logged at debug level.
 
         Parameters
         ----------
-        name : str
-            The bookmark key name
+        max_workers : int, optional
+            Maximum number of directories to create at once, by default None (8)
 
         Returns
         -------
-        str
-            The absolute path of the bookmark, or the if it does not exist an absolute path is
-            created using the name as the relative path.
+        list of str
+            The paths which were created
         """
-        return os.path.join(self.path, self.bookmarks.get(name, name))
+        paths = [os.path.normpath(path) for path in [self.path] + self.tree_paths()]
+        missing = self._missing_paths(paths)
+        self._make_paths(missing, max_workers)
+        for path in missing:
+            logging.debug("making: {0}".format(path))
+        return missing
+
+    @staticmethod
+    def _make_paths(paths, max_workers=None):
+        """Concurrently create given missing directories.
+
+        Parameters
+        ----------
+        paths : list of str
+            Absolute paths which do not exist yet
+        max_workers : int, optional
+            Maximum number of directories to create at once, by default None (8)
+        """
+        # creating the deepest missing paths creates all their missing parents along the way
+        parents = set(os.path.dirname(path) for path in paths)
+        leaves = [path for path in paths if path not in parents]
+        if leaves:
+            with ThreadPoolExecutor(max_workers=min(max_workers or 8, len(leaves))) as executor:
+                list(executor.map(lambda path: os.makedirs(path, exist_ok=True), leaves))
 
-    def _recursive_make_tree(self, root, sub_tree):
-        """Recursively create the directory tree.
+    def verify(self, repair=False, max_workers=None):
+        """Compare the directory tree and bookmarks against what actually exists on disk.
+
+        Parameters
+        ----------
+        repair : bool, optional
+            Flag for creating the missing directories, by default False
+        max_workers : int, optional
+            Maximum number of directories to list at once, by default None (16)
+
+        Returns
+        -------
+        dict
+            Report for this directory. See `verify_many`
+        """
+        return self.verify_many([self], repair=repair, max_workers=max_workers)[0]
+
+    @classmethod
+    def verify_many(cls, directories, repair=False, max_workers=None):
+        """Verify the trees of many directories at once, listing every expected path in parallel.
+
+        Every directory expected by the trees is listed exactly once with `os.scandir`, across
+        all given directories in the same thread pool, so auditing a whole project costs one
+        listing per directory rather than a `stat` per path.
+
+        Reported entries:
+        -----------------
+            - missing: tree directories and bookmarks which do not exist
+            - extra: sub-directories found where the tree describes the children, which the tree
+              does not know about. Directories which are leaves of the tree can contain anything
+            - repaired: the missing directories which were created if `repair` was given
+            - errors: tree directories which couldn't be listed (such as for lack of permission),
+              each as a dict containing `path` and `error`. The audit carries on without them
+
+        Directories whose path still contains formatting tokens (such as `MaglaToolConfig`
+        templates) are reported as skipped, as are bookmarks containing tokens or frame padding.
+
+        Parameters
+        ----------
+        directories : list
+            `MaglaDirectory` objects or `Directory` records, anything with `path`, `tree` and
+            `bookmarks` attributes
+        repair : bool, optional
+            Flag for creating the missing directories, by default False
+        max_workers : int, optional
+            Maximum number of directories to list at once, by default None (16)
+
+        Returns
+        -------
+        list of dict
+            Dictionary per directory, in the order given, containing `path`, `skipped`,
+            `missing`, `extra`, `repaired` and `errors`
+        """
+        plans = []
+        to_scan = set()
+        for directory in directories:
+            if cls._is_unresolved(directory.path):
+                plans.append((directory.path, None, None))
+                continue
+            root = os.path.normpath(directory.path)
+            dir_paths = [root] + [
+                os.path.join(root, path) for path in cls.compile_tree(directory.tree)]
+            bookmark_paths = [
+                os.path.normpath(os.path.join(root, path))
+                for path in (directory.bookmarks or {}).values()
+                if not cls._is_unresolved(path)]
+            plans.append((directory.path, dir_paths, bookmark_paths))
+            to_scan.update(dir_paths)
+
+        listings = {}
+        if to_scan:
+            to_scan = sorted(to_scan)
+            with ThreadPoolExecutor(max_workers=min(max_workers or 16, len(to_scan))) as executor:
+                listings = dict(zip(to_scan, executor.map(cls._scan_directory, to_scan)))
+
+        reports = []
+        for path, dir_paths, bookmark_paths in plans:
+            report = {"path": path, "skipped": dir_paths is None, "missing": [], "extra": [],
+                      "repaired": [], "errors": []}
+            reports.append(report)
+            if dir_paths is None:
+                continue
+            missing = [path_ for path_ in dir_paths if listings[path_] is None]
+            report["errors"] = [
+                {"path": path_, "error": str(listings[path_])} for path_ in dir_paths
+                if isinstance(listings[path_], OSError)]
+            children = {}
+            for path_ in dir_paths[1:]:
+                parent, name = os.path.split(path_)
+                children.setdefault(parent, set()).add(name)
+            for parent, names in children.items():
+                listing = listings.get(parent)
+                if not isinstance(listing, dict):
+                    continue
+                report["extra"].extend(sorted(
+                    os.path.join(parent, name) for name, is_dir in listing.items()
+                    if is_dir and name not in names))
+            for bookmark_path in bookmark_paths:
+                parent, name = os.path.split(bookmark_path)
+                if parent in listings and not isinstance(listings[parent], OSError):
+                    exists = name in (listings[parent] or {})
+                else:
+                    exists = os.path.lexists(bookmark_path)
+                if not exists:
+                    report["missing"].append(bookmark_path)
+            report["missing"] = missing + report["missing"]
+            if repair and missing:
+                cls._make_paths(missing, max_workers)
+                report["repaired"] = missing
+        return reports
+
+    @staticmethod
+    def _is_unresolved(path):
+        """Determine if given path still contains formatting tokens or frame padding."""
+        return "{" in path or "#" in path
+
+    @staticmethod
+    def _scan_directory(path):
+        """List given directory.
+
+        Parameters
+        ----------
+        path : str
+            Absolute path of the directory to list
+
+        Returns
+        -------
+        dict or None or OSError
+            Mapping of entry names to whether the entry is a directory, None if the directory
+            does not exist, or the error if it couldn't be listed otherwise
+        """
+        try:
+            with os.scandir(path) as entries:
+                return dict((entry.name, entry.is_dir()) for entry in entries)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        except OSError as err:
+            return err
+
+    def measure(self, full=False, max_workers=None):
+        """Measure and store the disk usage of this directory tree.
+
+        Parameters
+        ----------
+        full : bool, optional
+            Flag for listing every directory instead of trusting the cache, by default False
+        max_workers : int, optional
+            Maximum number of directories to list at once, by default None (16)
+
+        Returns
+        -------
+        dict
+            The measured usage, see `usage`
+        """
+        return self.measure_many([self], full=full, max_workers=max_workers)[0]
+
+    @classmethod
+    def measure_many(cls, directories, full=False, max_workers=None):
+        """Measure and store the disk usage of many directory trees, committing once.
+
+        Each tree is walked with `magla.utils.measure_tree`, reusing the per-directory cache
+        stored by its previous measurement so that only directories whose `mtime` changed are
+        listed again. Trees are measured deepest first and a tree containing another one given
+        here (a shot directory containing its shot versions) adds up the nested totals instead of
+        walking that part again.
+
+        Parameters
+        ----------
+        directories : list
+            `MaglaDirectory` objects or `Directory` records
+        full : bool, optional
+            Flag for listing every directory instead of trusting the caches, by default False
+        max_workers : int, optional
+            Maximum number of directories to list at once, by default None (16)
+
+        Returns
+        -------
+        list of dict or None
+            The measured usage per directory in the order given, see `usage`. None for
+            directories whose path still contains formatting tokens
+        """
+        records = list(directories)
+        cls.connect()
+        session = cls._orm.session
+        usages = dict(
+            (usage.directory_id, usage) for usage in session.query(DirectoryUsage).filter(
+                DirectoryUsage.directory_id.in_([record.id for record in records])))
+        known = {}
+        measured = {}
+        results = [None] * len(records)
+        order = sorted(
+            range(len(records)),
+            key=lambda i: os.path.normpath(records[i].path).count(os.sep),
+            reverse=True)
+        for i in order:
+            record = records[i]
+            if cls._is_unresolved(record.path):
+                continue
+            if record.id in measured:
+                # the same directory given more than once
+                results[i] = measured[record.id]
+                continue
+            usage = usages.get(record.id)
+            if usage is None:
+                usage = usages[record.id] = DirectoryUsage(directory_id=record.id)
+                session.add(usage)
+            cache = None
+            if usage.cache and not full:
+                cache = json.loads(zlib.decompress(usage.cache).decode("utf-8"))
+            totals = measure_tree(record.path, cache, known, max_workers)
+            for error in totals["errors"]:
+                logging.warning("Measured {0} without {1}: {2}".format(
+                    record.path, error["path"], error["error"]))
+            usage.bytes = totals["bytes"]
+            usage.files = totals["files"]
+            usage.dirs = totals["dirs"]
+            # stored as naive UTC, the column has no timezone
+            usage.measured_at = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+            usage.cache = zlib.compress(json.dumps(totals["cache"]).encode("utf-8"))
+            known[os.path.normpath(record.path)] = totals
+            results[i] = measured[record.id] = cls.usage_dict(usage)
+        session.commit()
+        return results
+
+    @staticmethod
+    def usage_dict(usage):
+        """Convert given `DirectoryUsage` record to a dict, without its cache.
+
+        Parameters
+        ----------
+        usage : magla.db.directory_usage.DirectoryUsage
+            The usage record, or None
+
+        Returns
+        -------
+        dict or None
+            Dictionary containing `directory_id`, `bytes`, `files`, `dirs` and `measured_at`
+        """
+        if usage is None:
+            return None
+        return {
+            "directory_id": usage.directory_id,
+            "bytes": usage.bytes,
+            "files": usage.files,
+            "dirs": usage.dirs,
+            "measured_at": usage.measured_at
+        }
+
+    def tree_paths(self):
+        """Flatten the tree into a list of absolute paths, parents listed before their children.
+
+        Returns
+        -------
+        list of str
+            The absolute path of every directory described by the tree
+        """
+        return [os.path.join(self.path, path) for path in self.compile_tree(self.tree)]
+
+    @classmethod
+    def compile_tree(cls, tree):
+        """Flatten given tree into relative paths, caching the result by the tree's content.
+
+        Trees usually come from project settings and are shared by every shot or shot version of
+        the project, so each distinct tree is only walked once. Changing the settings changes the
+        content and therefore the cache entry.
+
+        Parameters
+        ----------
+        tree : list
+            The nested directory tree, as stored in `tree` or project settings
+
+        Returns
+        -------
+        tuple of str
+            The relative path of every directory described by the tree, parents listed before
+            their children
+        """
+        return cls._compile_tree_json(json.dumps(tree or []))
+
+    @classmethod
+    @functools.lru_cache(maxsize=256)
+    def _compile_tree_json(cls, tree_json):
+        """Flatten the `JSON`-serialized tree. See `compile_tree`."""
+        paths = []
+        cls._flatten_tree("", json.loads(tree_json), paths)
+        return tuple(paths)
+
+    @classmethod
+    def _flatten_tree(cls, root, sub_tree, paths):
+        """Recursively collect the absolute paths of the directory tree.
 
         Parameters
         ----------
@@ -231,22 +897,159 @@ class MaglaDirectory(MaglaEntity):
             The root directory of the current recursion loop.
         sub_tree : list
             The nested directies if any
+        paths : list
+            The list to append collected paths to
         """
         for dict_ in sub_tree:
-            k, v = list(dict_.items())[0]
-            abs_path = os.path.join(root, k)
-            print("making: {}".format(abs_path))
-            try:
-                os.makedirs(abs_path, exist_ok=False)
-            except OSError as e:
-                if e.errno == 17:  # `FileExistsError`
-                    continue
-            if v:
-                self._recursive_make_tree(root=os.path.join(root, k), sub_tree=v)
+            for k, v in dict_.items():
+                abs_path = os.path.join(root, k)
+                paths.append(abs_path)
+                if v:
+                    cls._flatten_tree(abs_path, v, paths)
 
-    def delete_tree(self):
-        try:
+    @staticmethod
+    def _missing_paths(paths):
+        """Filter given paths down to those which do not exist, listing each parent only once.
+
+        Parameters
+        ----------
+        paths : list of str
+            Absolute paths, parents listed before their children
+
+        Returns
+        -------
+        list of str
+            The paths which do not exist, in the order given
+        """
+        listings = {}
+        missing = []
+        for path in paths:
+            parent, name = os.path.split(os.path.normpath(path))
+            if parent not in listings:
+                try:
+                    with os.scandir(parent) as entries:
+                        listings[parent] = set(entry.name for entry in entries)
+                except (FileNotFoundError, NotADirectoryError):
+                    listings[parent] = set()
+            if name not in listings[parent]:
+                missing.append(path)
+                # anything below a missing path is missing too, no need to list it
+                listings[os.path.normpath(path)] = set()
+        return missing
+
+    def delete_tree(self, background=False, max_files_per_second=None):
+        """Delete the directory tree from the machine's filesystem.
+
+        With `background` the tree is moved to the trash directory of its volume with a single
+        rename, and deleted by a background thread at a limited rate so the fileserver isn't
+        saturated. The trash directory and how it is chosen are described in
+        `magla.utils.move_to_trash`. Trees which are still in the trash when the process exits
+        are logged, and can be reclaimed later with `empty_trash`.
+
+        Parameters
+        ----------
+        background : bool, optional
+            Flag for returning as soon as the tree is moved to the trash, by default False
+        max_files_per_second : int, optional
+            Deletion rate of the background thread, by default None (`TRASH_FILES_PER_SECOND`)
+
+        Returns
+        -------
+        str or None
+            The path of the tree inside the trash directory if `background` was given
+        """
+        if not background:
             shutil.rmtree(self.path)
-        except OSError:
-            raise
-        sys.stdout.write("Deleted directory tree at: '{0}'".format(self.path))
+            sys.stdout.write("Deleted directory tree at: '{0}'".format(self.path))
+            return None
+        trash_path = move_to_trash(self.path)
+        self._queue_trash(trash_path, max_files_per_second)
+        sys.stdout.write("Moved directory tree at: '{0}' to trash: '{1}'".format(
+            self.path, trash_path))
+        return trash_path
+
+    @classmethod
+    def empty_trash(cls, path, max_files_per_second=None):
+        """Queue everything left in the trash directory of the volume containing given path.
+
+        Paths already queued for the background thread are not queued again.
+
+        Parameters
+        ----------
+        path : str
+            Any path on the volume, or the trash directory itself
+        max_files_per_second : int, optional
+            Deletion rate of the background thread, by default None (`TRASH_FILES_PER_SECOND`)
+
+        Returns
+        -------
+        list of str
+            The newly queued trash paths
+        """
+        trash_dir = path if os.path.basename(os.path.normpath(path)) == TRASH_DIR_NAME \
+            else os.path.join(mount_point(path), TRASH_DIR_NAME)
+        try:
+            with os.scandir(trash_dir) as entries:
+                trash_paths = sorted(entry.path for entry in entries)
+        except FileNotFoundError:
+            return []
+        return [trash_path for trash_path in trash_paths
+                if cls._queue_trash(trash_path, max_files_per_second)]
+
+    @classmethod
+    def wait_for_trash(cls):
+        """Block until the background thread has deleted everything queued so far."""
+        cls._trash_queue.join()
+
+    @classmethod
+    def _queue_trash(cls, trash_path, max_files_per_second=None):
+        """Queue given trash path for deletion, starting the background thread if needed.
+
+        Paths which are pending already are skipped, so nothing is deleted twice.
+
+        Returns
+        -------
+        bool
+            True if the path was queued
+        """
+        trash_path = os.path.normpath(trash_path)
+        with cls._trash_lock:
+            if trash_path in cls._trash_pending:
+                return False
+            cls._trash_pending.add(trash_path)
+            cls._trash_queue.put((trash_path, max_files_per_second or cls.TRASH_FILES_PER_SECOND))
+            if cls._trash_reaper is None:
+                atexit.register(cls._report_pending_trash)
+            if cls._trash_reaper is None or not cls._trash_reaper.is_alive():
+                # daemon so pending deletes never keep the process alive, see `empty_trash`
+                cls._trash_reaper = threading.Thread(
+                    target=cls._reap_trash, name="magla-trash-reaper", daemon=True)
+                cls._trash_reaper.start()
+        return True
+
+    @classmethod
+    def _report_pending_trash(cls):
+        """Log the trash paths which weren't deleted yet, as the process exits."""
+        with cls._trash_lock:
+            pending = sorted(cls._trash_pending)
+        if pending:
+            logging.warning(
+                "{0} trash path(s) were not deleted before exiting, reclaim them with "
+                "`MaglaDirectory.empty_trash`:\n  {1}".format(len(pending), "\n  ".join(pending)))
+
+    @classmethod
+    def _reap_trash(cls):
+        """Delete queued trash paths one at a time, for as long as the process runs."""
+        while True:
+            trash_path, max_files_per_second = cls._trash_queue.get()
+            try:
+                if os.path.isdir(trash_path) and not os.path.islink(trash_path):
+                    remove_tree(trash_path, max_files_per_second)
+                elif os.path.lexists(trash_path):
+                    os.remove(trash_path)
+            except OSError as err:
+                logging.warning("Failed to delete trash '{0}': {1}".format(trash_path, err))
+            finally:
+                with cls._trash_lock:
+                    cls._trash_pending.discard(trash_path)
+                cls._trash_queue.task_done()
@@ -1,4 +1,6 @@
 """Entity is the root class connecting `core` objects to their backend equivilent. """
+import importlib
+import os
 from pprint import pformat
 
 from ..db import ORM
@@ -22,6 +24,28 @@ class MaglaEntity(object):
     """
     _ORM = ORM
     _orm = None
+    # whether instances read their data through `MaglaData._cache` (see `magla.core.cache`)
+    __cacheable__ = False
+    # registered sub-entity types by name and the `magla.core` module defining each, imported the
+    # first time the type is needed (see `type`)
+    __types__ = {}
+    _TYPE_MODULES = {
+        "Assignment": "assignment",
+        "Directory": "directory",
+        "Facility": "facility",
+        "Machine": "machine",
+        "Project": "project",
+        "Context": "context",
+        "Settings2D": "settings_2d",
+        "Shot": "shot",
+        "ShotVersion": "shot_version",
+        "Timeline": "timeline",
+        "Tool": "tool",
+        "ToolConfig": "tool_config",
+        "ToolVersion": "tool_version",
+        "ToolVersionInstallation": "tool_version_installation",
+        "User": "user"
+    }
 
     def __init__(self, data=None, **kwargs):
         """Initialize with model definition, data, and supplimental kwargs as key-value pairs.
@@ -40,7 +64,7 @@ class MaglaEntity(object):
         """
         self.connect()
         if isinstance(data, dict):
-            data = MaglaData(self.__schema__, data, self.orm.session)
+            data = MaglaData(self.__schema__, data, self.orm.session, cache=self.__cacheable__)
         if not isinstance(data, MaglaData):
             raise BadArgumentError("First argument must be a MaglaData object or python dict. \n"
                                    "Received: \n\t{received} ({type_received})".format(
@@ -160,7 +184,23 @@ class MaglaEntity(object):
         magla.core.entity.Entity
             The sub-classed entity (defined in 'magla/db/')
         """
-        return cls.__types__[name]
+        types = MaglaEntity.__types__
+        if name not in types:
+            module = importlib.import_module(
+                ".{0}".format(MaglaEntity._TYPE_MODULES[name]), __package__)
+            types[name] = getattr(module, "Magla{0}".format(name))
+        return types[name]
+
+    @classmethod
+    def types(cls):
+        """Retrieve all registered sub-entity types, importing any not imported yet.
+
+        Returns
+        -------
+        dict
+            The sub-classed entities by name
+        """
+        return dict((name, cls.type(name)) for name in MaglaEntity._TYPE_MODULES)
 
     @classmethod
     def connect(cls):
@@ -168,3 +208,5 @@ class MaglaEntity(object):
         if not cls._orm:
             cls._orm = cls._ORM()
             cls._orm.init()
+            if os.getenv("MAGLA_CACHE_LISTEN") and cls._ORM.CONFIG["dialect"] == "postgres":
+                MaglaData._cache.listen(cls._orm._Engine)
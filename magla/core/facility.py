@@ -10,6 +10,7 @@ class MaglaFacilityError(MaglaError):
 class MaglaFacility(MaglaEntity):
     """Provide an interface for Facility-level administrative tasks."""
     __schema__ = Facility
+    __cacheable__ = True
 
     def __init__(self, data=None, **kwargs):
         """Initialize with given data.
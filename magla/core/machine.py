@@ -10,7 +10,7 @@ the current MAC address. Keep in mind this method is not 100% reliable but more
 import uuid
 
 from ..db.machine import Machine
-from ..utils import get_machine_uuid
+from ..utils import MachineConfigNotFoundError, get_machine_uuid, write_machine_uuid
 from .entity import MaglaEntity
 from .errors import MaglaError
 
@@ -32,11 +32,33 @@ class MaglaMachine(MaglaEntity):
             Data to query for matching backend record
         """
         if not data and not kwargs:
-            data = {"uuid": get_machine_uuid()}
+            data = {"uuid": self.current_uuid()}
         elif isinstance(data, uuid.UUID) or isinstance(data, str):
             data = {"uuid": str(data)}
         super(MaglaMachine, self).__init__(data or dict(kwargs))
 
+    @classmethod
+    def current_uuid(cls, refresh=False):
+        """Retrieve the uuid of the current machine, writing a new one if it has none yet.
+
+        The `machine.ini` file is read once per process, see `magla.utils.get_machine_uuid`.
+
+        Parameters
+        ----------
+        refresh : bool, optional
+            Flag for reading `machine.ini` again, by default False
+
+        Returns
+        -------
+        str
+            Unique string identifying this machine within the `magla` ecosystem.
+        """
+        try:
+            uuid_ = get_machine_uuid(refresh=refresh)
+        except MachineConfigNotFoundError:
+            uuid_ = None
+        return uuid_ or write_machine_uuid()
+
     @property
     def id(self):
         """Retrieve id from data.
@@ -3,9 +3,12 @@
 """
 import re
 
-from opentimelineio.adapters import write_to_file
-
+from ..db.directory import Directory
+from ..db.directory_usage import DirectoryUsage
 from ..db.project import Project
+from ..db.shot import Shot
+from ..db.shot_version import ShotVersion
+from .directory import MaglaDirectory, MaglaPathTemplate
 from .entity import MaglaEntity
 from .errors import MaglaError
 from .shot import MaglaShot
@@ -104,9 +107,12 @@ class MaglaProject(MaglaEntity):
         timeline = p.timeline
 
         timeline.build(project.shots)
-        timeline.otio.write_to_file("{0}_edit.fcpxml".format(project.name))
+        timeline.write("{0}_edit.otio".format(project.name))
+
+    To write all interchange formats at once, see `export`.
     """
     __schema__ = Project
+    __cacheable__ = True
 
     def __init__(self, data=None, **kwargs):
         """Initialize with given data.
@@ -262,6 +268,110 @@ class MaglaProject(MaglaEntity):
                 break
         return MaglaShot(project_id=self.data.id, name=name)
 
+    def path_template(self, key):
+        """Retrieve the compiled `MaglaPathTemplate` for given settings key.
+
+        Templates are cached by their text, so editing the settings compiles a new one.
+
+        Parameters
+        ----------
+        key : str
+            The settings key of a path containing string-formatting tokens, e.g. 'shot_directory'
+
+        Returns
+        -------
+        magla.core.directory.MaglaPathTemplate
+            The compiled template
+        """
+        return MaglaPathTemplate.compile(self.settings[key])
+
+    def verify_trees(self, repair=False, max_workers=None):
+        """Verify the directory trees of this project and all its shots and shot versions.
+
+        The directory records are fetched with two queries and verified together, see
+        `MaglaDirectory.verify_many`.
+
+        Parameters
+        ----------
+        repair : bool, optional
+            Flag for creating the missing directories, by default False
+        max_workers : int, optional
+            Maximum number of directories to list at once, by default None (16)
+
+        Returns
+        -------
+        list of dict
+            Report per directory containing `path`, `skipped`, `missing`, `extra` and `repaired`
+        """
+        project_directory, shot_directories, shot_version_directories = \
+            self._directory_records()
+        directories = [project_directory] if project_directory else []
+        return MaglaDirectory.verify_many(
+            directories + [record for _, record in shot_directories]
+            + [record for _, record in shot_version_directories],
+            repair=repair,
+            max_workers=max_workers)
+
+    def disk_usage(self, measure=False, full=False, max_workers=None):
+        """Retrieve the disk usage of this project, its shots and its shot versions.
+
+        Parameters
+        ----------
+        measure : bool, optional
+            Flag for measuring all directories first instead of reading the last stored usage,
+            see `MaglaDirectory.measure_many`, by default False
+        full : bool, optional
+            Flag for listing every directory instead of trusting the caches, by default False
+        max_workers : int, optional
+            Maximum number of directories to list at once, by default None (16)
+
+        Returns
+        -------
+        dict
+            Dictionary containing the `project` usage, and `shots` and `shot_versions` dicts of
+            usage keyed by entity id. See `MaglaDirectory.usage`
+        """
+        project_directory, shot_directories, shot_version_directories = \
+            self._directory_records()
+        owners = [("project", None, project_directory)] if project_directory else []
+        owners += [("shots", id_, record) for id_, record in shot_directories]
+        owners += [("shot_versions", id_, record) for id_, record in shot_version_directories]
+        if measure:
+            usages = MaglaDirectory.measure_many(
+                [record for _, _, record in owners], full=full, max_workers=max_workers)
+        else:
+            by_directory = dict(
+                (usage.directory_id, MaglaDirectory.usage_dict(usage))
+                for usage in self.orm.session.query(DirectoryUsage).filter(
+                    DirectoryUsage.directory_id.in_([record.id for _, _, record in owners])))
+            usages = [by_directory.get(record.id) for _, _, record in owners]
+        result = {"project": None, "shots": {}, "shot_versions": {}}
+        for (kind, id_, _), usage in zip(owners, usages):
+            if kind == "project":
+                result["project"] = usage
+            else:
+                result[kind][id_] = usage
+        return result
+
+    def _directory_records(self):
+        """Retrieve the `Directory` records of this project, its shots and shot versions.
+
+        Returns
+        -------
+        tuple
+            The project's `Directory` record (or None), a list of (`shot_id`, `Directory`) and a
+            list of (`shot_version_id`, `Directory`)
+        """
+        session = self.orm.session
+        shot_directories = session.query(Shot.id, Directory).join(
+            Shot, Shot.directory_id == Directory.id).filter(
+                Shot.project_id == self.id).order_by(Shot.id).all()
+        shot_version_directories = session.query(ShotVersion.id, Directory).join(
+            ShotVersion, ShotVersion.directory_id == Directory.id).join(
+                Shot, ShotVersion.shot_id == Shot.id).filter(
+                    Shot.project_id == self.id).order_by(ShotVersion.id).all()
+        return self.data.record.directory, shot_directories, shot_version_directories
+
     def add_shot(self, name, callback):
         return callback(project_id=self.id, name=name)
 
@@ -307,16 +417,43 @@ class MaglaProject(MaglaEntity):
             return None
         return current_project_configs[-1]
 
-    def export_otio(self, export_dir, shots):
-        """Convenience method to call `opentimelineio.adapters.write_to_file`
+    def export_otio(self, export_path, shots=None, adapter_name=None):
+        """Build the timeline and write it to given filepath using `opentimelineio` adapters.
 
         Parameters
         ----------
-        export_dir : str
+        export_path : str
             The filepath to export to
+        shots : list, optional
+            List of shots to build timeline with, by default None
+        adapter_name : str, optional
+            The `opentimelineio` adapter to use, by default None (inferred from file extension)
+
+        Returns
+        -------
+        str
+            The path that was written
+        """
+        return self.build_timeline(shots).write(export_path, adapter_name)
+
+    def export(self, export_dir, shots=None, formats=None, max_workers=None):
+        """Build the timeline once and write it to given directory in multiple formats concurrently.
+
+        Parameters
+        ----------
+        export_dir : str
+            The directory to export to
+        shots : list, optional
+            List of shots to build timeline with, by default None
+        formats : list, optional
+            Names of formats in `MaglaTimeline.EXPORT_FORMATS`, by default None (all of them)
+        max_workers : int, optional
+            Maximum number of formats to write at once, by default None (one per format)
+
+        Returns
+        -------
+        dict
+            Dictionary mapping each format name to its written path
         """
-        t = self.timeline
-        timeline_otio = t.build(shots).otio
-        # library might be broken here
-        # write_to_file(timeline_otio, export_dir, "fcp_xml")
-        return export_dir
+        timeline = self.build_timeline(shots)
+        return timeline.export(export_dir, formats, name=self.name, max_workers=max_workers)
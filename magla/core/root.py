@@ -4,18 +4,18 @@ You may use this file as is for creation, or customize your own creation methods
 here is creating and commiting `SQLAlchemy` objects to `ORM.session` using compound custom
 creation methods for convenience.
 """
+import logging
 import os
 import re
-import shutil
-import sys
 
 import opentimelineio as otio
 
-from ..utils import otio_to_dict, otio_to_dict, write_machine_uuid
+from ..trace import traced
+from ..utils import copy_file, copy_files, otio_to_dict, write_machine_uuid
 from .assignment import MaglaAssignment
 from .context import MaglaContext
 from .data import NoRecordFoundError
-from .directory import MaglaDirectory
+from .directory import MaglaDirectory, MaglaPathTemplate
 from .entity import MaglaEntity
 from .errors import MaglaError
 from .facility import MaglaFacility
@@ -45,6 +45,7 @@ class MaglaRoot(object):
     def __init__(self, *args, **kwargs):
         MaglaEntity.connect()
         self._permissions = None
+        self._machine = None
 
     def __repr__(self):
         return "<MaglaRoot: database={database}>".format(database=self.orm.session.bind.url)
@@ -53,6 +54,31 @@ class MaglaRoot(object):
     def orm(self):
         return MaglaEntity._orm
 
+    @property
+    def machine(self):
+        """Retrieve the `MaglaMachine` of the current machine, only querying for it once.
+
+        Returns
+        -------
+        magla.core.machine.MaglaMachine
+            The current machine
+        """
+        if self._machine is None or self._machine.data.uuid != MaglaMachine.current_uuid():
+            self._machine = MaglaMachine()
+        return self._machine
+
+    def refresh_machine(self):
+        """Read the current machine's `machine.ini` again and retrieve its `MaglaMachine`.
+
+        Returns
+        -------
+        magla.core.machine.MaglaMachine
+            The current machine
+        """
+        MaglaMachine.current_uuid(refresh=True)
+        self._machine = None
+        return self.machine
+
     def all(self, entity=None):
         """Retrieve all records for given `Entity`-type.
 
@@ -70,12 +96,12 @@ class MaglaRoot(object):
             return self.orm.all(entity)
         db_dump = []
         # return a list of everything currently in the backend
-        for entity_ in MaglaEntity.__types__.values():
+        for entity_ in MaglaEntity.types().values():
             db_dump.append(self.orm.all(entity_))
         return db_dump
 
     @staticmethod
-    def copy(src, dst):
+    def copy(src, dst, strategy="auto"):
         """Perform a filesystem copy on a single file.
 
         Parameters
@@ -84,16 +110,15 @@ class MaglaRoot(object):
             Path to the source file to copy
         dst : str
             Path to the destination file to save as
+        strategy : str, optional
+            How to duplicate the file (see `magla.utils.copy_file`), by default "auto"
+
+        Returns
+        -------
+        dict
+            The copy result (see `magla.utils.copy_file`)
         """
-        try:
-            shutil.copy2(src, dst)
-            sys.stdout.write("\n\t{src} --> {dst}".format(
-                src=os.path.basename(src),
-                dst=os.path.basename(dst))
-            )
-        except FileNotFoundError:
-            sys.stdout.write("\n\t{src} not found, skipping..".format(
-                src=os.path.basename(src)))
+        return copy_file(src, dst, strategy)
 
     def create(self, entity, data=None, return_existing=True):
         """Wrapper for `ORM.create` with configurable return signature.
@@ -228,7 +253,7 @@ class MaglaRoot(object):
         new_directory = self.create(MaglaDirectory, {
             "path": project_path or project_settings_project_dir.format(project=new_project),
             "tree": settings.get("project_directory_tree", []),
-            "machine_id": MaglaMachine().id
+            "machine_id": self.machine.id
         })
         # set project's `directory_id` relationship
         new_project.data.directory_id = new_directory.id
@@ -238,6 +263,312 @@ class MaglaRoot(object):
         new_project.directory.make_tree()
         return new_project
 
+    def create_project_from_otio(
+            self,
+            otio_timeline,
+            project_path,
+            settings,
+            project_name=None,
+            create_versions=True,
+            **kwargs):
+        """Create a new `MaglaProject` and all its shots from an existing edit.
+
+        Every `opentimelineio.schema.Clip` in the given timeline becomes a `MaglaShot` with its
+        `otio`, `track_index` and `start_frame_in_parent` taken from the edit. The project, its
+        timeline, all shots, their versions and all their directories are committed in a single
+        transaction, which is rolled back if anything fails, and only then are the directory trees
+        made on disk.
+
+        associated types created:
+            - `MaglaTimeline`
+            - `MaglaDirectory`
+            - `MaglaShot`
+            - `MaglaShotVersion` (if `create_versions`)
+
+        Parameters
+        ----------
+        otio_timeline : str or opentimelineio.schema.Timeline
+            Path to a timeline file readable by `opentimelineio`, or the timeline itself
+        project_path : str
+            Path (on server) to the project's directory
+        settings : dict
+            A dictionary of settings (see 'example.py')
+        project_name : str, optional
+            Name for new project, by default None (name of the timeline)
+        create_versions : bool, optional
+            Flag for creating the initial template version 0 of each shot, by default True
+
+        Returns
+        -------
+        magla.core.project.MaglaProject
+            `MaglaProject` object populated with newly created backend data
+        """
+        if not isinstance(otio_timeline, otio.schema.Timeline):
+            otio_timeline = otio.adapters.read_from_file(otio_timeline)
+        shot_directory = MaglaPathTemplate.compile(settings["shot_directory"])
+        shot_directory_tree = settings.get("shot_directory_tree", [])
+        machine_id = self.machine.id
+        # a new project has no 2d settings yet, so its versions take the rate of the edit
+        rate = otio_timeline.duration().rate
+
+        session = self.orm.session
+        try:
+            project_record = self.__stage_project(
+                project_name or otio_timeline.name, project_path, settings, otio_timeline,
+                machine_id, **kwargs)
+            project = MaglaProject(id=project_record.id)
+            shot_records = []
+            shot_names = set()
+            for track_index, clip, start_time in MaglaTimeline.clip_placements(otio_timeline):
+                if clip.name in shot_names:
+                    logging.warning("Skipping duplicate clip '{0}' on track {1}".format(
+                        clip.name, track_index))
+                    continue
+                shot_records.append(self.__stage_shot(
+                    project_record, clip.name, otio_to_dict(clip), track_index,
+                    int(round(start_time.value)), shot_directory, shot_directory_tree,
+                    machine_id))
+                shot_names.add(clip.name)
+            # nor any tool configs, so versions only get the trees of the project's settings
+            version_records = [
+                self.__stage_shot_version(shot_record, 0, project, rate, [], machine_id)
+                for shot_record in shot_records] if create_versions else []
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+        for record in [project_record] + shot_records + version_records:
+            MaglaDirectory.from_record(record.directory).make_tree()
+        return project
+
+    def __stage_project(self, name, project_path, settings, otio_timeline, machine_id, **kwargs):
+        """Add the records of a new project, its timeline and its directory to the session.
+
+        Bulk counterpart of `create_project`, nothing is committed.
+
+        Parameters
+        ----------
+        name : str
+            Name for new project
+        project_path : str
+            Path (on server) to the project's directory, by default the project's
+            'project_directory' setting
+        settings : dict
+            A dictionary of settings (see 'example.py')
+        otio_timeline : opentimelineio.schema.Timeline
+            The project's timeline
+        machine_id : int
+            The `MaglaMachine` the project's directory is on
+
+        Returns
+        -------
+        magla.db.project.Project
+            The pending record
+        """
+        session = self.orm.session
+        project_record = MaglaProject.__schema__(name=name, settings=settings, **kwargs)
+        session.add(project_record)
+        # the timeline's label and the directory template need a persisted record
+        session.flush()
+        project_record.timeline = MaglaTimeline.__schema__(
+            label="Timeline for `project_id`: {0}".format(project_record.id),
+            otio=otio_to_dict(otio_timeline))
+        project_record.directory = MaglaDirectory.__schema__(
+            path=project_path or settings["project_directory"].format(
+                project=MaglaProject(id=project_record.id)),
+            tree=settings.get("project_directory_tree", []),
+            machine_id=machine_id)
+        session.flush()
+        return project_record
+
+    def __stage_shot(
+            self,
+            project_record,
+            name,
+            otio_dict,
+            track_index,
+            start_frame,
+            shot_directory,
+            shot_directory_tree,
+            machine_id):
+        """Add the record of a new shot and its directory to the session without committing.
+
+        Parameters
+        ----------
+        project_record : magla.db.project.Project
+            The parent project's record
+        name : str
+            Name of the new shot
+        otio_dict : dict
+            The shot's `opentimelineio.schema.Clip` as a dict
+        track_index : int
+            The 1-based index of the shot's track in the project timeline
+        start_frame : int
+            The shot's start frame in its track
+        shot_directory : magla.core.directory.MaglaPathTemplate
+            The compiled 'shot_directory' template of the project
+        shot_directory_tree : list
+            The directory tree of shots
+        machine_id : int
+            The `MaglaMachine` the shot's directory is on
+
+        Returns
+        -------
+        magla.db.shot.Shot
+            The pending record
+        """
+        session = self.orm.session
+        shot_record = MaglaShot.__schema__(
+            name=name,
+            otio=otio_dict,
+            track_index=track_index,
+            start_frame_in_parent=start_frame)
+        shot_record.project = project_record
+        session.add(shot_record)
+        try:
+            path = shot_directory.format(shot=shot_record)
+        except AttributeError:
+            # template uses `MaglaShot` attributes which need a persisted record
+            session.flush()
+            path = shot_directory.format(shot=MaglaShot.from_record(shot_record))
+        shot_record.directory = MaglaDirectory.__schema__(
+            path=path,
+            tree=shot_directory_tree,
+            machine_id=machine_id)
+        return shot_record
+
+    def __stage_shot_version(self, shot_record, num, project, rate, tool_directories, machine_id):
+        """Add the record of a new shot version and its directory to the session without committing.
+
+        Bulk counterpart of `create_shot_version` for shots which have no previous versions.
+
+        Parameters
+        ----------
+        shot_record : magla.db.shot.Shot
+            The parent shot's record, which may not be committed yet
+        num : int
+            Version-number to create
+        project : magla.core.project.MaglaProject
+            The shot's project
+        rate : float
+            The frame rate of the project
+        tool_directories : list of magla.core.directory.MaglaDirectory
+            The directories of the project's tool configs
+        machine_id : int
+            The `MaglaMachine` the version's directory is on
+
+        Returns
+        -------
+        magla.db.shot_version.ShotVersion
+            The pending record
+        """
+        session = self.orm.session
+        settings = project.settings
+        version_record = MaglaShotVersion.__schema__(num=num)
+        version_record.shot = shot_record
+        session.add(version_record)
+        # templates may use `MaglaShotVersion` attributes which need a persisted record
+        session.flush()
+        shot_version = MaglaShotVersion.from_record(version_record)
+
+        tree = list(settings.get("shot_version_directory_tree", []))
+        bookmarks = settings.get("shot_version_bookmarks", {})
+        # tool config directories are shared by all versions and left untouched, project files are
+        # resolved per version from their bookmarks (see `MaglaDirectory.resolve_bookmark`)
+        for directory in tool_directories:
+            tool_subdir = MaglaPathTemplate.compile(directory.path).format(
+                shot_version=shot_version)
+            tree.append({tool_subdir: directory.tree})
+        version_record.directory = MaglaDirectory.__schema__(
+            path=project.path_template("shot_version_directory").format(
+                shot_version=shot_version),
+            machine_id=machine_id,
+            tree=tree,
+            bookmarks=bookmarks)
+
+        # set the `media_reference` the same way as `create_shot_version`
+        reference = MaglaPathTemplate.compile(bookmarks["png_representation"]).format(
+            shot_version=shot_version)
+        prefix, padding, suffix = re.match(
+            settings["frame_sequence_re"], os.path.basename(reference)).groups()
+        media_reference = otio.schema.ImageSequenceReference(
+            available_range=otio.opentime.TimeRange(
+                start_time=otio.opentime.RationalTime(1, rate),
+                duration=otio.opentime.RationalTime(1, rate)))
+        media_reference.target_url_base = os.path.dirname(reference)
+        media_reference.name_prefix = prefix
+        media_reference.name_suffix = suffix
+        media_reference.frame_zero_padding = padding.count("#")
+        media_reference.rate = rate
+        version_record.otio = otio_to_dict(media_reference)
+        return version_record
+
+    def apply_timeline_diff(self, project_id, changes):
+        """Apply a change set from `MaglaTimeline.diff` to the shots of given project.
+
+        `added` shots are created with their initial version 0, and `moved` and `retimed` shots
+        get their `track_index`, `start_frame_in_parent` and trimmed range updated, all in a single
+        commit after which the directory trees of the new shots are made. `added` shots which
+        already exist in the project (for example re-added after being removed from the edit) are
+        updated instead. `removed` shots are left untouched since shots and their versions are
+        never deleted implicitly.
+
+        Parameters
+        ----------
+        project_id : int
+            The `MaglaProject` the change set was computed for
+        changes : dict
+            The change set returned by `MaglaTimeline.diff`
+
+        Returns
+        -------
+        list of magla.core.shot.MaglaShot
+            The shots which were created
+        """
+        project = MaglaProject(id=project_id)
+        added = [entry for entry in changes["added"] if entry["shot_id"] is None]
+        settings = project.settings
+        settings_2d = project.settings_2d
+        machine_id = self.machine.id
+        tool_directories = [tool_config.directory for tool_config in project.tool_configs] \
+            if added else []
+
+        session = self.orm.session
+        shot_records = []
+        version_records = []
+        for entry in added:
+            otio_ = otio_to_dict(otio.schema.Clip(name=entry["name"]))
+            otio_["source_range"] = entry["clip"]["source_range"]
+            shot_record = self.__stage_shot(
+                project.data.record, entry["name"], otio_, entry["track_index"],
+                entry["start_frame"], project.path_template("shot_directory"),
+                settings.get("shot_directory_tree", []), machine_id)
+            shot_records.append(shot_record)
+            version_records.append(self.__stage_shot_version(
+                shot_record, 0, project, settings_2d.rate if settings_2d else entry["rate"],
+                tool_directories, machine_id))
+
+        updates = {}
+        for entry in changes["moved"] + changes["retimed"] + changes["added"]:
+            if entry["shot_id"] is not None:
+                updates.setdefault(entry["shot_id"], {}).update(entry)
+        records = session.query(MaglaShot.__schema__).filter(
+            MaglaShot.__schema__.id.in_(list(updates))).all() if updates else []
+        for record in records:
+            entry = updates[record.id]
+            record.track_index = entry["track_index"]
+            record.start_frame_in_parent = entry["start_frame"]
+            if "clip" in entry:
+                otio_ = dict(record.otio or {})
+                otio_["source_range"] = entry["clip"]["source_range"]
+                record.otio = otio_
+        session.commit()
+
+        for record in shot_records + version_records:
+            MaglaDirectory.from_record(record.directory).make_tree()
+        return [MaglaShot.from_record(record) for record in shot_records]
+
     def create_shot(self, project_id, name, machine_id=None):
         """Create record for new `MaglaShot` and associated types.
 
@@ -269,11 +600,10 @@ class MaglaRoot(object):
                 "otio": otio_to_dict(otio.schema.Clip(name=name))
             })
             # generate the `shot` path from `custom_project_settings`
-            project_settings_shot_dir = new_shot.project.settings["shot_directory"]
             new_directory = self.create(MaglaDirectory, {
-                "path": project_settings_shot_dir.format(shot=new_shot),
+                "path": project.path_template("shot_directory").format(shot=new_shot),
                 "tree": project.settings.get("shot_directory_tree", []),
-                "machine_id": MaglaMachine(machine_id).id
+                "machine_id": machine_id or self.machine.id
             })
             new_shot.data.directory_id = new_directory.id
             new_shot.data.push()
@@ -308,17 +638,23 @@ class MaglaRoot(object):
             "num": num
         })
 
+        # relationships are resolved once here rather than on every settings access below
+        project = shot.project
+        settings = project.settings
+        rate = project.settings_2d.rate
+
         # First we must retrieve and append all tool subtree information for current `Project`
-        tree = shot.project.settings.get("shot_version_directory_tree", {})
-        bookmarks = shot.project.settings.get("shot_version_bookmarks", {})
-        for tool_config in shot.project.tool_configs:
+        # copied so the tool subtrees don't get appended to the project's own settings
+        tree = list(settings.get("shot_version_directory_tree", []))
+        bookmarks = settings.get("shot_version_bookmarks", {})
+        for tool_config in project.tool_configs:
             # make sure each tool configured for this project gets its subdirectory tree created
             directory_to_update = tool_config.directory
-            tool_project_file_path = \
-                directory_to_update.bookmark("project_file").format(
+            tool_project_file_path = MaglaPathTemplate.compile(
+                directory_to_update.bookmark("project_file")).format(
                     shot_version=new_shot_version)
-            tool_subdir = \
-                directory_to_update.path.format(shot_version=new_shot_version)
+            tool_subdir = MaglaPathTemplate.compile(
+                directory_to_update.path).format(shot_version=new_shot_version)
             directory_to_update.data.bookmarks["project_file"] = tool_project_file_path
             directory_to_update.data.push()
             tree.append({tool_subdir: directory_to_update.tree})
@@ -327,9 +663,9 @@ class MaglaRoot(object):
         # for tool_config in shot.project.tool_configs:
         # then create a `Directory` record
         new_directory = self.create(MaglaDirectory, {
-            "path": shot.project.settings["shot_version_directory"].format(
+            "path": project.path_template("shot_version_directory").format(
                 shot_version=new_shot_version),
-            "machine_id": MaglaMachine().id,
+            "machine_id": self.machine.id,
             "tree": tree,
             "bookmarks": bookmarks
         })
@@ -338,12 +674,12 @@ class MaglaRoot(object):
         new_shot_version.data.push()
 
         # now we can set the `media_reference`
-        reference = new_directory.bookmarks["png_representation"].format(
+        reference = MaglaPathTemplate.compile(new_directory.bookmarks["png_representation"]).format(
             shot_version=new_shot_version
         )
 
         # construct an opentimelineio.schema.ImageSequenceReference using project settings
-        regex = shot.project.settings["frame_sequence_re"]
+        regex = settings["frame_sequence_re"]
         match = re.match(regex, os.path.basename(reference))
         # `frame_sequence_re` groups must comform to `opentimelineio` prefix/padding/suffix format
         prefix, padding, suffix = match.groups()
@@ -353,18 +689,16 @@ class MaglaRoot(object):
         # if there's no previous otio data to go from default to a still frame
         new_shot_version.data.otio = previous_shot_otio or otio.schema.ImageSequenceReference(
             available_range=otio.opentime.TimeRange(
-                start_time=otio.opentime.RationalTime(
-                    1, shot.project.settings_2d.rate),
-                duration=otio.opentime.RationalTime(
-                    1, shot.project.settings_2d.rate)
+                start_time=otio.opentime.RationalTime(1, rate),
+                duration=otio.opentime.RationalTime(1, rate)
             )
         )
         # apply `otio`
-        new_shot_version.data.otio.target_url_Base = os.path.dirname(reference)
+        new_shot_version.data.otio.target_url_base = os.path.dirname(reference)
         new_shot_version.data.otio.name_prefix = prefix
         new_shot_version.data.otio.name_suffix = suffix
         new_shot_version.data.otio.frame_zero_padding = padding.count("#")
-        new_shot_version.data.otio.rate = shot.project.settings_2d.rate
+        new_shot_version.data.otio.rate = rate
 
         new_shot_version.data.push()
         new_shot_version.directory.make_tree()
@@ -428,12 +762,12 @@ class MaglaRoot(object):
         # check if a `tool_version_installations` record already exists for given `install_dir`
         try:
             tool_version_installation = MaglaToolVersionInstallation(
-                directory_id=MaglaDirectory(machine_id=MaglaMachine().id, path=install_dir).id)
+                directory_id=MaglaDirectory(machine_id=self.machine.id, path=install_dir).id)
         except NoRecordFoundError:
             if machine_id:
                 machine = MaglaMachine(id=machine_id)
             else:
-                machine = MaglaMachine()
+                machine = self.machine
             # create/retrieve a MaglaDirectory object required for record creation
             install_directory = self.create(MaglaDirectory, {
                 "path": install_dir,
@@ -518,7 +852,7 @@ class MaglaRoot(object):
             project.settings["shot_version_directory"],
             tool_subdir.format(tool_version=tool_version, project=project))
         directory = self.create(MaglaDirectory, {
-            "machine_id": machine_id or MaglaMachine().id,
+            "machine_id": machine_id or self.machine.id,
             "label": "{tool_version.full_name} subdirectory.".format(
                 tool_version=tool_version),
             "path": tool_subdir_abspath,
@@ -540,7 +874,7 @@ class MaglaRoot(object):
                             exe_path,
                             machine_id=None,
                             file_extension=None):
-        machine_id = machine_id or MaglaMachine().id
+        machine_id = machine_id or self.machine.id
         # check if a `tool_versions` record already exists for given `version_string`
         try:
             tool_version = MaglaToolVersion(
@@ -591,7 +925,7 @@ class MaglaRoot(object):
             data = {"nickname": data}
         new_user = self.create(MaglaUser, data)
         # create default home directory for user
-        machine = MaglaMachine()
+        machine = self.machine
         new_directory = self.create(MaglaDirectory, {
             "machine_id": machine.id,
             "user_id": new_user.id,
@@ -607,7 +941,9 @@ class MaglaRoot(object):
             pass
         return new_user
 
-    def version_up(self, shot_id, num):
+    @traced("MaglaRoot.version_up")
+    def version_up(
+            self, shot_id, num, max_workers=None, copy_strategy="auto"):
         """Create a new `MaglaShotVersion` from latest.
 
         This method is a callback not meant to be called directly
@@ -618,41 +954,84 @@ class MaglaRoot(object):
             Target `MaglaShot`
         num : int
             Version-number to create
+        max_workers : int, optional
+            Maximum number of bookmarked files to copy concurrently, by default None
+        copy_strategy : str, optional
+            How to duplicate bookmarked files (see `magla.utils.copy_file`), by default "auto"
 
         Returns
         -------
         magla.core.shot_version.MaglaShotVersion
-            `MaglaShotVersion` object populated with newly created backend data
+            `MaglaShotVersion` object populated with newly created backend data. Its
+            `copy_results` attribute lists the result of each bookmarked file copy (see
+            `magla.utils.copy_file`) so callers can tell which files were `missing` or `failed`
         """
         shot = MaglaShot(id=shot_id)
         prev_shot_version = shot.version(num-1)
         new_shot_version = self.create_shot_version(shot, num)
-        sys.stdout.write("\n{shot_version.project.name} shot {shot_version.shot.name} v{shot_version.num:03d} created successfully.".format(
-            shot_version=new_shot_version))
-        sys.stdout.write("\nCopying bookmarks...")
-        # copy shot_version bookmarks
-        self.__copy_directory(
-            src_directory=prev_shot_version.directory,
-            dst_directory=new_shot_version.directory,
-            src_vars={"shot_version": prev_shot_version},
-            dst_vars={"shot_version": new_shot_version})
+        logging.info(
+            "{shot_version.project.name} shot {shot_version.shot.name} "
+            "v{shot_version.num:03d} created successfully.".format(shot_version=new_shot_version))
+        results = self.copy_bookmarks(
+            shot, prev_shot_version, new_shot_version, max_workers, copy_strategy)
+        for result in results:
+            logging.info("{src} --> {dst}: {status} via {method} ({seconds:.3f}s)".format(
+                src=os.path.basename(result["src"]),
+                dst=os.path.basename(result["dst"]),
+                status=result["status"],
+                method=result["method"],
+                seconds=result["seconds"]))
+        new_shot_version.copy_results = results
+        return new_shot_version
+
+    def copy_bookmarks(
+            self, shot, src_shot_version, dst_shot_version, max_workers=None, strategy="auto"):
+        """Copy all bookmarked files of one shot version to the bookmarked locations of another.
+
+        Bookmarks of the shot version directory and of every `MaglaToolConfig` of the project are
+        collected first, then copied concurrently.
+
+        Parameters
+        ----------
+        shot : magla.core.shot.MaglaShot
+            The `MaglaShot` both versions belong to
+        src_shot_version : magla.core.shot_version.MaglaShotVersion
+            The shot version to copy from
+        dst_shot_version : magla.core.shot_version.MaglaShotVersion
+            The shot version to copy to
+        max_workers : int, optional
+            Maximum number of concurrent copies, by default None
+        strategy : str, optional
+            How to duplicate files (see `magla.utils.copy_file`), by default "auto"
+
+        Returns
+        -------
+        list of dict
+            The result of each file copy (see `magla.utils.copy_file`)
+        """
+        # shot_version bookmarks
+        jobs = self.__bookmark_copy_jobs(
+            src_directory=src_shot_version.directory,
+            dst_directory=dst_shot_version.directory,
+            src_vars={"shot_version": src_shot_version},
+            dst_vars={"shot_version": dst_shot_version})
         for tool_config in shot.project.tool_configs:
-            # copy tool_config  bookmarks
-            self.__copy_directory(
+            # tool_config bookmarks
+            tool_version = tool_config.tool_version
+            jobs.extend(self.__bookmark_copy_jobs(
                 src_directory=tool_config.directory,
                 dst_directory=tool_config.directory,
                 src_vars={
-                    "shot_version": prev_shot_version,
-                    "tool_version": tool_config.tool_version},
+                    "shot_version": src_shot_version,
+                    "tool_version": tool_version},
                 dst_vars={
-                    "shot_version": new_shot_version,
-                    "tool_version": tool_config.tool_version}
-            )
-        sys.stdout.write("\n")
-        return new_shot_version
+                    "shot_version": dst_shot_version,
+                    "tool_version": tool_version}
+            ))
+        return copy_files(jobs, max_workers, strategy)
 
-    def __copy_directory(self, src_directory, dst_directory, src_vars=None, dst_vars=None):
-        """Copy source directory bookmarked files to destination directory bookmarked locations.
+    def __bookmark_copy_jobs(self, src_directory, dst_directory, src_vars=None, dst_vars=None):
+        """Pair source directory bookmarked files with destination directory bookmarked locations.
 
         Parameters
         ----------
@@ -664,25 +1043,45 @@ class MaglaRoot(object):
             Variables to be used for string-formatting, by default None
         dst_vars : dict, optional
             Variables to be used for string-formatting, by default None
+
+        Returns
+        -------
+        list of tuple
+            List of (`src`, `dst`) path pairs
         """
-        for key, val in dst_directory.bookmarks.items():
-            src_preformatted = src_directory.bookmark(key).format(**src_vars)
-            dst_preformatted = dst_directory.bookmark(key).format(**dst_vars)
-            self.copy(
-                src=src_preformatted.format(**src_vars),
-                dst=dst_preformatted.format(**dst_vars)
-            )
+        keys = list(dst_directory.bookmarks)
+        # each attribute the bookmarks use is looked up once, rather than once per bookmark
+        src_vars = MaglaPathTemplate.capture(
+            [src_directory.bookmark(key) for key in keys], **(src_vars or {}))
+        dst_vars = MaglaPathTemplate.capture(
+            [dst_directory.bookmark(key) for key in keys], **(dst_vars or {}))
+        return [
+            (src_directory.resolve_bookmark(key, **src_vars),
+             dst_directory.resolve_bookmark(key, **dst_vars))
+            for key in keys]
 
     def delete(self, entity):
         self.orm.session.delete(entity)
         self.orm.session.commit()
 
-    def delete_shot_version(self, data=None, delete_files=False, **kwargs):
+    def delete_shot_version(self, data=None, delete_files=False, background=False, **kwargs):
+        """Delete the `MaglaShotVersion` record and its `MaglaDirectory` record.
+
+        Parameters
+        ----------
+        data : dict, optional
+            Data to query for the shot version to delete, by default None
+        delete_files : bool, optional
+            Flag for also deleting the directory tree from disk, by default False
+        background : bool, optional
+            Flag for moving the tree to the trash and deleting it in a background thread instead
+            of waiting for it, see `MaglaDirectory.delete_tree`, by default False
+        """
         shot_version = MaglaShotVersion(data or dict(kwargs))
         shot_version_directory = shot_version.directory
 
         if delete_files:
-            shot_version_directory.delete_tree()
+            shot_version_directory.delete_tree(background=background)
         self.delete(shot_version.data.record)
         self.delete(shot_version_directory.data.record)
 
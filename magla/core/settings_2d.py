@@ -16,6 +16,7 @@ class MaglaSettings2DError(MaglaError):
 class MaglaSettings2D(MaglaEntity):
     """Provide interface for accessing and editing 2d output settings."""
     __schema__ = Settings2D
+    __cacheable__ = True
 
     def __init__(self, data=None, **kwargs):
         """Initialize with given data.
@@ -1,7 +1,12 @@
 """Shot versions are a single collection of `subsets`, and their generated representation."""
+import os
+import re
+
 import opentimelineio as otio
 
 from ..db.shot_version import ShotVersion
+from ..utils import scan_frame_sequence
+from .directory import MaglaPathTemplate
 from .entity import MaglaEntity
 from .errors import MaglaError
 
@@ -152,3 +157,112 @@ class MaglaShotVersion(MaglaEntity):
         return "{project_name}_{shot_version_name}".format(
             project_name=self.shot.project.name,
             shot_version_name=self.name)
+
+    def frame_sequence(self, bookmark="png_representation"):
+        """Resolve given bookmark into the directory and file name parts of a frame sequence.
+
+        Parameters
+        ----------
+        bookmark : str, optional
+            The directory bookmark of the frame sequence, by default "png_representation"
+
+        Returns
+        -------
+        dict
+            Dictionary containing the `directory` of the frames, and the `prefix`, `suffix` and
+            `padding` parsed from the file name using the project's `frame_sequence_re`
+
+        Raises
+        ------
+        MaglaShotVersionError
+            Raised if the bookmark doesn't match the project's `frame_sequence_re`
+        """
+        directory = self.directory
+        reference = directory.resolve_bookmark(bookmark, **MaglaPathTemplate.capture(
+            [directory.bookmark(bookmark)], shot_version=self))
+        match = re.match(self.project.settings["frame_sequence_re"], os.path.basename(reference))
+        if not match:
+            raise MaglaShotVersionError(
+                "Bookmark '{0}' is not a frame sequence: '{1}'".format(bookmark, reference))
+        # `frame_sequence_re` groups must comform to `opentimelineio` prefix/padding/suffix format
+        prefix, padding, suffix = match.groups()
+        return {
+            "directory": os.path.dirname(reference),
+            "prefix": prefix,
+            "suffix": suffix,
+            "padding": padding.count("#")
+        }
+
+    def scan_frames(self, bookmark="png_representation", push=True):
+        """Update the media reference with the frames actually rendered on disk.
+
+        The bookmark's directory is listed once and the frame numbers parsed, see
+        `frame_sequence`. The media reference is then updated by `apply_frames`.
+
+        Parameters
+        ----------
+        bookmark : str, optional
+            The directory bookmark of the frame sequence, by default "png_representation"
+        push : bool, optional
+            Flag for pushing the updated `otio` to the backend, by default True
+
+        Returns
+        -------
+        dict
+            The result of `magla.utils.scan_frame_sequence`
+        """
+        sequence = self.frame_sequence(bookmark)
+        result = scan_frame_sequence(
+            sequence["directory"], sequence["prefix"], sequence["suffix"], sequence["padding"])
+        self.data.otio = self.apply_frames(
+            self.data.otio, sequence, result, self.project.settings_2d.rate)
+        if push:
+            self.data.push()
+        return result
+
+    @staticmethod
+    def apply_frames(media_reference, sequence, frames, rate):
+        """Set the frame sequence and frame range of given media reference.
+
+        `start_frame`, `available_range` and `target_url_base` of the `ImageSequenceReference`
+        are set to the frames found, and the gaps are stored in its metadata as
+        `magla.missing_frames`. If no frames were found the frame range is cleared, so a stale
+        range from a previous scan is never kept.
+
+        Parameters
+        ----------
+        media_reference : opentimelineio.schema.ImageSequenceReference
+            The reference to update, replaced by a new one if it is something else
+        sequence : dict
+            The frame sequence, see `frame_sequence`
+        frames : dict
+            The frames found, see `magla.utils.frame_ranges`
+        rate : float
+            Rate to use if the reference has none
+
+        Returns
+        -------
+        opentimelineio.schema.ImageSequenceReference
+            The updated reference
+        """
+        if not isinstance(media_reference, otio.schema.ImageSequenceReference):
+            media_reference = otio.schema.ImageSequenceReference()
+        rate = media_reference.rate or rate
+        media_reference.target_url_base = sequence["directory"]
+        media_reference.name_prefix = sequence["prefix"]
+        media_reference.name_suffix = sequence["suffix"]
+        media_reference.frame_zero_padding = sequence["padding"]
+        media_reference.rate = rate
+        if frames["count"]:
+            media_reference.start_frame = frames["start_frame"]
+            media_reference.available_range = otio.opentime.TimeRange(
+                start_time=otio.opentime.RationalTime(frames["start_frame"], rate),
+                duration=otio.opentime.RationalTime(
+                    frames["end_frame"] - frames["start_frame"] + 1, rate))
+        else:
+            media_reference.start_frame = 1
+            media_reference.available_range = None
+        magla_metadata = dict(media_reference.metadata.get("magla", {}))
+        magla_metadata["missing_frames"] = frames["missing"]
+        media_reference.metadata["magla"] = magla_metadata
+        return media_reference
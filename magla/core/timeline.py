@@ -4,11 +4,18 @@
 import getpass
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import opentimelineio as otio
 from opentimelineio.opentime import RationalTime as RTime
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 
+from ..db.project import Project
+from ..db.shot import Shot
 from ..db.timeline import Timeline
+from ..db.timeline_revision import TimelineRevision
+from ..utils import compress_otio, decompress_otio, dict_to_otio, otio_to_dict
 from .entity import MaglaEntity
 from .errors import MaglaError
 
@@ -17,6 +24,10 @@ class MaglaTimelineError(MaglaError):
     """An error accured preventing MaglaTimeline to continue."""
 
 
+class MaglaTimelineExportError(MaglaTimelineError):
+    """One or more formats failed to export."""
+
+
 class MaglaTimeline(MaglaEntity):
     """Provide an interface for building and exporting `opentimelineio.schema.Timeline`.
 
@@ -24,6 +35,17 @@ class MaglaTimeline(MaglaEntity):
     """
     __schema__ = Timeline
 
+    # export format name: (`opentimelineio` adapter name, file extension)
+    EXPORT_FORMATS = {
+        "otio": ("otio_json", ".otio"),
+        "otioz": ("otioz", ".otioz"),
+        "edl": ("cmx_3600", ".edl"),
+        "fcp_xml": ("fcp_xml", ".xml"),
+        "aaf": ("AAF", ".aaf")
+    }
+    # attempts at storing a revision when other sessions store revisions concurrently
+    SNAPSHOT_ATTEMPTS = 3
+
     def __init__(self, data=None, **kwargs):
         """Initialize with given data.
 
@@ -87,6 +109,345 @@ class MaglaTimeline(MaglaEntity):
         return MaglaEntity.from_record(r)
 
     # MaglaTimeline-specific methods ______________________________________________________________
+    @staticmethod
+    def clip_placements(timeline):
+        """Walk all tracks of given timeline and yield each clip with its placement.
+
+        Positions are accumulated while walking, so the whole timeline is placed in a single pass
+        instead of calling `range_in_parent` for every clip.
+
+        Parameters
+        ----------
+        timeline : opentimelineio.schema.Timeline
+            The timeline to walk
+
+        Yields
+        ------
+        tuple
+            The 1-based track index, the `opentimelineio.schema.Clip` and its start time in the
+            track as `opentimelineio.opentime.RationalTime`
+        """
+        for track_index, track in enumerate(timeline.tracks, 1):
+            position = None
+            for item in track:
+                if isinstance(item, otio.schema.Transition):
+                    continue
+                duration = item.duration()
+                if position is None:
+                    position = RTime(0, duration.rate)
+                if isinstance(item, otio.schema.Clip):
+                    yield track_index, item, position
+                position = position + duration
+
+    @property
+    def revision_num(self):
+        """Retrieve the number of the latest stored revision without loading any snapshot data.
+
+        Returns
+        -------
+        int
+            The latest revision number, or 0 if no revisions have been stored yet
+        """
+        num = self.orm.session.query(func.max(TimelineRevision.num)).filter_by(
+            timeline_id=self.id).scalar()
+        return num or 0
+
+    def snapshot(self):
+        """Push current `otio` to backend and store it as a new compressed revision.
+
+        If the `otio` is identical to the latest revision, no new revision is created. Revision
+        numbers are unique per timeline, if another session stores the same number first the
+        snapshot is retried with the next one.
+
+        Returns
+        -------
+        int
+            The revision number representing the current state of the timeline
+
+        Raises
+        ------
+        MaglaTimelineError
+            No revision number could be claimed within `SNAPSHOT_ATTEMPTS`
+        """
+        self.data.push()
+        otio_dict = otio_to_dict(self.otio)
+        blob, checksum, size = compress_otio(otio_dict)
+        summary = self.summarize(otio_dict, self.shot_ids())
+        for _ in range(self.SNAPSHOT_ATTEMPTS):
+            latest = self.orm.session.query(TimelineRevision).filter_by(
+                timeline_id=self.id).order_by(TimelineRevision.num.desc()).first()
+            if latest and latest.checksum == checksum:
+                return latest.num
+            revision = TimelineRevision(
+                timeline_id=self.id,
+                num=(latest.num if latest else 0) + 1,
+                checksum=checksum,
+                encoding="zlib",
+                size=size,
+                summary=summary,
+                blob=blob)
+            self.orm.session.add(revision)
+            try:
+                self.orm.session.commit()
+            except IntegrityError:
+                self.orm.session.rollback()
+                continue
+            return revision.num
+        raise MaglaTimelineError(
+            "Failed to store a revision of timeline {0} after {1} attempts".format(
+                self.id, self.SNAPSHOT_ATTEMPTS))
+
+    def revision(self, num=None, otio_as_dict=False):
+        """Retrieve the `otio` stored for given revision number.
+
+        Parameters
+        ----------
+        num : int, optional
+            The revision number to retrieve, by default None (latest)
+        otio_as_dict : bool, optional
+            Flag whether or not to return the plain dict instead of an object, by default False
+
+        Returns
+        -------
+        opentimelineio.schema.Timeline
+            The timeline as it was at given revision
+
+        Raises
+        ------
+        MaglaTimelineError
+            Thrown if no matching revision exists
+        """
+        query = self.orm.session.query(TimelineRevision).filter_by(timeline_id=self.id)
+        if num is None:
+            query = query.order_by(TimelineRevision.num.desc())
+        else:
+            query = query.filter_by(num=num)
+        revision = query.first()
+        if not revision:
+            raise MaglaTimelineError(
+                "No revision {0} found for timeline {1}".format(num, self.id))
+        return decompress_otio(revision.blob, otio_as_dict=otio_as_dict)
+
+    def revisions(self, since=0):
+        """Retrieve metadata of all revisions newer than given revision number.
+
+        Only metadata is loaded, the compressed snapshots are retrieved with `revision`. Clients
+        which cache by revision can poll with their latest known number and receive an empty list
+        when nothing has changed.
+
+        Parameters
+        ----------
+        since : int, optional
+            The last revision number already known to the caller, by default 0
+
+        Returns
+        -------
+        list of dict
+            A list of dicts containing `num`, `checksum`, `size` and `summary` of each newer
+            revision
+        """
+        query = self.orm.session.query(
+            TimelineRevision.num,
+            TimelineRevision.checksum,
+            TimelineRevision.size,
+            TimelineRevision.summary
+        ).filter(
+            TimelineRevision.timeline_id == self.id,
+            TimelineRevision.num > since
+        ).order_by(TimelineRevision.num)
+        return [{"num": num, "checksum": checksum, "size": size, "summary": summary}
+                for num, checksum, size, summary in query.all()]
+
+    def summary(self):
+        """Summarize the stored timeline straight from its `JSON` without building `otio` objects.
+
+        Returns
+        -------
+        dict
+            See `summarize`
+        """
+        return self.summarize(self.data.record.otio, self.shot_ids())
+
+    @classmethod
+    def summaries(cls, timeline_ids):
+        """Summarize multiple stored timelines without instantiating any `MaglaTimeline`.
+
+        Only the `id` and raw `otio` columns are loaded, and all related shot ids are resolved in
+        a single query.
+
+        Parameters
+        ----------
+        timeline_ids : list of int
+            The ids of the timelines to summarize
+
+        Returns
+        -------
+        dict
+            Dictionary mapping each found timeline id to its summary (see `summarize`)
+        """
+        cls.connect()
+        session = cls._orm.session
+        shot_ids = {}
+        query = session.query(Project.timeline_id, Shot.name, Shot.id).join(
+            Shot, Shot.project_id == Project.id).filter(Project.timeline_id.in_(timeline_ids))
+        for timeline_id, name, shot_id in query.all():
+            shot_ids.setdefault(timeline_id, {})[name] = shot_id
+        query = session.query(Timeline.id, Timeline.otio).filter(Timeline.id.in_(timeline_ids))
+        return {id_: cls.summarize(otio_dict, shot_ids.get(id_, {}))
+                for id_, otio_dict in query.all()}
+
+    @classmethod
+    def summarize(cls, otio_dict, shot_ids=None):
+        """Compute per-track clip counts, durations and shot ids from a timeline dict.
+
+        Parameters
+        ----------
+        otio_dict : dict
+            A timeline converted to dict, as stored in the `otio` column
+        shot_ids : dict, optional
+            Dictionary mapping shot names to ids, by default None
+
+        Returns
+        -------
+        dict
+            Dictionary containing the timeline `name`, its `duration` in seconds, the list of
+            `shot_ids` (None for clips not matching a shot) and a `tracks` list with the `name`,
+            `kind`, `clip_count` and `duration` of each track
+        """
+        shot_ids = shot_ids or {}
+        summary = {"name": None, "duration": 0.0, "shot_ids": [], "tracks": []}
+        if not otio_dict:
+            return summary
+        summary["name"] = otio_dict.get("name")
+        for track in (otio_dict.get("tracks") or {}).get("children", []):
+            clip_names = [c["name"] for c in track.get("children", [])
+                          if c["OTIO_SCHEMA"].startswith("Clip.")]
+            duration = cls.__dict_duration(track)
+            summary["tracks"].append({
+                "name": track.get("name"),
+                "kind": track.get("kind"),
+                "clip_count": len(clip_names),
+                "duration": duration
+            })
+            summary["duration"] = max(summary["duration"], duration)
+            summary["shot_ids"].extend(shot_ids.get(name) for name in clip_names)
+        return summary
+
+    @classmethod
+    def __dict_duration(cls, item):
+        """Compute the duration in seconds of given `otio` item dict."""
+        schema = item["OTIO_SCHEMA"].split(".")[0]
+        if schema == "Transition":
+            return 0.0
+        range_ = item.get("source_range")
+        if not range_ and schema == "Clip":
+            references = item.get("media_references")
+            if references:
+                reference = references.get(item.get("active_media_reference_key", "DEFAULT_MEDIA"))
+            else:
+                reference = item.get("media_reference")
+            range_ = (reference or {}).get("available_range")
+        if range_:
+            return float(range_["duration"]["value"]) / float(range_["duration"]["rate"])
+        durations = [cls.__dict_duration(child) for child in item.get("children", [])]
+        if schema == "Stack":
+            return max(durations or [0.0])
+        return sum(durations)
+
+    def write(self, path, adapter_name=None):
+        """Write the timeline to given path using an `opentimelineio` adapter.
+
+        The adapter writes to a hidden temporary file next to the destination which is then renamed
+        into place, so a partially written file is never visible at `path`.
+
+        Parameters
+        ----------
+        path : str
+            The filepath to write to
+        adapter_name : str, optional
+            The `opentimelineio` adapter to use, by default None (inferred from file extension)
+
+        Returns
+        -------
+        str
+            The path that was written
+        """
+        dirname, basename = os.path.split(os.path.abspath(path))
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        adapter_name = adapter_name or otio.adapters.from_filepath(path).name
+        temp_path = os.path.join(dirname, ".{0}.{1}".format(os.getpid(), basename))
+        try:
+            otio.adapters.write_to_file(self.otio, temp_path, adapter_name=adapter_name)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return path
+
+    def export(self, export_dir, formats=None, name=None, max_workers=None):
+        """Write the timeline to given directory in multiple interchange formats concurrently.
+
+        Each format is written straight to disk by its adapter, so no serialized copies are held
+        in memory by `magla`. Formats in `EXPORT_FORMATS` other than `otio` and `otioz` require
+        the matching `opentimelineio` adapter plugins, installed with the `interchange` extra
+        (`pip install magla-jacobmartinez3d[interchange]`).
+
+        Parameters
+        ----------
+        export_dir : str
+            The directory to write the exported files to
+        formats : list, optional
+            Names of formats in `EXPORT_FORMATS` to write, by default None (all of them)
+        name : str, optional
+            The basename of the exported files, by default None (name of the timeline)
+        max_workers : int, optional
+            Maximum number of formats to write at once, by default None (one per format)
+
+        Returns
+        -------
+        dict
+            Dictionary mapping each format name to its written path
+
+        Raises
+        ------
+        MaglaTimelineError
+            Thrown before writing anything if a format is unknown or its adapter isn't installed
+        MaglaTimelineExportError
+            Thrown after all other formats finished if any format failed to export
+        """
+        available = otio.adapters.available_adapter_names()
+        formats = list(self.EXPORT_FORMATS) if formats is None else formats
+        name = name or self.otio.name or "timeline_{0}".format(self.id)
+        jobs = {}
+        missing = []
+        for format_ in formats:
+            if format_ not in self.EXPORT_FORMATS:
+                raise MaglaTimelineError("Unknown export format: '{0}'".format(format_))
+            adapter_name, ext = self.EXPORT_FORMATS[format_]
+            if adapter_name not in available:
+                missing.append("{0} ('{1}' adapter)".format(format_, adapter_name))
+            jobs[format_] = (os.path.join(export_dir, name + ext), adapter_name)
+        if missing:
+            raise MaglaTimelineError(
+                "No opentimelineio adapter installed for: {0}. Install the 'interchange' extra or "
+                "pass the formats to export".format(", ".join(missing)))
+
+        results = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=max_workers or len(jobs) or 1) as executor:
+            futures = {format_: executor.submit(self.write, path, adapter_name)
+                       for format_, (path, adapter_name) in jobs.items()}
+            for format_, future in futures.items():
+                try:
+                    results[format_] = future.result()
+                except Exception as err:
+                    errors[format_] = err
+        if errors:
+            raise MaglaTimelineExportError("Failed to export formats: {0}".format(
+                ", ".join("{0} ({1})".format(f, e) for f, e in errors.items())))
+        return results
+
     def build(self, shots):
         """Build necessary tracks and populate with given shots.
 
@@ -100,6 +461,106 @@ class MaglaTimeline(MaglaEntity):
             self.insert_shot(shot)
         return self
 
+    def shot_ids(self):
+        """Retrieve the ids of shots belonging to the project of this timeline, keyed by name.
+
+        Returns
+        -------
+        dict
+            Dictionary mapping shot names to shot ids
+        """
+        query = self.orm.session.query(Shot.name, Shot.id).join(
+            Project, Project.id == Shot.project_id).filter(Project.timeline_id == self.id)
+        return dict(query.all())
+
+    def diff(self, other_otio, rate=None):
+        """Compare this timeline against an incoming edit and return the shots that changed.
+
+        Clips are keyed by name (which matches the `MaglaShot` name) and both timelines are walked
+        once, so the comparison runs in linear time regardless of the number of tracks or clips.
+        A clip present in both timelines is `moved` if its track changed and `retimed` if its
+        position in the track or its trimmed range changed - it can be both.
+
+        Frames are counted at the rate of the project's 2d settings, so an edit cut at a different
+        rate still gives the project's `start_frame_in_parent`.
+
+        Parameters
+        ----------
+        other_otio : opentimelineio.schema.Timeline or dict
+            The incoming timeline to compare against
+        rate : float, optional
+            The rate to count frames at, by default None (the rate of the project's 2d settings,
+            or the rate of each track if the project has none)
+
+        Returns
+        -------
+        dict
+            Change set with `added`, `removed`, `moved` and `retimed` lists. Each entry is a dict
+            describing the clip's placement (`name`, `shot_id`, `track_index`, `start_frame`,
+            `duration`, `rate`); `moved` and `retimed` entries include the stored placement as
+            `previous`, `added` and `retimed` entries include the incoming clip as `clip`.
+        """
+        if isinstance(other_otio, dict):
+            other_otio = dict_to_otio(other_otio)
+        if rate is None:
+            project = self.orm.session.query(Project).filter_by(timeline_id=self.id).first()
+            if project and project.settings_2d:
+                rate = project.settings_2d.rate
+        current = self.__placements(self.otio, rate)
+        incoming = self.__placements(other_otio, rate)
+        shot_ids = self.shot_ids()
+        changes = {"added": [], "removed": [], "moved": [], "retimed": []}
+        for name, (placement, clip) in incoming.items():
+            placement["shot_id"] = shot_ids.get(name)
+            if name not in current:
+                changes["added"].append(dict(placement, clip=otio_to_dict(clip)))
+                continue
+            previous, previous_clip = current[name]
+            if placement["track_index"] != previous["track_index"]:
+                changes["moved"].append(dict(placement, previous=previous))
+            if placement["start_time"] != previous["start_time"] \
+                    or clip.trimmed_range() != previous_clip.trimmed_range():
+                changes["retimed"].append(dict(
+                    placement, previous=previous, clip=otio_to_dict(clip)))
+        for name, (placement, _) in current.items():
+            if name not in incoming:
+                placement["shot_id"] = shot_ids.get(name)
+                changes["removed"].append(placement)
+        for entries in changes.values():
+            for entry in entries:
+                self.__strip_start_time(entry)
+        return changes
+
+    @classmethod
+    def __placements(cls, timeline, rate=None):
+        """Map each clip name in given timeline to its placement dict and the clip itself."""
+        placements = {}
+        for track_index, clip, start_time in cls.clip_placements(timeline):
+            if clip.name in placements:
+                logging.warning("Ignoring duplicate clip '{0}' on track {1}".format(
+                    clip.name, track_index))
+                continue
+            if rate:
+                start_time = start_time.rescaled_to(rate)
+            duration = clip.duration()
+            placements[clip.name] = ({
+                "name": clip.name,
+                "track_index": track_index,
+                "start_time": start_time,
+                "start_frame": int(round(start_time.value)),
+                "duration": int(round(duration.rescaled_to(start_time).value)),
+                "rate": start_time.rate
+            }, clip)
+        return placements
+
+    @staticmethod
+    def __strip_start_time(entry):
+        """Remove the `RationalTime` used for comparison so the change set is plain data."""
+        entry.pop("start_time", None)
+        if "previous" in entry:
+            entry["previous"] = dict(entry["previous"])
+            entry["previous"].pop("start_time", None)
+
     def insert_shot(self, shot):
         """Insert given shot into timeline.
 
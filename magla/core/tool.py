@@ -8,6 +8,8 @@ import sys
 from pprint import pformat
 
 from ..db.tool import Tool
+from ..trace import traced
+from .directory import MaglaPathTemplate
 from .entity import MaglaEntity
 
 
@@ -99,6 +101,7 @@ class MaglaTool(MaglaEntity):
         """
         return self.latest
 
+    @traced("MaglaTool.start")
     def start(self, tool_version_id=None, tool_config=None, user=None, assignment=None, *args):
         """Start the given `MaglatoolVersion` with either given context or inferred context.
 
@@ -152,8 +155,10 @@ class MaglaTool(MaglaEntity):
         assignment = assignment or user.assignments[-1]
 
         # establish the tool-specific project file to be opened
-        project_file = tool_config.directory.bookmark(tool_config.tool_version.full_name).format(
-            shot_version=assignment.shot_version)
+        directory = tool_config.directory
+        bookmark = tool_config.tool_version.full_name
+        project_file = directory.resolve_bookmark(bookmark, **MaglaPathTemplate.capture(
+            [directory.bookmark(bookmark)], shot_version=assignment.shot_version))
         cmd_list.append(project_file)
 
         # TODO: replace with `logging`
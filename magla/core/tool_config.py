@@ -27,6 +27,7 @@ class MaglaToolConfig(MaglaEntity):
     sub-directory-tree whithin the shot directory structure.
     """
     __schema__ = ToolConfig
+    __cacheable__ = True
 
     def __init__(self, data=None, **kwargs):
         """Initialize with given data.
@@ -0,0 +1,388 @@
+# -*- coding: utf-8 -*-
+"""The watcher keeps shot version media ranges up to date while frames are being rendered.
+
+Instead of rescanning whole directories, the frame numbers of each watched shot version are kept
+in memory after one initial scan and updated from filesystem events. Changed shot versions are
+written to the backend in batches, all in a single commit.
+
+Events come from `inotify` on Linux, or from polling the directories' modification times
+everywhere else (and for network filesystems, where `inotify` doesn't see remote writes).
+
+Example:
+    ```
+    watcher = MaglaWatcher(project_shot_versions)
+    watcher.start()
+    ...
+    watcher.stop()
+    ```
+"""
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from ..db.shot_version import ShotVersion
+from ..utils import dict_to_otio, frame_ranges, frame_sequence_pattern, otio_to_dict
+from .entity import MaglaEntity
+from .errors import MaglaError
+from .shot_version import MaglaShotVersion
+
+
+class MaglaWatcherError(MaglaError):
+    """An error accured preventing MaglaWatcher to continue."""
+
+
+class _InotifyBackend(object):
+    """Directory events from Linux `inotify`, through `ctypes`."""
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_NONBLOCK = os.O_NONBLOCK
+    IN_CLOEXEC = 0o2000000
+
+    ADDED = IN_CLOSE_WRITE | IN_MOVED_TO
+    REMOVED = IN_DELETE | IN_MOVED_FROM
+    MASK = ADDED | REMOVED | IN_DELETE_SELF
+
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise MaglaWatcherError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise MaglaWatcherError("inotify is not available in this libc")
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise MaglaWatcherError("inotify_init1 failed: {0}".format(os.strerror(err)))
+        self._paths = {}
+
+    def watch(self, path):
+        """Start watching given directory, returning False if it doesn't exist (yet)."""
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR):
+                return False
+            raise MaglaWatcherError("Failed to watch '{0}': {1}".format(path, os.strerror(err)))
+        self._paths[wd] = path
+        return True
+
+    def events(self, timeout):
+        """Wait up to `timeout` seconds for events.
+
+        Returns
+        -------
+        list of tuple
+            List of (`directory`, `name`, `added`) tuples. A `name` of None means the directory
+            has to be rescanned, a `directory` of None means all of them do
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            buffer = os.read(self._fd, 1024 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, length = self._EVENT.unpack_from(buffer, offset)
+            offset += self._EVENT.size
+            name = os.fsdecode(buffer[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                events.append((None, None, None))
+                continue
+            path = self._paths.get(wd)
+            if path is None:
+                continue
+            if mask & (self.IN_DELETE_SELF | self.IN_IGNORED):
+                # directory is gone, it will be watched again once it is recreated
+                del self._paths[wd]
+                events.append((path, None, None))
+            elif mask & self.ADDED:
+                events.append((path, name, True))
+            elif mask & self.REMOVED:
+                events.append((path, name, False))
+        return events
+
+    def watched(self):
+        """Retrieve the set of directories currently watched."""
+        return set(self._paths.values())
+
+    def close(self):
+        os.close(self._fd)
+
+
+class _PollingBackend(object):
+    """Directory events from comparing listings whenever a directory's `mtime` changes."""
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self._listings = {}
+
+    def watch(self, path):
+        """Start watching given directory, returning False if it doesn't exist (yet)."""
+        try:
+            self._listings[path] = (os.stat(path).st_mtime_ns, self._names(path))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def events(self, timeout):
+        """Wait up to `timeout` seconds, then list the directories which changed.
+
+        Returns
+        -------
+        list of tuple
+            List of (`directory`, `name`, `added`) tuples. A `name` of None means the directory
+            has to be rescanned
+        """
+        time.sleep(min(timeout, self.interval) if timeout is not None else self.interval)
+        events = []
+        for path, (mtime, names) in list(self._listings.items()):
+            try:
+                new_mtime = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                del self._listings[path]
+                events.append((path, None, None))
+                continue
+            if new_mtime == mtime:
+                continue
+            new_names = self._names(path)
+            self._listings[path] = (new_mtime, new_names)
+            events.extend((path, name, True) for name in new_names - names)
+            events.extend((path, name, False) for name in names - new_names)
+        return events
+
+    def watched(self):
+        """Retrieve the set of directories currently watched."""
+        return set(self._listings)
+
+    def close(self):
+        self._listings.clear()
+
+    @staticmethod
+    def _names(path):
+        with os.scandir(path) as entries:
+            return set(entry.name for entry in entries)
+
+
+class MaglaWatcher(object):
+    """Incrementally update the `otio` media reference ranges of shot versions from disk events.
+
+    Each shot version's frame sequence is resolved from a directory bookmark (see
+    `MaglaShotVersion.frame_sequence`) and scanned once. After that only the files named in
+    filesystem events are parsed, and the shot versions whose frames changed are written to the
+    backend every `batch_seconds` in a single commit.
+    """
+
+    def __init__(self, shot_versions, bookmark="png_representation", batch_seconds=2.0,
+                 polling=False, poll_interval=1.0):
+        """Resolve and scan the frame sequences of given shot versions.
+
+        Parameters
+        ----------
+        shot_versions : list of magla.core.shot_version.MaglaShotVersion
+            The shot versions to watch
+        bookmark : str, optional
+            The directory bookmark of the frame sequences, by default "png_representation"
+        batch_seconds : float, optional
+            Minimum number of seconds between backend writes, by default 2.0
+        polling : bool, optional
+            Flag for polling instead of using `inotify`, by default False (`inotify` if available)
+        poll_interval : float, optional
+            Seconds between polls when polling, by default 1.0
+        """
+        self.batch_seconds = batch_seconds
+        self._sequences = {}
+        self._frames = {}
+        self._rates = {}
+        self._dirty = set()
+        self._last_flush = time.time()
+        self._stop_event = threading.Event()
+        self._thread = None
+        for shot_version in shot_versions:
+            sequence = shot_version.frame_sequence(bookmark)
+            self._sequences.setdefault(sequence["directory"], []).append(
+                (shot_version.id, sequence, frame_sequence_pattern(
+                    sequence["prefix"], sequence["suffix"], sequence["padding"])))
+            self._rates[shot_version.id] = shot_version.project.settings_2d.rate
+
+        self._backend = None
+        if not polling:
+            try:
+                self._backend = _InotifyBackend()
+            except MaglaWatcherError as err:
+                logging.info("Falling back to polling: {0}".format(err))
+        self._backend = self._backend or _PollingBackend(poll_interval)
+        for directory in self._sequences:
+            self._backend.watch(directory)
+            self._rescan(directory)
+
+    @property
+    def polling(self):
+        """Determine if the watcher is polling rather than using `inotify`.
+
+        Returns
+        -------
+        bool
+            True if polling
+        """
+        return isinstance(self._backend, _PollingBackend)
+
+    def frames(self, shot_version_id):
+        """Retrieve the frames currently known for given shot version.
+
+        Parameters
+        ----------
+        shot_version_id : int
+            Id of the watched `MaglaShotVersion`
+
+        Returns
+        -------
+        dict
+            The frames, see `magla.utils.frame_ranges`
+        """
+        return frame_ranges(self._frames[shot_version_id])
+
+    def poll(self, timeout=None):
+        """Wait for and apply filesystem events, flushing if `batch_seconds` have passed.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Maximum seconds to wait for events, by default None (`batch_seconds`)
+
+        Returns
+        -------
+        list of int
+            Ids of the shot versions written to the backend, if a flush happened
+        """
+        self._watch_missing()
+        for directory, name, added in self._backend.events(
+                self.batch_seconds if timeout is None else timeout):
+            if directory is None:
+                for directory_ in self._sequences:
+                    self._rescan(directory_)
+            elif name is None:
+                self._rescan(directory)
+            else:
+                self._apply(directory, name, added)
+        if self._dirty and time.time() - self._last_flush >= self.batch_seconds:
+            return self.flush()
+        return []
+
+    def flush(self):
+        """Write the media references of all shot versions whose frames changed.
+
+        The shot version records are fetched with one query and committed together, through a
+        session of its own since the watcher usually runs in a background thread and the shared
+        `MaglaEntity` session must not be used from several threads. Records already loaded by
+        other sessions show the changes once expired, as with any write by another process.
+
+        Returns
+        -------
+        list of int
+            Ids of the shot versions written to the backend
+        """
+        self._last_flush = time.time()
+        if not self._dirty:
+            return []
+        dirty, self._dirty = sorted(self._dirty), set()
+        sequences = dict(
+            (shot_version_id, sequence) for entries in self._sequences.values()
+            for shot_version_id, sequence, _ in entries)
+        MaglaEntity.connect()
+        orm = MaglaEntity._orm
+        if orm._Session is None:
+            # constructs the engine and session-factory, verifying the schema
+            orm.session
+        session = orm._Session()
+        try:
+            for record in session.query(ShotVersion).filter(ShotVersion.id.in_(dirty)):
+                media_reference = MaglaShotVersion.apply_frames(
+                    dict_to_otio(record.otio) if record.otio else None,
+                    sequences[record.id],
+                    self.frames(record.id),
+                    self._rates[record.id])
+                record.otio = otio_to_dict(media_reference)
+            session.commit()
+        finally:
+            session.close()
+        return dirty
+
+    def run(self):
+        """Poll and flush until `stop` is called."""
+        while not self._stop_event.is_set():
+            self.poll(min(self.batch_seconds, 0.5))
+        self.flush()
+
+    def start(self):
+        """Run the watcher in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run, name="magla-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread, writing any pending changes, and release the watches."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        else:
+            self.flush()
+        self._backend.close()
+
+    def _apply(self, directory, name, added):
+        """Add or remove the frame of given file name from the sequences in given directory."""
+        for shot_version_id, sequence, pattern in self._sequences.get(directory, []):
+            if not (name.startswith(sequence["prefix"]) and name.endswith(sequence["suffix"])):
+                continue
+            match = pattern.match(name)
+            if not match:
+                continue
+            frame = int(match.group(1))
+            frames = self._frames[shot_version_id]
+            if added and frame not in frames:
+                frames.add(frame)
+                self._dirty.add(shot_version_id)
+            elif not added and frame in frames:
+                frames.discard(frame)
+                self._dirty.add(shot_version_id)
+
+    def _rescan(self, directory):
+        """Rebuild the frames of all sequences in given directory from a fresh listing."""
+        try:
+            with os.scandir(directory) as entries:
+                names = [entry.name for entry in entries]
+        except FileNotFoundError:
+            names = []
+        for shot_version_id, _, _ in self._sequences[directory]:
+            previous = self._frames.get(shot_version_id)
+            self._frames[shot_version_id] = set()
+            if previous:
+                self._dirty.add(shot_version_id)
+        for name in names:
+            self._apply(directory, name, True)
+
+    def _watch_missing(self):
+        """Start watching directories which didn't exist yet, picking up what is already there."""
+        watched = self._backend.watched()
+        for directory in self._sequences:
+            if directory not in watched and self._backend.watch(directory):
+                self._rescan(directory)
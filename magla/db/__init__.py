@@ -3,6 +3,7 @@ from .assignment import Assignment
 from .context import Context
 from .dependency import Dependency
 from .directory import Directory
+from .directory_usage import DirectoryUsage
 from .episode import Episode
 from .facility import Facility
 from .file_type import FileType
@@ -15,6 +16,7 @@ from .sequence import Sequence
 from .shot import Shot
 from .shot_version import ShotVersion
 from .timeline import Timeline
+from .timeline_revision import TimelineRevision
 from .tool import Tool
 from .tool_config import ToolConfig
 from .tool_version import ToolVersion
@@ -20,3 +20,4 @@ class Directory(MaglaORM._Base):
 
     machine = relationship("Machine", uselist=False, back_populates="directories")
     user = relationship("User", uselist=False, back_populates="directories")
+    usage = relationship("DirectoryUsage", uselist=False, back_populates="directory")
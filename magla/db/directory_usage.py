@@ -0,0 +1,21 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, LargeBinary
+from sqlalchemy.orm import deferred, relationship
+
+from ..db.orm import MaglaORM
+
+
+class DirectoryUsage(MaglaORM._Base):
+    """The measured disk usage of a `Directory` tree, with the per-directory listing cache."""
+    __tablename__ = "directory_usages"
+    __table_args__ = {'extend_existing': True}
+    __entity_name__ = "DirectoryUsage"
+
+    id = Column(Integer, primary_key=True)
+    directory_id = Column(Integer, ForeignKey("directories.id"), unique=True, index=True)
+    bytes = Column(BigInteger)
+    files = Column(BigInteger)
+    dirs = Column(BigInteger)
+    measured_at = Column(DateTime)
+    cache = deferred(Column(LargeBinary))
+
+    directory = relationship("Directory", uselist=False, back_populates="usage")
@@ -7,10 +7,30 @@ To replace with your own backend just keep the below method signatures intact.
 """
 import os
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm.session import sessionmaker
-from sqlalchemy_utils import database_exists, create_database, drop_database
+
+from ..trace import traced
+
+
+def database_exists(url):
+    """Check if the database at given url exists, see `sqlalchemy_utils.database_exists`."""
+    import sqlalchemy_utils
+    return sqlalchemy_utils.database_exists(url)
+
+
+def create_database(url, *args, **kwargs):
+    """Create the database at given url, see `sqlalchemy_utils.create_database`."""
+    import sqlalchemy_utils
+    return sqlalchemy_utils.create_database(url, *args, **kwargs)
+
+
+def drop_database(url):
+    """Drop the database at given url, see `sqlalchemy_utils.drop_database`."""
+    import sqlalchemy_utils
+    return sqlalchemy_utils.drop_database(url)
 
 
 class MaglaORM(object):
@@ -36,33 +56,82 @@ class MaglaORM(object):
     _Base = declarative_base()
     _Session = None
     _Engine = None
+    # database urls whose schema was verified or set up by this process
+    _verified_urls = set()
 
     def __init__(self):
         """Instantiate and iniliatize DB tables."""
         self._session = None
 
     def init(self):
-        """Perform `SQLAlchemy` initializations, create filesystem directory for `sqlite` data."""
+        """Construct the `SQLAlchemy` engine and session-factory without connecting to the backend.
+
+        The connection is made, and the schema verified, the first time `session` is used.
+        """
         self._construct_engine()
-        if not os.path.isdir(self.CONFIG["data_dir"]):
+        self._construct_session()
+
+    def setup(self):
+        """Create the database and all tables if needed, then mark the schema as verified.
+
+        This is done automatically the first time `session` is used unless `schema_verified`. Call
+        it explicitly to create the schema ahead of time in deployment scripts.
+        """
+        if self._Engine is None:
+            self._construct_engine()
+        if self.CONFIG["dialect"] == "sqlite" and not os.path.isdir(self.CONFIG["data_dir"]):
             os.makedirs(self.CONFIG["data_dir"])
         if not database_exists(self._Engine.url):
             create_database(self._Engine.url)
-        self._construct_session()
         self._create_all_tables()
-        self._session = self._Session()
+        self._verified_urls.add(repr(self._Engine.url))
 
     @property
     def session(self):
-        """Retrieve Session class or Session Instance (after `_construct_session` has been called).
+        """Retrieve the session, connecting and verifying the schema on first use.
 
         Returns
         -------
         sqlalchemy.orm.Session
             Session class/object
         """
+        if self._session is None:
+            if self._Session is None:
+                self.init()
+            if not self.schema_verified():
+                self.setup()
+            self._session = self._Session()
         return self._session
 
+    @classmethod
+    def schema_verified(cls):
+        """Determine if all tables exist in the current database.
+
+        Only checked against the database once per process and database url, with a single
+        listing of its table names.
+
+        Returns
+        -------
+        bool
+            True if every table currently defined in metadata exists
+        """
+        url = repr(cls._Engine.url)
+        if url in cls._verified_urls:
+            return True
+        if cls._Engine.url.get_backend_name() == "sqlite" and not (
+                cls._Engine.url.database and os.path.isfile(cls._Engine.url.database)):
+            # don't let the check itself create an empty database file
+            return False
+        try:
+            existing = set(inspect(cls._Engine).get_table_names())
+        except SQLAlchemyError:
+            # the database itself doesn't exist or can't be reached yet
+            return False
+        if not set(cls._Base.metadata.tables).issubset(existing):
+            return False
+        cls._verified_urls.add(url)
+        return True
+
     @classmethod
     def _create_all_tables(cls):
         """Create all tables currently defined in metadata."""
@@ -72,6 +141,7 @@ class MaglaORM(object):
     def _drop_all_tables(cls):
         """Drop all tables currently defined in metadata."""
         cls._Base.metadata.drop_all(bind=cls._Engine)
+        cls._verified_urls.discard(repr(cls._Engine.url))
 
     @classmethod
     def _construct_session(cls, *args, **kwargs):
@@ -162,6 +232,7 @@ class MaglaORM(object):
         record = self.query(entity, **filter_kwargs)
         return entity.from_record(record.first())
 
+    @traced("MaglaORM.create")
     def create(self, entity, data):
         """Create the given entity type using given data.
 
@@ -193,6 +264,7 @@ class MaglaORM(object):
         self.session.delete(entity)
         self.session.commit()
 
+    @traced("MaglaORM.query")
     def query(self, entity, data=None, **filter_kwargs):
         """Query the `SQLAlchemy` session for given entity type and data/kwargs.
 
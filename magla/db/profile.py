@@ -0,0 +1,389 @@
+"""Query instrumentation for finding and guarding the hot paths between `magla` and its backend.
+
+Every statement executed while a profile is active is recorded with its duration, the number of
+rows it returned or affected and the `magla` call site which issued it. Statements repeated many
+times within one profile are reported as likely N+1 queries, which in `magla` mostly come from
+walking relationships one `MaglaEntity.from_record` at a time.
+
+    Example:
+        ```
+        with magla.profile("build timeline") as p:
+            project.timeline.build(project.shots)
+        print(p.report())
+
+        # in tests, fail if a hot path regresses
+        with magla.profile(max_queries=20, max_repeats=5):
+            magla.Root().all()
+        ```
+
+The `SQLAlchemy` event hooks are installed on first use and cost nothing while no profile is
+active.
+"""
+import contextlib
+import logging
+import os
+import sys
+import threading
+import time
+
+import sqlalchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Mapper
+
+from ..core.errors import MaglaError
+
+# number of executions of the same statement within a profile at which it is reported
+REPEAT_THRESHOLD = 3
+# number of `magla` frames, closest to the calling code, recorded as the call site of a statement
+CALL_SITE_DEPTH = 4
+
+_MAGLA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# frames from these paths are never reported as call sites
+_SKIPPED_DIRS = (
+    os.path.join(_MAGLA_DIR, "db"),
+    os.path.join(_MAGLA_DIR, "trace.py"),
+    os.path.dirname(os.path.abspath(sqlalchemy.__file__)),
+    os.path.dirname(os.path.abspath(contextlib.__file__)))
+_local = threading.local()
+_install_lock = threading.Lock()
+_installed = False
+
+
+class MaglaProfileError(MaglaError):
+    """An error accured preventing MaglaProfile to continue."""
+
+
+class MaglaQueryBudgetError(MaglaProfileError):
+    """A profiled block exceeded its query budget."""
+
+
+class MaglaProfile(object):
+    """The statements executed while active, see `profile`."""
+
+    def __init__(self, name=None, capture_parameters=True):
+        """Initialize with given name.
+
+        Parameters
+        ----------
+        name : str, optional
+            A descriptive name of the profiled operation, by default None
+        capture_parameters : bool, optional
+            Flag for recording the parameters of each statement, by default True
+        """
+        self.name = name
+        self.capture_parameters = capture_parameters
+        self.statements = []
+        self.start = None
+        self.end = None
+
+    def __repr__(self):
+        return "<Profile {this.name}: queries={this.count}, seconds={this.seconds:.4f}, " \
+            "rows={this.rows}>".format(this=self)
+
+    def __str__(self):
+        return self.__repr__()
+
+    @property
+    def count(self):
+        """Retrieve the number of statements executed.
+
+        Returns
+        -------
+        int
+            Number of statements
+        """
+        return len(self.statements)
+
+    @property
+    def seconds(self):
+        """Retrieve the total time spent executing statements.
+
+        Returns
+        -------
+        float
+            Seconds spent in the backend
+        """
+        return sum(statement["seconds"] for statement in self.statements)
+
+    @property
+    def rows(self):
+        """Retrieve the total number of rows loaded into records or affected by writes.
+
+        Returns
+        -------
+        int
+            Number of rows
+        """
+        return sum(statement["rows"] for statement in self.statements)
+
+    @property
+    def elapsed(self):
+        """Retrieve the wall-clock duration of the profile.
+
+        Returns
+        -------
+        float
+            Seconds since the profile started, until it ended if it did
+        """
+        if self.start is None:
+            return 0.0
+        return (self.end or time.perf_counter()) - self.start
+
+    def repeated(self, threshold=REPEAT_THRESHOLD):
+        """Retrieve the statements executed at least `threshold` times, the likely N+1 queries.
+
+        Statements are compared by their `SQL` only, as an N+1 repeats one query with different
+        parameters.
+
+        Parameters
+        ----------
+        threshold : int, optional
+            Minimum number of executions, by default `REPEAT_THRESHOLD`
+
+        Returns
+        -------
+        list of dict
+            Dictionary per statement containing `statement`, `count`, `seconds` and the distinct
+            `call_sites`, most executed first
+        """
+        grouped = {}
+        for statement in self.statements:
+            group = grouped.setdefault(statement["statement"], {
+                "statement": statement["statement"],
+                "count": 0,
+                "seconds": 0.0,
+                "call_sites": []
+            })
+            group["count"] += 1
+            group["seconds"] += statement["seconds"]
+            if statement["call_site"] not in group["call_sites"]:
+                group["call_sites"].append(statement["call_site"])
+        return sorted([group for group in grouped.values() if group["count"] >= threshold],
+                      key=lambda group: -group["count"])
+
+    def check(self, max_queries=None, max_seconds=None, max_repeats=None):
+        """Assert the statements recorded so far stay within given budget.
+
+        Parameters
+        ----------
+        max_queries : int, optional
+            Maximum number of statements, by default None (unlimited)
+        max_seconds : float, optional
+            Maximum total seconds spent in the backend, by default None (unlimited)
+        max_repeats : int, optional
+            Maximum number of executions of any one statement, by default None (unlimited)
+
+        Raises
+        ------
+        MaglaQueryBudgetError
+            The budget was exceeded
+        """
+        problems = []
+        if max_queries is not None and self.count > max_queries:
+            problems.append("{0} queries (budget: {1})".format(self.count, max_queries))
+        if max_seconds is not None and self.seconds > max_seconds:
+            problems.append("{0:.4f}s in the backend (budget: {1}s)".format(
+                self.seconds, max_seconds))
+        if max_repeats is not None:
+            for group in self.repeated(max_repeats + 1):
+                problems.append("{0} executions (budget: {1}) of: {2}\n    from {3}".format(
+                    group["count"], max_repeats, _one_line(group["statement"]),
+                    "\n    from ".join(" <- ".join(site) for site in group["call_sites"])))
+        if problems:
+            raise MaglaQueryBudgetError("'{0}' exceeded its query budget:\n  {1}".format(
+                self.name, "\n  ".join(problems)))
+
+    def report(self, threshold=REPEAT_THRESHOLD):
+        """Summarize the profile and its likely N+1 queries as readable text.
+
+        Parameters
+        ----------
+        threshold : int, optional
+            Minimum number of executions for a statement to be reported, by default
+            `REPEAT_THRESHOLD`
+
+        Returns
+        -------
+        str
+            The summary
+        """
+        lines = ["{0}: {1} queries, {2:.4f}s in backend, {3:.4f}s elapsed, {4} rows".format(
+            self.name or "profile", self.count, self.seconds, self.elapsed, self.rows)]
+        for group in self.repeated(threshold):
+            lines.append("  likely N+1, {0}x ({1:.4f}s): {2}".format(
+                group["count"], group["seconds"], _one_line(group["statement"])))
+            for site in group["call_sites"]:
+                lines.append("    from " + " <- ".join(site))
+        return "\n".join(lines)
+
+    def _record(self, statement, parameters, seconds, rows, call_site):
+        self.statements.append({
+            "statement": statement,
+            "parameters": parameters if self.capture_parameters else None,
+            "seconds": seconds,
+            "rows": rows,
+            "call_site": call_site
+        })
+
+
+@contextlib.contextmanager
+def profile(name=None, max_queries=None, max_seconds=None, max_repeats=None,
+            capture_parameters=True):
+    """Record the statements executed by the current thread within this context.
+
+    Profiles can be nested, each one records every statement executed while it is active. Likely
+    N+1 queries are logged as warnings when the context exits, and the budget is checked if any is
+    given.
+
+    Parameters
+    ----------
+    name : str, optional
+        A descriptive name of the profiled operation, by default None
+    max_queries : int, optional
+        Maximum number of statements, by default None (unlimited)
+    max_seconds : float, optional
+        Maximum total seconds spent in the backend, by default None (unlimited)
+    max_repeats : int, optional
+        Maximum number of executions of any one statement, by default None (unlimited)
+    capture_parameters : bool, optional
+        Flag for recording the parameters of each statement, by default True
+
+    Yields
+    ------
+    MaglaProfile
+        The profile, which keeps its statements after the context exits
+
+    Raises
+    ------
+    MaglaQueryBudgetError
+        The budget was exceeded
+    """
+    profile_ = start(name, capture_parameters)
+    try:
+        yield profile_
+    finally:
+        stop(profile_)
+    for group in profile_.repeated():
+        logging.warning("'{0}': likely N+1, {1} executions of: {2}\n    from {3}".format(
+            profile_.name, group["count"], _one_line(group["statement"]),
+            " <- ".join(group["call_sites"][0])))
+    profile_.check(max_queries, max_seconds, max_repeats)
+
+
+def start(name=None, capture_parameters=True):
+    """Start recording the statements executed by the current thread, see `profile`.
+
+    Parameters
+    ----------
+    name : str, optional
+        A descriptive name of the profiled operation, by default None
+    capture_parameters : bool, optional
+        Flag for recording the parameters of each statement, by default True
+
+    Returns
+    -------
+    MaglaProfile
+        The started profile
+    """
+    _install()
+    profile_ = MaglaProfile(name, capture_parameters)
+    _active().append(profile_)
+    profile_.start = time.perf_counter()
+    return profile_
+
+
+def stop(profile_):
+    """Stop recording statements to given profile, which must have been started in this thread.
+
+    Parameters
+    ----------
+    profile_ : MaglaProfile
+        A profile returned by `start`
+
+    Returns
+    -------
+    MaglaProfile
+        The stopped profile
+    """
+    profile_.end = time.perf_counter()
+    profiles = _active()
+    if profile_ in profiles:
+        profiles.remove(profile_)
+    return profile_
+
+
+def _active():
+    """Retrieve the profiles active in the current thread."""
+    profiles = getattr(_local, "profiles", None)
+    if profiles is None:
+        profiles = _local.profiles = []
+    return profiles
+
+
+def _install():
+    """Register the `SQLAlchemy` event hooks, once per process."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Mapper, "load", _on_load)
+        _installed = True
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_local, "profiles", None):
+        conn.info.setdefault("magla_profile_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profiles = getattr(_local, "profiles", None)
+    starts = conn.info.get("magla_profile_start")
+    if not profiles or not starts:
+        return
+    seconds = time.perf_counter() - starts.pop()
+    # `rowcount` is only meaningful for writes, loaded rows are added by `_on_load`
+    rows = max(cursor.rowcount, 0) if not statement.lstrip().upper().startswith("SELECT") else 0
+    call_site = _call_site()
+    for profile_ in profiles:
+        profile_._record(statement, parameters, seconds, rows, call_site)
+
+
+def _on_load(target, context):
+    """Count each record loaded towards the last statement of the active profiles."""
+    for profile_ in getattr(_local, "profiles", None) or []:
+        if profile_.statements:
+            profile_.statements[-1]["rows"] += 1
+
+
+def _call_site():
+    """Describe the frames which issued the current statement, skipping `SQLAlchemy` and `magla.db`.
+
+    Returns
+    -------
+    tuple of str
+        "file:line in function" of the outermost `CALL_SITE_DEPTH` `magla` frames, innermost
+        first, followed by the frame which called into `magla`
+    """
+    frame = sys._getframe(2)
+    magla_frames = []
+    caller = None
+    while frame:
+        filename = frame.f_code.co_filename
+        if not filename.startswith(_SKIPPED_DIRS):
+            if not filename.startswith(_MAGLA_DIR):
+                caller = "{0}:{1} in {2}".format(filename, frame.f_lineno, frame.f_code.co_name)
+                break
+            magla_frames.append("{0}:{1} in {2}".format(
+                os.path.relpath(filename, os.path.dirname(_MAGLA_DIR)), frame.f_lineno,
+                frame.f_code.co_name))
+        frame = frame.f_back
+    return tuple(magla_frames[-CALL_SITE_DEPTH:] + ([caller] if caller else []))
+
+
+def _one_line(statement, length=160):
+    """Collapse given statement to one line of at most `length` characters."""
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= length else statement[:length - 3] + "..."
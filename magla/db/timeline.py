@@ -16,3 +16,5 @@ class Timeline(MaglaORM._Base):
     otio = Column(JSON)
 
     user = relationship("User", uselist=False, back_populates="timelines")
+    revisions = relationship(
+        "TimelineRevision", back_populates="timeline", order_by="TimelineRevision.num")
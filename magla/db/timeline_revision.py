@@ -0,0 +1,23 @@
+from sqlalchemy import Column, ForeignKey, Integer, LargeBinary, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSON
+from sqlalchemy.orm import deferred, relationship
+
+from ..db.orm import MaglaORM
+
+
+class TimelineRevision(MaglaORM._Base):
+    """A compressed, immutable snapshot of a `Timeline.otio` document."""
+    __tablename__ = "timeline_revisions"
+    __table_args__ = (UniqueConstraint("timeline_id", "num"), {'extend_existing': True})
+    __entity_name__ = "TimelineRevision"
+
+    id = Column(Integer, primary_key=True)
+    timeline_id = Column(Integer, ForeignKey("timelines.id"), index=True)
+    num = Column(Integer)
+    checksum = Column(String)
+    encoding = Column(String)
+    size = Column(Integer)
+    summary = Column(JSON)
+    blob = deferred(Column(LargeBinary))
+
+    timeline = relationship("Timeline", uselist=False, back_populates="revisions")
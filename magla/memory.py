@@ -0,0 +1,299 @@
+"""Memory diagnostics for long-running sessions, such as a DCC browsing many shots.
+
+A census counts the `MaglaEntity` and `MaglaData` wrappers, `SQLAlchemy` records and
+`opentimelineio` objects currently alive, by type, with their approximate sizes. While allocation
+tracing is on (see `start`), reports also list the `magla` code which allocated the most memory
+that is still alive - usually the relationship walks retaining objects.
+
+    Example (from a DCC's script editor):
+        ```
+        from magla import memory
+        memory.start()
+        before = memory.report()
+        ... browse some shots ...
+        print(memory.format_report(memory.report(), before))
+        ```
+
+On POSIX the report can also be dumped at any time by signalling the process, after calling
+`install_signal_handler()` once:
+    ```
+    kill -USR1 <pid>
+    ```
+"""
+import gc
+import logging
+import os
+import signal
+import sys
+import time
+import tracemalloc
+
+# categories of a census
+CATEGORIES = ("entities", "data", "records", "otio")
+
+_MAGLA_DIR = os.path.dirname(os.path.abspath(__file__))
+# whether tracing was started by `start`, and so may be stopped by `stop`
+_started = False
+
+
+def start(nframes=16):
+    """Start tracing allocations, if not already, so reports include `allocations`.
+
+    Parameters
+    ----------
+    nframes : int, optional
+        Number of frames stored per allocation, by default 16. More frames find the `magla` code
+        behind allocations made deep within `SQLAlchemy` or `opentimelineio`
+    """
+    global _started
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(nframes)
+        _started = True
+
+
+def stop():
+    """Stop tracing allocations, unless tracing was already on before `start`."""
+    global _started
+    if _started:
+        tracemalloc.stop()
+        _started = False
+
+
+def census():
+    """Count the `magla` related objects currently alive, by category and type.
+
+    `opentimelineio` objects are not tracked by the garbage collector themselves, so they are
+    found through the containers referring to them.
+
+    Returns
+    -------
+    dict
+        Dictionary per category (see `CATEGORIES`) mapping type names to dictionaries containing
+        `count` and approximate `bytes`
+    """
+    import opentimelineio as otio
+
+    from .core.data import MaglaData
+    from .core.entity import MaglaEntity
+    from .db.orm import MaglaORM
+
+    result = dict((category, {}) for category in CATEGORIES)
+    otio_objects = {}
+
+    def add(category, obj):
+        entry = result[category].setdefault(type(obj).__name__, {"count": 0, "bytes": 0})
+        entry["count"] += 1
+        entry["bytes"] += _sizeof(obj)
+
+    # types are checked with `issubclass`, as `isinstance` can fail on proxies of dead objects
+    gc.collect()
+    for obj in gc.get_objects():
+        type_ = type(obj)
+        if issubclass(type_, MaglaEntity):
+            add("entities", obj)
+        elif issubclass(type_, MaglaData):
+            add("data", obj)
+        elif issubclass(type_, MaglaORM._Base):
+            add("records", obj)
+        for referent in gc.get_referents(obj):
+            if issubclass(type(referent), otio.core.SerializableObject):
+                otio_objects[id(referent)] = referent
+    for obj in otio_objects.values():
+        add("otio", obj)
+    return result
+
+
+def allocations(limit=20, snapshot=None):
+    """List the `magla` code which allocated the most memory that is still alive.
+
+    Each allocation is attributed to the outermost `magla` frame of its traceback, grouping the
+    memory retained by `opentimelineio` and `SQLAlchemy` by the `magla` call which caused it.
+
+    Parameters
+    ----------
+    limit : int, optional
+        Maximum number of call sites to list, 0 to skip the (slow) snapshot, by default 20
+    snapshot : tracemalloc.Snapshot, optional
+        The snapshot to inspect, by default a new one
+
+    Returns
+    -------
+    list of dict
+        Dictionary per call site containing `site`, `bytes` and `count`, largest first. Empty if
+        allocations aren't being traced
+    """
+    if not limit:
+        return []
+    if snapshot is None:
+        if not tracemalloc.is_tracing():
+            return []
+        snapshot = tracemalloc.take_snapshot()
+    sites = {}
+    for statistic in snapshot.statistics("traceback"):
+        site = None
+        # frames are ordered most recent call first
+        for frame in statistic.traceback:
+            if frame.filename.startswith(_MAGLA_DIR) and frame.filename != __file__:
+                site = "{0}:{1}".format(
+                    os.path.relpath(frame.filename, os.path.dirname(_MAGLA_DIR)), frame.lineno)
+        if site is None:
+            continue
+        entry = sites.setdefault(site, {"site": site, "bytes": 0, "count": 0})
+        entry["bytes"] += statistic.size
+        entry["count"] += statistic.count
+    return sorted(sites.values(), key=lambda entry: -entry["bytes"])[:limit]
+
+
+def report(limit=20):
+    """Take a census and, if tracing, list the largest allocations.
+
+    Parameters
+    ----------
+    limit : int, optional
+        Maximum number of allocation sites to list, 0 for none, by default 20
+
+    Returns
+    -------
+    dict
+        Dictionary containing `time`, `pid`, the `census`, `allocations` and the `traced` bytes
+        currently and at peak (or None if not tracing)
+    """
+    return {
+        "time": time.time(),
+        "pid": os.getpid(),
+        "census": census(),
+        "allocations": allocations(limit),
+        "traced": dict(zip(("current", "peak"), tracemalloc.get_traced_memory()))
+        if tracemalloc.is_tracing() else None
+    }
+
+
+def diff(after, before):
+    """Compare the censuses of two reports.
+
+    Parameters
+    ----------
+    after : dict
+        The later report
+    before : dict
+        The earlier report
+
+    Returns
+    -------
+    dict
+        Dictionary per category mapping type names to dictionaries containing the change in
+        `count` and `bytes`, for the types which changed
+    """
+    result = dict((category, {}) for category in CATEGORIES)
+    for category in CATEGORIES:
+        new = after["census"].get(category, {})
+        old = before["census"].get(category, {})
+        for name in set(new) | set(old):
+            count = new.get(name, {}).get("count", 0) - old.get(name, {}).get("count", 0)
+            bytes_ = new.get(name, {}).get("bytes", 0) - old.get(name, {}).get("bytes", 0)
+            if count or bytes_:
+                result[category][name] = {"count": count, "bytes": bytes_}
+    return result
+
+
+def format_report(report_, before=None):
+    """Describe given report as readable text.
+
+    Parameters
+    ----------
+    report_ : dict
+        A report, see `report`
+    before : dict, optional
+        An earlier report to show the growth since, by default None
+
+    Returns
+    -------
+    str
+        The description
+    """
+    changes = diff(report_, before) if before else None
+    lines = ["magla memory report (pid {0}, {1})".format(
+        report_["pid"], time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(report_["time"])))]
+    if report_["traced"]:
+        lines.append("traced: {0} current, {1} peak".format(
+            _format_bytes(report_["traced"]["current"]), _format_bytes(report_["traced"]["peak"])))
+    for category in CATEGORIES:
+        entries = report_["census"][category]
+        lines.append("{0}: {1} objects".format(
+            category, sum(entry["count"] for entry in entries.values())))
+        for name, entry in sorted(entries.items(), key=lambda item: -item[1]["count"]):
+            change = changes[category].get(name) if changes else None
+            lines.append("  {0:<32} {1:>8} {2:>10}{3}".format(
+                name, entry["count"], _format_bytes(entry["bytes"]),
+                "  ({0:+d})".format(change["count"]) if change else ""))
+    if report_["allocations"]:
+        lines.append("largest allocations still alive, by magla call site:")
+        for entry in report_["allocations"]:
+            lines.append("  {0:>10} in {1:>7} blocks  {2}".format(
+                _format_bytes(entry["bytes"]), entry["count"], entry["site"]))
+    return "\n".join(lines)
+
+
+def dump(path=None, limit=20):
+    """Write a report to given file, or log it.
+
+    Parameters
+    ----------
+    path : str, optional
+        The file to append the report to, by default None (log as a warning)
+    limit : int, optional
+        Maximum number of allocation sites to list, by default 20
+
+    Returns
+    -------
+    dict
+        The report
+    """
+    report_ = report(limit)
+    text = format_report(report_)
+    if path:
+        with open(path, "a") as fo:
+            fo.write(text + "\n\n")
+    else:
+        logging.warning(text)
+    return report_
+
+
+def install_signal_handler(signum=None, path=None):
+    """Dump a report whenever the process receives given signal.
+
+    Parameters
+    ----------
+    signum : int, optional
+        The signal to handle, by default `signal.SIGUSR1`
+    path : str, optional
+        The file to append reports to, by default None (log them)
+
+    Returns
+    -------
+    callable
+        The previous handler of the signal
+    """
+    if signum is None:
+        if not hasattr(signal, "SIGUSR1"):
+            raise OSError("SIGUSR1 is not available on {0}".format(sys.platform))
+        signum = signal.SIGUSR1
+    return signal.signal(signum, lambda signum_, frame: dump(path))
+
+
+def _sizeof(obj):
+    """Approximate the size of given object and its attribute dictionary."""
+    size = sys.getsizeof(obj, 0)
+    attributes = getattr(obj, "__dict__", None)
+    if isinstance(attributes, dict):
+        size += sys.getsizeof(attributes, 0)
+    return size
+
+
+def _format_bytes(size):
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return "{0:.0f} {1}".format(size, unit) if unit == "B" else "{0:.1f} {1}".format(
+                size, unit)
+        size /= 1024.0
+    return "{0:.1f} GiB".format(size)
@@ -0,0 +1,177 @@
+"""Log operations slower than a threshold together with the `SQL` they issued and where from.
+
+Every top-level span (see `magla.trace`) is an operation - such as `MaglaData.pull` behind a
+`MaglaEntity` property, or `MaglaRoot.version_up` - and the statements executed within it are
+recorded with `magla.db.profile`. Operations taking longer than the threshold are logged as
+warnings to the `magla.slowlog` logger with each statement, its parameters (long values such as
+`JSON` blobs truncated) and the call site which issued it.
+
+    Example:
+        ```
+        from magla import slowlog
+        slowlog.enable(threshold=0.2)
+        ```
+
+    or, without changing any code:
+        ```
+        MAGLA_TRACE="slow=200" python publish.py
+        ```
+"""
+import json
+import logging
+import threading
+
+from . import trace
+from .db import profile
+
+# operations taking at least this many seconds are logged, by default
+DEFAULT_THRESHOLD = 0.2
+# longest parameter value logged in full, longer ones are truncated
+MAX_PARAMETER_LENGTH = 120
+# most statements logged per operation, the slowest ones are kept
+MAX_STATEMENTS = 20
+
+logger = logging.getLogger(__name__)
+
+
+class MaglaSlowLogExporter(object):
+    """Record the statements of each top-level span and log the spans slower than a threshold."""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, max_parameter_length=MAX_PARAMETER_LENGTH,
+                 max_statements=MAX_STATEMENTS):
+        """Initialize with given threshold.
+
+        Parameters
+        ----------
+        threshold : float, optional
+            Seconds an operation must take to be logged, by default `DEFAULT_THRESHOLD`
+        max_parameter_length : int, optional
+            Longest parameter value logged in full, by default `MAX_PARAMETER_LENGTH`
+        max_statements : int, optional
+            Most statements logged per operation, by default `MAX_STATEMENTS`
+        """
+        self.threshold = threshold
+        self.max_parameter_length = max_parameter_length
+        self.max_statements = max_statements
+        self._local = threading.local()
+
+    def enter(self, span):
+        if span.parent is None:
+            self._operations().append((span.name, profile.start(span.name)))
+
+    def export(self, record):
+        operations = self._operations()
+        if record["parent"] is not None or not operations or operations[-1][0] != record["name"]:
+            return
+        profile_ = profile.stop(operations.pop()[1])
+        if record["seconds"] >= self.threshold:
+            logger.warning(self.format(record, profile_))
+
+    def format(self, record, profile_):
+        """Describe a slow operation.
+
+        Parameters
+        ----------
+        record : dict
+            The exported span of the operation
+        profile_ : magla.db.profile.MaglaProfile
+            The statements executed during the operation
+
+        Returns
+        -------
+        str
+            The description
+        """
+        lines = ["slow operation {0} took {1:.3f}s (threshold {2:.3f}s){3}: {4} queries in "
+                 "{5:.3f}s".format(
+                     record["name"], record["seconds"], self.threshold,
+                     " {0}".format(record["attributes"]) if record["attributes"] else "",
+                     profile_.count, profile_.seconds)]
+        statements = profile_.statements
+        if len(statements) > self.max_statements:
+            slowest = sorted(statements, key=lambda statement: -statement["seconds"])
+            statements = [statement for statement in statements
+                          if statement in slowest[:self.max_statements]]
+            lines.append("  (showing the {0} slowest of {1} queries)".format(
+                self.max_statements, profile_.count))
+        for statement in statements:
+            lines.append("  [{0:.3f}s] {1}".format(
+                statement["seconds"], " ".join(statement["statement"].split())))
+            if statement["parameters"]:
+                lines.append("    parameters: {0}".format(
+                    self.truncate(statement["parameters"])))
+            if statement["call_site"]:
+                lines.append("    from {0}".format(" <- ".join(statement["call_site"])))
+        return "\n".join(lines)
+
+    def truncate(self, parameters):
+        """Shorten the long values of given statement parameters.
+
+        Parameters
+        ----------
+        parameters : tuple or list or dict
+            The parameters, as passed to the database driver
+
+        Returns
+        -------
+        tuple or list or dict
+            The parameters, with values longer than `max_parameter_length` truncated
+        """
+        if isinstance(parameters, dict):
+            return dict((key, self._truncate_value(value)) for key, value in parameters.items())
+        if isinstance(parameters, list) and parameters and isinstance(
+                parameters[0], (list, tuple, dict)):
+            # `executemany`
+            return [self.truncate(parameters_) for parameters_ in parameters]
+        if isinstance(parameters, (list, tuple)):
+            return type(parameters)(self._truncate_value(value) for value in parameters)
+        return self._truncate_value(parameters)
+
+    def _truncate_value(self, value):
+        """Shorten a single parameter value, serializing containers as `JSON` first."""
+        if isinstance(value, bytes):
+            return "<{0} bytes>".format(len(value))
+        if isinstance(value, (dict, list, tuple)):
+            value = json.dumps(value, default=str)
+        if isinstance(value, str) and len(value) > self.max_parameter_length:
+            return "{0}... ({1} chars)".format(value[:self.max_parameter_length], len(value))
+        return value
+
+    def _operations(self):
+        """Retrieve the operations currently running in this thread, with their profiles."""
+        operations = getattr(self._local, "operations", None)
+        if operations is None:
+            operations = self._local.operations = []
+        return operations
+
+
+def enable(threshold=DEFAULT_THRESHOLD, **kwargs):
+    """Start logging operations slower than given threshold.
+
+    Parameters
+    ----------
+    threshold : float, optional
+        Seconds an operation must take to be logged, by default `DEFAULT_THRESHOLD`
+    **kwargs
+        Further arguments of `MaglaSlowLogExporter`
+
+    Returns
+    -------
+    MaglaSlowLogExporter
+        The exporter, to pass to `disable`
+    """
+    return trace.add_exporter(MaglaSlowLogExporter(threshold, **kwargs))
+
+
+def disable(exporter=None):
+    """Stop logging slow operations.
+
+    Parameters
+    ----------
+    exporter : MaglaSlowLogExporter, optional
+        The exporter returned by `enable`, by default all of them
+    """
+    for exporter_ in trace.exporters():
+        if exporter_ is exporter or (exporter is None and isinstance(
+                exporter_, MaglaSlowLogExporter)):
+            trace.remove_exporter(exporter_)
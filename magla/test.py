@@ -2,6 +2,8 @@
 import configparser
 import os
 
+import opentimelineio as otio
+
 from magla import Config, Entity
 
 
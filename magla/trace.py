@@ -0,0 +1,439 @@
+"""Timing spans around `magla`'s hot paths, exported to logs, `JSON`-lines files or Prometheus.
+
+Tracing is off by default: until an exporter is added, spans cost a single check. Exporters are
+added in code, or from the `MAGLA_TRACE` environment variable which is read on import - a comma
+separated list of:
+
+    - `log`: log every span, see `MaglaLoggingExporter`
+    - `jsonl=<path>`: append every span to a `JSON`-lines file, see `MaglaJsonLinesExporter`
+    - `prometheus=<port>`: serve span histograms at `http://<host>:<port>/metrics`, see
+      `MaglaPrometheusExporter`
+    - `slow=<milliseconds>`: log operations slower than given threshold with the `SQL` they
+      issued, see `magla.slowlog`
+
+    Example:
+        ```
+        MAGLA_TRACE="jsonl=/var/log/magla/spans.jsonl,prometheus=9464" python render_job.py
+        ```
+
+    Example:
+        ```
+        from magla import trace
+
+        trace.add_exporter(trace.MaglaLoggingExporter())
+        with trace.span("publish", shot=shot.name):
+            ...
+
+        @trace.traced("publish.copy")
+        def copy(...):
+            ...
+        ```
+
+Spans nest within a thread, each exported span knows the name of its parent.
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+# histogram buckets of `MaglaPrometheusExporter`, in seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_exporters = []
+# the `enter(span)` methods of exporters which have one, called as each span starts
+_enter_hooks = []
+_local = threading.local()
+
+
+class MaglaTraceError(Exception):
+    """An error accured preventing a trace to continue."""
+
+
+class MaglaSpan(object):
+    """A timed operation, see `span`."""
+    __slots__ = ("name", "attributes", "start", "parent", "_start")
+
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+        self.start = None
+        self.parent = None
+        self._start = None
+
+    def __enter__(self):
+        stack = _stack()
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        for enter in list(_enter_hooks):
+            enter(self)
+        self.start = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        seconds = time.perf_counter() - self._start
+        _stack().pop()
+        record = {
+            "name": self.name,
+            "start": self.start,
+            "seconds": seconds,
+            "parent": self.parent,
+            "attributes": self.attributes,
+            "error": exc_type.__name__ if exc_type else None,
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name
+        }
+        for exporter in list(_exporters):
+            try:
+                exporter.export(record)
+            except Exception as err:
+                logging.warning("Failed to export span '{0}' to {1}: {2}".format(
+                    self.name, exporter, err))
+        return False
+
+    def set(self, key, value):
+        """Attach an attribute to this span.
+
+        Parameters
+        ----------
+        key : str
+            Name of the attribute
+        value : *
+            `JSON`-serializable value of the attribute
+        """
+        self.attributes[key] = value
+
+
+class _NoopSpan(object):
+    """Returned by `span` while no exporter is added."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set(self, key, value):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name, **attributes):
+    """Time the operation within this context.
+
+    Parameters
+    ----------
+    name : str
+        Name of the operation, spans of the same name are aggregated by exporters
+    **attributes
+        `JSON`-serializable attributes of this particular operation
+
+    Returns
+    -------
+    MaglaSpan
+        The span, or a no-op stand-in if no exporter is added
+    """
+    if not _exporters:
+        return _NOOP_SPAN
+    return MaglaSpan(name, attributes)
+
+
+def traced(name=None):
+    """Decorate a function to run each call within a span.
+
+    Parameters
+    ----------
+    name : str, optional
+        Name of the span, by default the function's qualified name
+
+    Returns
+    -------
+    function
+        The decorator
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _exporters:
+                return func(*args, **kwargs)
+            with MaglaSpan(span_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add_exporter(exporter):
+    """Start exporting spans to given exporter.
+
+    Parameters
+    ----------
+    exporter : object
+        An object with an `export(record)` method, such as `MaglaLoggingExporter`, and optionally
+        an `enter(span)` method called as each span starts
+
+    Returns
+    -------
+    object
+        The given exporter
+    """
+    if exporter not in _exporters:
+        _exporters.append(exporter)
+        if hasattr(exporter, "enter"):
+            _enter_hooks.append(exporter.enter)
+    return exporter
+
+
+def remove_exporter(exporter):
+    """Stop exporting spans to given exporter, closing it if it can be.
+
+    Parameters
+    ----------
+    exporter : object
+        A previously added exporter
+    """
+    if exporter in _exporters:
+        _exporters.remove(exporter)
+        if hasattr(exporter, "enter"):
+            _enter_hooks.remove(exporter.enter)
+    if hasattr(exporter, "close"):
+        exporter.close()
+
+
+def exporters():
+    """Retrieve the exporters currently added.
+
+    Returns
+    -------
+    list
+        The exporters
+    """
+    return list(_exporters)
+
+
+def configure(spec=None):
+    """Add the exporters described by given spec, see the module documentation.
+
+    Parameters
+    ----------
+    spec : str, optional
+        Comma separated exporter descriptions, by default the `MAGLA_TRACE` environment variable
+
+    Returns
+    -------
+    list
+        The added exporters
+
+    Raises
+    ------
+    MaglaTraceError
+        An unknown exporter was given
+    """
+    spec = os.getenv("MAGLA_TRACE", "") if spec is None else spec
+    added = []
+    for item in filter(None, (item.strip() for item in spec.split(","))):
+        kind, _, value = item.partition("=")
+        if kind == "log":
+            exporter = MaglaLoggingExporter()
+        elif kind == "jsonl" and value:
+            exporter = MaglaJsonLinesExporter(value)
+        elif kind == "prometheus":
+            exporter = MaglaPrometheusExporter()
+            exporter.serve(int(value or 9464))
+        elif kind == "slow":
+            from .slowlog import MaglaSlowLogExporter
+            exporter = MaglaSlowLogExporter(float(value or 200) / 1000.0)
+        else:
+            raise MaglaTraceError("Unknown trace exporter: '{0}'".format(item))
+        added.append(add_exporter(exporter))
+    return added
+
+
+class MaglaLoggingExporter(object):
+    """Log each span with `logging`."""
+
+    def __init__(self, level=logging.INFO, min_seconds=0.0, logger=None):
+        """Initialize with given level and threshold.
+
+        Parameters
+        ----------
+        level : int, optional
+            The logging level, by default `logging.INFO`
+        min_seconds : float, optional
+            Only log spans taking at least this long, by default 0.0
+        logger : logging.Logger, optional
+            The logger to use, by default the `magla.trace` logger
+        """
+        self.level = level
+        self.min_seconds = min_seconds
+        self.logger = logger or logging.getLogger(__name__)
+
+    def export(self, record):
+        if record["seconds"] < self.min_seconds:
+            return
+        self.logger.log(self.level, "span {name} {seconds:.4f}s{error}{attributes}".format(
+            name=record["name"],
+            seconds=record["seconds"],
+            error=" error={0}".format(record["error"]) if record["error"] else "",
+            attributes=" {0}".format(record["attributes"]) if record["attributes"] else ""))
+
+
+class MaglaJsonLinesExporter(object):
+    """Append each span as one line of `JSON` to a file."""
+
+    def __init__(self, path):
+        """Open given file for appending.
+
+        Parameters
+        ----------
+        path : str
+            Path of the `JSON`-lines file, its directory is created if needed
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._lock = threading.Lock()
+        self._file = open(path, "a")
+
+    def export(self, record):
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class MaglaPrometheusExporter(object):
+    """Aggregate spans into histograms, rendered in the Prometheus text exposition format."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix="magla"):
+        """Initialize with given buckets.
+
+        Parameters
+        ----------
+        buckets : tuple of float, optional
+            Upper bounds of the histogram buckets in seconds, by default `DEFAULT_BUCKETS`
+        prefix : str, optional
+            Prefix of the metric names, by default "magla"
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._errors = {}
+        self._server = None
+
+    def export(self, record):
+        with self._lock:
+            histogram = self._histograms.get(record["name"])
+            if histogram is None:
+                histogram = self._histograms[record["name"]] = {
+                    "buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(self.buckets):
+                if record["seconds"] <= bound:
+                    histogram["buckets"][index] += 1
+            histogram["sum"] += record["seconds"]
+            histogram["count"] += 1
+            if record["error"]:
+                self._errors[record["name"]] = self._errors.get(record["name"], 0) + 1
+
+    def render(self):
+        """Render the current histograms.
+
+        Returns
+        -------
+        str
+            The metrics in the Prometheus text exposition format
+        """
+        metric = "{0}_span_seconds".format(self.prefix)
+        errors = "{0}_span_errors_total".format(self.prefix)
+        lines = [
+            "# HELP {0} Duration of magla operations.".format(metric),
+            "# TYPE {0} histogram".format(metric)]
+        with self._lock:
+            for name, histogram in sorted(self._histograms.items()):
+                for bound, count in zip(self.buckets, histogram["buckets"]):
+                    lines.append('{0}_bucket{{span="{1}",le="{2}"}} {3}'.format(
+                        metric, name, bound, count))
+                lines.append('{0}_bucket{{span="{1}",le="+Inf"}} {2}'.format(
+                    metric, name, histogram["count"]))
+                lines.append('{0}_sum{{span="{1}"}} {2}'.format(metric, name, histogram["sum"]))
+                lines.append('{0}_count{{span="{1}"}} {2}'.format(
+                    metric, name, histogram["count"]))
+            lines.append("# HELP {0} Failed magla operations.".format(errors))
+            lines.append("# TYPE {0} counter".format(errors))
+            for name, count in sorted(self._errors.items()):
+                lines.append('{0}{{span="{1}"}} {2}'.format(errors, name, count))
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=9464, host=""):
+        """Serve the rendered metrics at `/metrics` from a background thread.
+
+        Parameters
+        ----------
+        port : int, optional
+            The port to listen on, 0 for any free port, by default 9464
+        host : str, optional
+            The address to listen on, by default all
+
+        Returns
+        -------
+        http.server.HTTPServer
+            The running server, handling each request in a thread
+        """
+        import socketserver
+        from http.server import BaseHTTPRequestHandler, HTTPServer
+        exporter = self
+
+        # `http.server.ThreadingHTTPServer` requires python 3.7
+        class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+            daemon_threads = True
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="magla-trace-metrics",
+                         daemon=True).start()
+        return self._server
+
+    def close(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def _stack():
+    """Retrieve the spans currently open in this thread."""
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+if os.getenv("MAGLA_TRACE"):
+    configure()
@@ -1,14 +1,25 @@
 """Utility functions."""
 import configparser
+import errno
+import functools
+import hashlib
 import json
 import os
 import random
+import re
+import shutil
 import subprocess
 import sys
+import tempfile
+import time
 import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 
 import opentimelineio as otio
 
+from .trace import traced
+
 
 class MaglaUtilsError(Exception):
     """Root error class for `magla.utils` module."""
@@ -18,26 +29,47 @@ class MachineConfigNotFoundError(MaglaUtilsError):
     """No `machine.ini` file found on current machine, or at the given target path."""
 
 
-def get_machine_uuid(path=None):
+# machine uuids already read, by `machine.ini` path
+_machine_uuids = {}
+
+
+def machine_config_path():
+    """Retrieve the path to the `machine.ini` file within `MAGLA_MACHINE_CONFIG_DIR`.
+
+    Returns
+    -------
+    str
+        Path to the `machine.ini` file, which may not exist
+    """
+    return os.path.join(os.environ["MAGLA_MACHINE_CONFIG_DIR"], "machine.ini")
+
+
+def get_machine_uuid(path=None, refresh=False):
     """Retrieve the unique machine uuid from this machine's `site_config_dir` if one exists.
 
+    The file is only read the first time for each path, after that the cached uuid is returned.
+
     Parameters
     ----------
     file : str, optional
         The path to the `machine.ini` file for this machine, by default None
+    refresh : bool, optional
+        Flag for reading the file again instead of using the cached uuid, by default False
 
     Returns
     -------
     str
         Unique string identifying this machine within the `magla` ecosystem.
     """
-    machine_config = configparser.ConfigParser()
-    machine_ini = path or os.path.join(
-        os.environ["MAGLA_MACHINE_CONFIG_DIR"], "machine.ini")
+    machine_ini = path or machine_config_path()
+    if not refresh and machine_ini in _machine_uuids:
+        return _machine_uuids[machine_ini]
     if not os.path.isfile(machine_ini):
         raise MachineConfigNotFoundError(machine_ini)
+    machine_config = configparser.ConfigParser()
     machine_config.read(machine_ini)
-    return machine_config["DEFAULT"].get("uuid")
+    _machine_uuids[machine_ini] = machine_config["DEFAULT"].get("uuid")
+    return _machine_uuids[machine_ini]
 
 
 def generate_machine_uuid():
@@ -65,11 +97,14 @@ def write_machine_uuid(string=None, makefile=True):
     machine_config["DEFAULT"]["uuid"] = string or str(generate_machine_uuid())
     if not os.path.isdir(os.environ["MAGLA_MACHINE_CONFIG_DIR"]):
         os.makedirs(os.environ["MAGLA_MACHINE_CONFIG_DIR"])
-    with open(os.path.join(os.environ["MAGLA_MACHINE_CONFIG_DIR"], "machine.ini"), "w+") as fo:
+    machine_ini = machine_config_path()
+    with open(machine_ini, "w+") as fo:
         machine_config.write(fo)
+    _machine_uuids[machine_ini] = machine_config["DEFAULT"]["uuid"]
     return machine_config["DEFAULT"]["uuid"]
 
 
+@traced("otio_to_dict")
 def otio_to_dict(target):
     """TODO: Convert given `opentimelineio.schema.SerializeableObject` object to dict.
 
@@ -94,6 +129,7 @@ def otio_to_dict(target):
     return target
 
 
+@traced("dict_to_otio")
 def dict_to_otio(target):
     """Convert a previously converted dict back to an `opentimelineio.schema.SerializeableObject`.
 
@@ -139,6 +175,52 @@ def is_otio_dict(dict_):
     return isinstance(dict_, dict) and "OTIO_SCHEMA" in dict_
 
 
+def compress_otio(target, level=6):
+    """Serialize and compress given `opentimelineio` object or otio dict.
+
+    The `JSON` is written with sorted keys and no whitespace so that identical timelines always
+    produce identical bytes and checksums.
+
+    Parameters
+    ----------
+    target : opentimelineio.schema.SerializeableObject or dict
+        The `opentimelineio` object or previously converted dict to compress
+    level : int, optional
+        `zlib` compression level, by default 6
+
+    Returns
+    -------
+    tuple
+        The compressed bytes, the `sha1` hex digest of the uncompressed `JSON`, and the size in
+        bytes of the uncompressed `JSON`
+    """
+    stringify = json.dumps(otio_to_dict(target), sort_keys=True, separators=(",", ":"))
+    raw = stringify.encode("utf-8")
+    return zlib.compress(raw, level), hashlib.sha1(raw).hexdigest(), len(raw)
+
+
+def decompress_otio(blob, otio_as_dict=False):
+    """Decompress bytes previously created by `compress_otio`.
+
+    Parameters
+    ----------
+    blob : bytes
+        The compressed bytes
+    otio_as_dict : bool, optional
+        Flag whether or not to return the plain dict instead of an object, by default False
+
+    Returns
+    -------
+    opentimelineio.schema.SerializeableObject or dict
+        The decompressed `opentimelineio` object or dict
+    """
+    stringify = zlib.decompress(blob).decode("utf-8")
+    if otio_as_dict:
+        return json.loads(stringify)
+    return otio.adapters.read_from_string(stringify)
+
+
+@traced("record_to_dict")
 def record_to_dict(record, otio_as_dict=True):
     """Convert given `sqlalchemy.ext.declarative.api.Base` mapped entity to dict.
 
@@ -160,7 +242,7 @@ def record_to_dict(record, otio_as_dict=True):
         val = getattr(record, c.name)
         if otio_as_dict and is_otio_dict(val):
             val = otio_to_dict(val)
-        else:
+        elif isinstance(val, dict):
             val = dict_to_otio(val)
         dict_[c.name] = val
     return dict_
@@ -194,6 +276,453 @@ def apply_dict_to_record(record, data, otio_as_dict=True):
     return record
 
 
+# `FICLONE` ioctl request number from `linux/fs.h`
+FICLONE = 0x40049409
+
+# errnos meaning a copy method isn't supported for the given files, so the next one can be tried
+_UNSUPPORTED_ERRNOS = {
+    errno.EBADF, errno.EINVAL, errno.ENOSYS, errno.ENOTTY, errno.EOPNOTSUPP, errno.EPERM,
+    errno.EXDEV}
+
+
+def _copy_through_temp_file(src, dst, write):
+    """Call `write(src_fo, dst_fo)` on a temporary file next to `dst`, renamed over it on success.
+
+    `dst` is left untouched if writing fails, rather than being left empty or truncated.
+    """
+    fd, temp_path = tempfile.mkstemp(
+        prefix=".{0}.".format(os.path.basename(dst)), dir=os.path.dirname(dst) or ".")
+    try:
+        with open(src, "rb") as src_fo, os.fdopen(fd, "wb") as dst_fo:
+            write(src_fo, dst_fo)
+        shutil.copystat(src, temp_path)
+        os.replace(temp_path, dst)
+    except BaseException:
+        if os.path.lexists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _reflink(src, dst):
+    """Clone `src` to `dst` sharing data blocks copy-on-write (btrfs, XFS, ...)."""
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError(errno.ENOSYS, "reflinks require fcntl, which isn't available on {0}".format(
+            sys.platform))
+
+    def clone(src_fo, dst_fo):
+        fcntl.ioctl(dst_fo.fileno(), FICLONE, src_fo.fileno())
+    _copy_through_temp_file(src, dst, clone)
+
+
+def _copy_file_range(src, dst):
+    """Copy `src` to `dst` in-kernel, allowing the filesystem to copy server-side (NFS, SMB)."""
+    if not hasattr(os, "copy_file_range"):
+        raise OSError(errno.ENOSYS, "os.copy_file_range is not available")
+
+    def copy_range(src_fo, dst_fo):
+        remaining = os.fstat(src_fo.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(src_fo.fileno(), dst_fo.fileno(), remaining)
+            if not copied:
+                # some filesystems copy nothing rather than failing, leaving `dst` truncated
+                raise OSError(errno.ENOSYS, "os.copy_file_range stopped with {0} bytes left".format(
+                    remaining))
+            remaining -= copied
+    _copy_through_temp_file(src, dst, copy_range)
+
+
+COPY_STRATEGIES = {
+    "copy": [("copy", shutil.copy2)],
+    "reflink": [("reflink", _reflink)],
+    "copy_file_range": [("copy_file_range", _copy_file_range)],
+    "auto": [
+        ("reflink", _reflink),
+        ("copy_file_range", _copy_file_range),
+        ("copy", shutil.copy2)]
+}
+
+
+def copy_file(src, dst, strategy="auto"):
+    """Copy a single file, timing the copy and reporting the outcome instead of raising.
+
+    Strategies:
+    -----------
+        - copy: a regular `shutil.copy2`
+        - reflink: a copy-on-write clone, near-instant and sharing storage until either file is
+          modified (btrfs, XFS with reflink, ...)
+        - copy_file_range: an in-kernel copy which network filesystems can perform server-side
+        - auto: reflink, falling back to copy_file_range, falling back to copy
+
+    Parameters
+    ----------
+    src : str
+        Path to the source file to copy
+    dst : str
+        Path to the destination file to save as
+    strategy : str, optional
+        One of the `COPY_STRATEGIES` keys, by default "auto"
+
+    Returns
+    -------
+    dict
+        Dictionary containing `src`, `dst`, `status` ("copied", "missing" or "failed"), the
+        `method` that was used, `seconds` and `error` (None unless the copy failed)
+    """
+    result = {
+        "src": src, "dst": dst, "status": "copied", "method": None, "seconds": 0.0,
+        "error": None}
+    if strategy not in COPY_STRATEGIES:
+        raise MaglaUtilsError("Unknown copy strategy: '{0}'".format(strategy))
+    start = time.time()
+    methods = COPY_STRATEGIES[strategy]
+    for i, (method, callable_) in enumerate(methods):
+        try:
+            callable_(src, dst)
+            result["method"] = method
+            break
+        except FileNotFoundError as err:
+            result["status"] = "missing" if not os.path.exists(src) else "failed"
+            result["error"] = err
+            break
+        except (OSError, shutil.Error) as err:
+            if getattr(err, "errno", None) in _UNSUPPORTED_ERRNOS and i < len(methods) - 1:
+                continue
+            result["status"] = "failed"
+            result["error"] = err
+            break
+    result["seconds"] = time.time() - start
+    return result
+
+
+def copy_files(jobs, max_workers=None, strategy="auto"):
+    """Copy multiple files concurrently using a bounded thread pool.
+
+    Parameters
+    ----------
+    jobs : list of tuple
+        List of (`src`, `dst`) path pairs
+    max_workers : int, optional
+        Maximum number of concurrent copies, by default None (8)
+    strategy : str, optional
+        One of the `COPY_STRATEGIES` keys (see `copy_file`), by default "auto"
+
+    Returns
+    -------
+    list of dict
+        The result of `copy_file` for each job, in the order given
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers or 8, len(jobs))) as executor:
+        return list(executor.map(lambda job: copy_file(job[0], job[1], strategy), jobs))
+
+
+TRASH_DIR_NAME = ".magla_trash"
+
+# errnos meaning the volume's trash directory can't be used, so the sibling one should be tried
+_TRASH_FALLBACK_ERRNOS = {errno.EACCES, errno.EPERM, errno.EROFS, errno.EXDEV}
+
+
+def mount_point(path):
+    """Find the mount point of the volume containing given path.
+
+    Parameters
+    ----------
+    path : str
+        Absolute path, which does not need to exist
+
+    Returns
+    -------
+    str
+        The mount point directory
+    """
+    path = os.path.realpath(path)
+    while not os.path.ismount(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+def move_to_trash(path):
+    """Atomically move given file or directory into the trash directory of its volume.
+
+    The trash directory is created at the volume's mount point, so the move is a single rename
+    regardless of the size of the tree. If the mount point is not writable, or is on another
+    device than `path` (bind mounts), a trash directory next to `path` is used instead.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file or directory to move
+
+    Returns
+    -------
+    str
+        The new path of the moved file or directory inside the trash directory
+    """
+    path = os.path.normpath(path)
+    if not os.path.lexists(path):
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+    name = "{0}.{1}".format(os.path.basename(path), uuid.uuid4().hex)
+    trash_dirs = [
+        os.path.join(mount_point(path), TRASH_DIR_NAME),
+        os.path.join(os.path.dirname(path), TRASH_DIR_NAME)]
+    for trash_dir in trash_dirs:
+        trash_path = os.path.join(trash_dir, name)
+        try:
+            os.makedirs(trash_dir, exist_ok=True)
+            os.rename(path, trash_path)
+            return trash_path
+        except OSError as err:
+            if err.errno not in _TRASH_FALLBACK_ERRNOS or trash_dir == trash_dirs[-1]:
+                raise
+
+
+def remove_tree(path, max_files_per_second=None):
+    """Delete given directory tree bottom-up, optionally pausing to limit the deletion rate.
+
+    Parameters
+    ----------
+    path : str
+        Path to the directory to delete
+    max_files_per_second : int, optional
+        Maximum number of files and directories to remove per second, by default None (unlimited)
+
+    Returns
+    -------
+    int
+        The number of files and directories removed
+    """
+    removed = [0]
+    start = time.time()
+
+    def throttle():
+        removed[0] += 1
+        if max_files_per_second:
+            # sleep off any time we are ahead of the allowed rate
+            ahead = removed[0] / float(max_files_per_second) - (time.time() - start)
+            if ahead > 0:
+                time.sleep(ahead)
+
+    for root, dirs, files in os.walk(path, topdown=False):
+        for name in files:
+            os.remove(os.path.join(root, name))
+            throttle()
+        for name in dirs:
+            dir_path = os.path.join(root, name)
+            if os.path.islink(dir_path):
+                os.remove(dir_path)
+            else:
+                os.rmdir(dir_path)
+            throttle()
+    os.rmdir(path)
+    return removed[0] + 1
+
+
+@functools.lru_cache(maxsize=256)
+def frame_sequence_pattern(prefix, suffix, padding=1):
+    """Compile the regex matching file names of given frame sequence, capturing the frame number.
+
+    Parameters
+    ----------
+    prefix : str
+        Everything before the frame number, e.g. 'project_shot_v001.'
+    suffix : str
+        Everything after the frame number, e.g. '.png'
+    padding : int, optional
+        Minimum number of digits of the frame number, by default 1
+
+    Returns
+    -------
+    re.Pattern
+        The compiled (cached) regex
+    """
+    return re.compile(r"{0}(-?\d{{{1},}}){2}\Z".format(
+        re.escape(prefix), max(padding, 1), re.escape(suffix)))
+
+
+def scan_frame_sequence(directory, prefix, suffix, padding=1):
+    """List given directory once and collect the frames of given sequence, detecting gaps.
+
+    Parameters
+    ----------
+    directory : str
+        Path to the directory containing the frames
+    prefix : str
+        Everything before the frame number, e.g. 'project_shot_v001.'
+    suffix : str
+        Everything after the frame number, e.g. '.png'
+    padding : int, optional
+        Minimum number of digits of the frame number, by default 1
+
+    Returns
+    -------
+    dict
+        The frames found, see `frame_ranges`
+    """
+    pattern = frame_sequence_pattern(prefix, suffix, padding)
+    frames = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = entry.name
+                # cheap string checks first, most entries of a render directory are frames
+                if not (name.startswith(prefix) and name.endswith(suffix)):
+                    continue
+                match = pattern.match(name)
+                if match:
+                    frames.append(int(match.group(1)))
+    except FileNotFoundError:
+        pass
+    return frame_ranges(frames)
+
+
+def frame_ranges(frames):
+    """Describe given frame numbers by their extent and the gaps between them.
+
+    Parameters
+    ----------
+    frames : iterable of int
+        The frame numbers, in any order
+
+    Returns
+    -------
+    dict
+        Dictionary containing `start_frame` and `end_frame` (None if no frames were given),
+        `count` of frames, and `missing`, a list of inclusive [`first`, `last`] frame ranges
+        absent between `start_frame` and `end_frame`
+    """
+    frames = sorted(frames)
+    missing = []
+    for previous, frame in zip(frames, frames[1:]):
+        if frame - previous > 1:
+            missing.append([previous + 1, frame - 1])
+    return {
+        "start_frame": frames[0] if frames else None,
+        "end_frame": frames[-1] if frames else None,
+        "count": len(frames),
+        "missing": missing
+    }
+
+
+def _allocated_size(stat_result):
+    """Retrieve the bytes a file occupies on disk, or its size where blocks aren't reported."""
+    blocks = getattr(stat_result, "st_blocks", None)
+    return blocks * 512 if blocks is not None else stat_result.st_size
+
+
+def _measure_directory(path, cached=None):
+    """Measure the files directly inside given directory, unless its cached `mtime` still matches.
+
+    Parameters
+    ----------
+    path : str
+        Absolute path of the directory
+    cached : list, optional
+        Previous result for the directory, by default None
+
+    Returns
+    -------
+    list or None or OSError
+        [`mtime_ns`, `bytes`, `files`, `subdirs`, `listed`], None if the directory is gone, or
+        the error if it couldn't be listed otherwise
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    except OSError as err:
+        return err
+    if cached and cached[0] == mtime:
+        return list(cached[:4]) + [False]
+    size = files = 0
+    subdirs = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    else:
+                        size += _allocated_size(entry.stat(follow_symlinks=False))
+                        files += 1
+                except FileNotFoundError:
+                    continue
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    except OSError as err:
+        return err
+    return [mtime, size, files, sorted(subdirs), True]
+
+
+def measure_tree(root, cache=None, known=None, max_workers=None):
+    """Measure the disk usage of given directory tree, listing directories in parallel.
+
+    The tree is walked breadth-first, each level listed concurrently with `os.scandir`. A
+    directory whose `mtime` matches the given cache isn't listed again, its cached file totals
+    and sub-directories are used instead. A directory's `mtime` changes when entries are added,
+    removed or renamed, but not when a file is rewritten in place, so pass an empty cache for an
+    exact measurement.
+
+    Parameters
+    ----------
+    root : str
+        Path to the root directory of the tree
+    cache : dict, optional
+        The `cache` returned by a previous measurement of the same tree, by default None
+    known : dict, optional
+        Totals of sub-trees measured already, keyed by normalized absolute path. Those sub-trees
+        are not walked, by default None
+    max_workers : int, optional
+        Maximum number of directories to list at once, by default None (16)
+
+    Returns
+    -------
+    dict
+        Dictionary containing the `bytes` allocated, the number of `files` and sub-directories
+        (`dirs`), the number of directories `listed`, the new `cache` keyed by relative path and
+        the `errors` of directories which couldn't be listed (such as for lack of permission),
+        each as a dict containing `path` and `error`. Those directories aren't counted
+    """
+    cache = cache or {}
+    known = known or {}
+    totals = {"bytes": 0, "files": 0, "dirs": 0, "listed": 0, "cache": {}, "errors": []}
+    level = [""]
+    with ThreadPoolExecutor(max_workers=max_workers or 16) as executor:
+        while level:
+            next_level = []
+            results = executor.map(
+                lambda rel: _measure_directory(os.path.join(root, rel), cache.get(rel)), level)
+            for rel, result in zip(level, results):
+                if result is None:
+                    continue
+                if isinstance(result, OSError):
+                    totals["errors"].append(
+                        {"path": os.path.join(root, rel), "error": str(result)})
+                    continue
+                mtime, size, files, subdirs, listed = result
+                totals["cache"][rel] = [mtime, size, files, subdirs]
+                totals["bytes"] += size
+                totals["files"] += files
+                totals["dirs"] += len(subdirs)
+                totals["listed"] += int(listed)
+                for name in subdirs:
+                    sub_rel = os.path.join(rel, name)
+                    sub_totals = known.get(os.path.normpath(os.path.join(root, sub_rel)))
+                    if sub_totals:
+                        for key in ("bytes", "files", "dirs"):
+                            totals[key] += sub_totals[key]
+                        continue
+                    next_level.append(sub_rel)
+            level = next_level
+    return totals
+
+
 def open_directory_location(target_path):
     """Open given target path using current operating system.
 
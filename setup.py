@@ -28,6 +28,11 @@ setuptools.setup(
             "flake8",
             "pytest",
             "pytest-cov",
+        ],
+        "interchange": [
+            "otio-aaf-adapter",
+            "otio-cmx3600-adapter",
+            "otio-fcp-adapter"
         ]
     },
     long_description=long_description,
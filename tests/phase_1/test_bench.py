@@ -0,0 +1,69 @@
+"""Testing for `magla.bench`"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import magla
+from magla import bench
+from magla.core.entity import MaglaEntity
+from magla.db.orm import MaglaORM
+from magla.test import MaglaEntityTestFixture
+
+
+class TestBench(MaglaEntityTestFixture):
+
+    def test_can_time_cold_start(self, entity_test_fixture):
+        results = bench.cold_start(repeat=1)
+        assert sorted(results["stages"]) == sorted(bench.COLD_START_STAGES)
+        for summary in results["stages"].values():
+            assert summary["runs"] == 1 and summary["min"] > 0
+
+    def test_can_compare_to_baseline(self):
+        baseline = {"stages": {"import_magla": bench.summarize([0.1]),
+                               "connect": bench.summarize([0.1])}}
+        results = {"stages": {"import_magla": bench.summarize([0.11]),
+                              "connect": bench.summarize([0.2])}}
+        path = os.path.join(tempfile.mkdtemp(), "baseline.json")
+        bench.write(baseline, path)
+        regressions = bench.compare(results, bench.read(path), tolerance=0.2)
+        assert [regression["name"] for regression in regressions] == ["connect"]
+
+    def test_can_switch_database(self, entity_test_fixture):
+        MaglaEntity.connect()
+        orm = MaglaEntity._orm
+        config = dict(MaglaORM.CONFIG)
+        users = len(magla.Root().all(magla.User))
+        data_dir = tempfile.mkdtemp()
+        with bench.database("magla_bench_test", "sqlite", data_dir) as bench_orm:
+            assert bench_orm is MaglaEntity._orm and bench_orm is not orm
+            assert magla.Root().all(magla.User) == []
+            magla.Root().create(magla.User, {"nickname": "bench_user"})
+        assert os.path.isfile(os.path.join(data_dir, "magla_bench_test"))
+        assert MaglaEntity._orm is orm
+        assert MaglaORM.CONFIG == config
+        assert len(magla.Root().all(magla.User)) == users
+
+    def test_can_time_throughput_in_process(self, entity_test_fixture, tmp_path):
+        users = len(magla.Root().all(magla.User))
+        results = bench.throughput(shots=1, versions=1, users=1, repeat=1,
+                                   db_name="magla_bench_test", dialect="sqlite",
+                                   data_dir=str(tmp_path))
+        assert results["sizes"]["shots"] == 1
+        assert os.path.isfile(os.path.join(str(tmp_path), "magla_bench_test"))
+        assert len(magla.Root().all(magla.User)) == users
+
+    def test_can_time_throughput(self):
+        # run against its own database and machine config, leaving the seeded backend untouched
+        output = os.path.join(tempfile.mkdtemp(), "throughput.json")
+        env = dict(os.environ, MAGLA_DB_DATA_DIR=tempfile.mkdtemp(),
+                   MAGLA_MACHINE_CONFIG_DIR=tempfile.mkdtemp())
+        subprocess.run([sys.executable, "-m", "magla.bench", "throughput", "--shots", "2",
+                        "--versions", "1", "--repeat", "1", "--output", output],
+                       check=True, stdout=subprocess.DEVNULL, env=env)
+        with open(output) as fo:
+            results = json.load(fo)
+        assert sorted(results["stages"]) == sorted(bench.THROUGHPUT_STAGES)
+        assert results["sizes"]["shots"] == 2
+        assert results["stages"]["version_up"]["runs"] == 2
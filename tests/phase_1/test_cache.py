@@ -0,0 +1,61 @@
+"""Testing for `magla.core.cache`"""
+import os
+import time
+
+import pytest
+
+import magla
+from magla.core.cache import MaglaCache, MaglaCacheError, from_environment
+from magla.core.data import MaglaData
+from magla.core.entity import MaglaEntity
+from magla.core.project import MaglaProject
+from magla.test import MaglaEntityTestFixture
+
+
+class TestCache(MaglaEntityTestFixture):
+
+    @pytest.fixture(scope="function")
+    def cache(self, monkeypatch):
+        monkeypatch.setattr(MaglaData._cache, "ttl", 60)
+        MaglaData._cache.clear()
+        yield MaglaData._cache
+        MaglaData._cache.clear()
+
+    def test_can_expire_and_evict_entries(self):
+        cache = MaglaCache(ttl=0.05, max_size=2)
+        cache.set("projects", 1, {"id": 1})
+        cache.set("projects", 2, {"id": 2})
+        assert cache.get("projects", 1) == {"id": 1}
+        cache.set("projects", 3, {"id": 3})
+        assert cache.get("projects", 2) is None
+        assert len(cache) == 2
+        time.sleep(0.06)
+        assert cache.get("projects", 1) is None
+
+    def test_is_disabled_by_default(self, monkeypatch):
+        monkeypatch.delitem(os.environ, "MAGLA_CACHE_TTL", raising=False)
+        assert not from_environment().enabled
+        monkeypatch.setitem(os.environ, "MAGLA_CACHE_TTL", "60")
+        assert from_environment().enabled
+
+    def test_can_read_through(self, entity_test_fixture, cache):
+        MaglaProject(id=1)
+        with magla.profile() as p:
+            project = MaglaProject(id=1)
+        assert p.count == 0
+        assert project.name and project.data.record.id == 1
+
+    def test_can_invalidate_on_push(self, entity_test_fixture, cache):
+        project = MaglaProject(id=1)
+        name = project.name
+        project.data.name = "renamed_project"
+        project.data.push()
+        try:
+            assert MaglaProject(id=1).name == "renamed_project"
+        finally:
+            self.reset(project)
+        assert MaglaProject(id=1).name == name
+
+    def test_can_only_listen_with_postgres(self, entity_test_fixture, cache):
+        with pytest.raises(MaglaCacheError):
+            cache.listen(MaglaEntity._orm._Engine)
@@ -0,0 +1,187 @@
+"""Testing for `magla.core.directory`"""
+import os
+import queue
+import tempfile
+import types
+
+import pytest
+from magla import utils
+from magla.core.directory import MaglaDirectory, MaglaPathTemplate, MaglaPathValues
+from magla.core.shot_version import MaglaShotVersion
+from magla.test import MaglaEntityTestFixture
+
+
+class TestDirectory(MaglaEntityTestFixture):
+
+    @pytest.fixture(scope="function")
+    def temp_directory(self, entity_test_fixture):
+        # seed directory 2 is the project tree, relocated to a temp dir without pushing
+        directory = MaglaDirectory(id=2)
+        directory.data.path = os.path.join(tempfile.mkdtemp(), "test_project")
+        yield directory
+
+    def test_can_flatten_tree(self, temp_directory):
+        root = temp_directory.path
+        assert temp_directory.tree_paths() == [
+            os.path.join(root, "shots"),
+            os.path.join(root, "audio"),
+            os.path.join(root, "preproduction"),
+            os.path.join(root, "preproduction", "mood"),
+            os.path.join(root, "preproduction", "reference"),
+            os.path.join(root, "preproduction", "edit")
+        ]
+
+    def test_can_make_tree(self, temp_directory):
+        created = temp_directory.make_tree()
+        assert created == [temp_directory.path] + temp_directory.tree_paths()
+        for path in created:
+            assert os.path.isdir(path)
+        # only missing directories are created
+        os.rmdir(os.path.join(temp_directory.path, "preproduction", "edit"))
+        assert temp_directory.make_tree() == [
+            os.path.join(temp_directory.path, "preproduction", "edit")]
+
+    def test_can_compile_tree(self, temp_directory):
+        compiled = MaglaDirectory.compile_tree(temp_directory.tree)
+        assert compiled == tuple(
+            os.path.relpath(path, temp_directory.path) for path in temp_directory.tree_paths())
+        # the same tree content is only flattened once
+        assert MaglaDirectory.compile_tree(list(temp_directory.tree)) is compiled
+
+    def test_can_format_path_template(self, entity_test_fixture):
+        shot_version = MaglaShotVersion(id=1)
+        template_str = "{shot_version.shot.directory.path}/{shot_version.num:03d}/" \
+            "{shot_version.full_name!s}"
+        template = MaglaPathTemplate.compile(template_str)
+        assert MaglaPathTemplate.compile(template_str) is template
+        assert template.fields == {"shot_version"}
+        assert template.format(shot_version=shot_version) == template_str.format(
+            shot_version=shot_version)
+
+    def test_path_template_looks_up_like_str_format(self):
+        assert MaglaPathTemplate.compile("{sv[name]}").format(sv={"name": "x"}) == "x"
+        with pytest.raises(AttributeError):
+            MaglaPathTemplate.compile("{sv.name}").format(sv={"name": "x"})
+        with pytest.raises(TypeError):
+            MaglaPathTemplate.compile("{sv[name]}").format(sv=MaglaPathTemplate("x"))
+
+    def test_can_verify_and_repair(self, temp_directory):
+        report = temp_directory.verify()
+        assert report["missing"] == [temp_directory.path] + temp_directory.tree_paths()
+        assert report["repaired"] == []
+        assert temp_directory.verify(repair=True)["repaired"] == report["missing"]
+        os.mkdir(os.path.join(temp_directory.path, "unknown"))
+        os.mkdir(os.path.join(temp_directory.path, "shots", "shot_010"))
+        report = temp_directory.verify()
+        assert report["missing"] == []
+        # `shots` is a leaf of the tree so its contents are not reported
+        assert report["extra"] == [os.path.join(temp_directory.path, "unknown")]
+
+    def test_can_audit_unreadable_directory(self, temp_directory, monkeypatch):
+        temp_directory.make_tree()
+        unreadable = os.path.join(temp_directory.path, "preproduction")
+        scandir = os.scandir
+
+        def denied_scandir(path):
+            if os.path.normpath(path) == unreadable:
+                raise PermissionError(13, "Permission denied", path)
+            return scandir(path)
+        monkeypatch.setattr(os, "scandir", denied_scandir)
+        report = temp_directory.verify()
+        assert [error["path"] for error in report["errors"]] == [unreadable]
+        assert report["missing"] == []
+        usage = temp_directory.measure(full=True)
+        # the unreadable directory's sub-directories aren't counted
+        assert usage["dirs"] == len(temp_directory.tree_paths()) - 3
+
+    def test_can_delete_tree_in_background(self, temp_directory, monkeypatch):
+        # keep the trash within the temp dir rather than at the real mount point
+        temp_root = os.path.dirname(temp_directory.path)
+        monkeypatch.setattr(utils, "mount_point", lambda path: temp_root)
+        temp_directory.make_tree()
+        trash_path = temp_directory.delete_tree(background=True, max_files_per_second=1000)
+        assert not os.path.exists(temp_directory.path)
+        assert os.path.dirname(trash_path) == os.path.join(temp_root, utils.TRASH_DIR_NAME)
+        assert os.path.basename(trash_path).startswith("test_project.")
+        MaglaDirectory.wait_for_trash()
+        assert not os.path.exists(trash_path)
+
+    def test_queues_trash_once_and_reports_leftovers(self, monkeypatch, caplog):
+        trash_dir = os.path.join(tempfile.mkdtemp(), utils.TRASH_DIR_NAME)
+        os.makedirs(os.path.join(trash_dir, "tree"))
+        monkeypatch.setattr(MaglaDirectory, "_trash_queue", queue.Queue())
+        monkeypatch.setattr(MaglaDirectory, "_trash_pending", set())
+        # a reaper which never picks anything up, as if the process exited before it could
+        monkeypatch.setattr(MaglaDirectory, "_trash_reaper", types.SimpleNamespace(
+            is_alive=lambda: True))
+        assert MaglaDirectory.empty_trash(trash_dir) == [os.path.join(trash_dir, "tree")]
+        assert MaglaDirectory.empty_trash(trash_dir) == []
+        assert MaglaDirectory._trash_queue.qsize() == 1
+        MaglaDirectory._report_pending_trash()
+        assert os.path.join(trash_dir, "tree") in caplog.text
+
+    def test_can_throttle_removing_directories(self, monkeypatch):
+        root = tempfile.mkdtemp()
+        for name in ("a", "b", "c"):
+            os.makedirs(os.path.join(root, name, "sub"))
+        sleeps = []
+        monkeypatch.setattr(utils.time, "sleep", sleeps.append)
+        # only directories, which are throttled like files
+        assert utils.remove_tree(root, max_files_per_second=1) == 7
+        assert len(sleeps) == 6
+        assert not os.path.exists(root)
+
+    def test_can_resolve_bookmark(self, temp_directory):
+        temp_directory.data.bookmarks = {"render": "_out/{shot_version.full_name}.####.exr"}
+        shot_version = MaglaShotVersion(id=1)
+        expected = os.path.join(
+            temp_directory.path, "_out/{0}.####.exr".format(shot_version.full_name))
+        assert temp_directory.resolve_bookmark("render", shot_version=shot_version) == expected
+        # served from the cache the second time
+        assert temp_directory.resolve_bookmark(
+            "render", shot_version=shot_version) == expected
+        assert temp_directory.resolve_bookmark(
+            "render", shot_version=types.SimpleNamespace(full_name="plain")) == os.path.join(
+                temp_directory.path, "_out/plain.####.exr")
+        # renaming the shot clears the cache, so its versions aren't resolved to stale paths
+        shot = shot_version.shot
+        shot.data.name = "renamed_shot"
+        shot.data.push()
+        renamed = temp_directory.resolve_bookmark("render", shot_version=shot_version)
+        self.reset(shot)
+        assert "renamed_shot" in renamed and renamed != expected
+        MaglaDirectory.clear_bookmark_cache()
+
+    def test_can_capture_path_values(self, entity_test_fixture):
+        shot_version = MaglaShotVersion(id=1)
+        templates = ["{shot_version.shot.directory.path}/{shot_version.num:03d}",
+                     "{shot_version.shot.name}/{shot_version.full_name}"]
+        values = MaglaPathTemplate.capture(templates, shot_version=shot_version, other=1)
+        assert values["other"] == 1
+        assert values["shot_version"] == MaglaPathValues(
+            num=shot_version.num, full_name=shot_version.full_name, shot=MaglaPathValues(
+                name=shot_version.shot.name,
+                directory=MaglaPathValues(path=shot_version.shot.directory.path)))
+        assert hash(values["shot_version"]) == hash(MaglaPathTemplate.capture(
+            templates, shot_version=shot_version)["shot_version"])
+        for template in templates:
+            assert MaglaPathTemplate.compile(template).format(**values) == template.format(
+                shot_version=shot_version)
+        # objects formatted themselves are passed on as given
+        assert MaglaPathTemplate.capture(
+            ["{shot_version}", "{shot_version.num}"],
+            shot_version=shot_version)["shot_version"] is shot_version
+
+    def test_can_measure_usage(self, temp_directory):
+        temp_directory.make_tree()
+        with open(os.path.join(temp_directory.path, "audio", "temp.wav"), "wb") as fo:
+            fo.write(b"\0" * 10000)
+        usage = temp_directory.measure()
+        assert usage["files"] == 1
+        assert usage["dirs"] == len(temp_directory.tree_paths())
+        assert usage["bytes"] > 0
+        # unchanged directories are served from the stored cache
+        with open(os.path.join(temp_directory.path, "preproduction", "notes.txt"), "w") as fo:
+            fo.write("notes")
+        assert temp_directory.measure()["files"] == 2
+        assert temp_directory.usage["files"] == 2
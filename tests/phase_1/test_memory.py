@@ -0,0 +1,51 @@
+"""Testing for `magla.memory`"""
+import os
+import tempfile
+import tracemalloc
+
+from magla import memory
+from magla.core.shot import MaglaShot
+from magla.test import MaglaEntityTestFixture
+
+
+class TestMemory(MaglaEntityTestFixture):
+
+    def test_can_count_live_objects(self, entity_test_fixture):
+        memory.start(nframes=8)
+        try:
+            before = memory.report(limit=0)
+            shots = [MaglaShot(id=1) for _ in range(5)]
+            clips = [shot.otio for shot in shots]
+            after = memory.report()
+        finally:
+            memory.stop()
+        changes = memory.diff(after, before)
+        assert changes["entities"]["MaglaShot"]["count"] >= 5
+        assert changes["data"]["MaglaData"]["count"] >= 5
+        assert after["census"]["records"]["Shot"]["count"] >= 1
+        assert after["census"]["otio"]["Clip"]["count"] >= len(clips)
+        assert after["traced"]["current"] > 0
+        assert any(entry["site"].startswith(os.path.join("magla", "core"))
+                   for entry in after["allocations"])
+        assert "MaglaShot" in memory.format_report(after, before)
+
+    def test_can_dump_report(self, entity_test_fixture):
+        path = os.path.join(tempfile.mkdtemp(), "memory.txt")
+        shot = MaglaShot(id=1)
+        report = memory.dump(path)
+        with open(path) as fo:
+            text = fo.read()
+        assert text.startswith("magla memory report") and "MaglaShot" in text
+        assert report["census"]["entities"]["MaglaShot"]["count"] >= 1 and shot.id == 1
+
+    def test_keeps_tracing_started_elsewhere(self):
+        tracemalloc.start()
+        try:
+            memory.start()
+            memory.stop()
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+        memory.start()
+        memory.stop()
+        assert not tracemalloc.is_tracing()
@@ -0,0 +1,34 @@
+"""Testing for `magla.db.orm`"""
+from magla import bench
+from magla.core.entity import MaglaEntity
+from magla.db.orm import MaglaORM
+from magla.test import MaglaEntityTestFixture
+
+
+class TestORM(MaglaEntityTestFixture):
+
+    def test_can_verify_schema(self, entity_test_fixture, monkeypatch):
+        assert MaglaEntity._orm.schema_verified()
+        # a new process only knows what the live database tells it
+        monkeypatch.setattr(MaglaORM, "_verified_urls", set())
+        assert MaglaEntity._orm.schema_verified()
+        assert repr(MaglaORM._Engine.url) in MaglaORM._verified_urls
+
+    def test_can_skip_setup_when_verified(self, entity_test_fixture, monkeypatch):
+        def setup(self):
+            raise AssertionError("schema should not be set up again")
+        monkeypatch.setattr(MaglaORM, "setup", setup)
+        orm = MaglaORM()
+        orm.init()
+        assert orm.session.query(MaglaEntity.type("User").__schema__).first()
+        orm.session.close()
+
+    def test_can_set_up_missing_schema(self, entity_test_fixture, tmp_path, monkeypatch):
+        monkeypatch.setattr(MaglaORM, "_verified_urls", set())
+        with bench.database("magla_orm_test", "sqlite", str(tmp_path)) as orm:
+            assert not orm.schema_verified()
+            assert not (tmp_path / "magla_orm_test").exists()
+            assert orm.session.query(MaglaEntity.type("User").__schema__).first() is None
+            assert orm.schema_verified()
+            orm._drop_all_tables()
+            assert not orm.schema_verified()
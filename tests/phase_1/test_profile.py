@@ -0,0 +1,33 @@
+"""Testing for `magla.db.profile`"""
+import pytest
+
+import magla
+from magla.core.shot import MaglaShot
+from magla.db.profile import MaglaQueryBudgetError
+from magla.test import MaglaEntityTestFixture
+
+
+class TestProfile(MaglaEntityTestFixture):
+
+    def test_can_count_queries(self, entity_test_fixture):
+        with magla.profile("retrieve shot") as p:
+            shot = MaglaShot(id=1)
+        assert p.count >= 1 and p.seconds > 0 and p.rows >= 1
+        assert shot.id == 1
+        assert any("test_profile.py" in site[-1] for site in (
+            statement["call_site"] for statement in p.statements))
+
+    def test_can_detect_repeated_statements(self, entity_test_fixture):
+        with magla.profile("walk shots") as p:
+            for _ in range(3):
+                MaglaShot(id=1).project
+        repeated = p.repeated()
+        assert repeated and repeated[0]["count"] >= 3
+        assert "likely N+1" in p.report()
+
+    def test_can_enforce_query_budget(self, entity_test_fixture):
+        with pytest.raises(MaglaQueryBudgetError):
+            with magla.profile("over budget", max_queries=0):
+                MaglaShot(id=1)
+        with magla.profile("within budget", max_queries=10):
+            MaglaShot(id=1)
@@ -6,6 +6,7 @@ import tempfile
 import opentimelineio as otio
 import pytest
 from magla.core.project import MaglaProject
+from magla.core.timeline import MaglaTimelineError
 from magla.test import MaglaEntityTestFixture
 from magla.utils import random_string, otio_to_dict, otio_to_dict
 
@@ -85,6 +86,35 @@ class TestProject(MaglaEntityTestFixture):
         seed_project.export_otio(destination, seed_project.shots)
         assert otio.adapters.from_filepath(destination)
 
+    def test_can_export_multiple_formats(self, seed_project):
+        export_dir = tempfile.mkdtemp()
+        results = seed_project.export(export_dir, seed_project.shots, formats=["otio", "otioz"])
+        assert sorted(results) == ["otio", "otioz"]
+        for path in results.values():
+            assert os.path.isfile(path)
+        assert otio.adapters.read_from_file(results["otio"]).name == seed_project.otio.name
+
+    def test_cannot_export_format_without_adapter(self, seed_project, monkeypatch):
+        export_dir = tempfile.mkdtemp()
+        monkeypatch.setattr(otio.adapters, "available_adapter_names", lambda: ["otio_json"])
+        with pytest.raises(MaglaTimelineError, match="aaf"):
+            seed_project.export(export_dir, seed_project.shots)
+        assert os.listdir(export_dir) == []
+
+    def test_can_verify_trees(self, seed_project):
+        reports = seed_project.verify_trees()
+        assert reports[0]["path"] == seed_project.directory.path
+        assert len(reports) == 1 + len(seed_project.shots) + sum(
+            len(shot.versions) for shot in seed_project.shots)
+        for report in reports:
+            assert report["repaired"] == []
+
+    def test_can_retrieve_disk_usage(self, seed_project):
+        usage = seed_project.disk_usage(measure=True)
+        assert usage["project"]["directory_id"] == seed_project.directory.id
+        assert sorted(usage["shots"]) == sorted(shot.id for shot in seed_project.shots)
+        assert seed_project.disk_usage() == usage
+
     def test_can_retrieve_timeline(self, seed_project):
         backend_data = seed_project.timeline.dict(otio_as_dict=True)
         seed_data = self.get_seed_data("Timeline", seed_project.timeline.id-1)
@@ -1,8 +1,11 @@
 """Testing for `magla.core.seed_shot_version`"""
+import os
 import random
 import string
+import tempfile
 
 import pytest
+from magla.core.directory import MaglaDirectory
 from magla.core.shot_version import MaglaShotVersion
 from magla.test import MaglaEntityTestFixture
 from magla.utils import random_string
@@ -33,6 +36,34 @@ class TestShotVersion(MaglaEntityTestFixture):
         self.reset(seed_shot_version)
         assert otio_target_url_base == random_target_url_base
 
+    def test_can_scan_frames(self, seed_shot_version, monkeypatch):
+        directory = MaglaDirectory(id=seed_shot_version.directory.id)
+        directory.data.path = tempfile.mkdtemp()
+        directory.data.bookmarks = {"png_representation": "png/{shot_version.full_name}.####.png"}
+        monkeypatch.setattr(MaglaShotVersion, "directory", property(lambda self: directory))
+        os.mkdir(os.path.join(directory.path, "png"))
+        for frame in [1, 2, 5]:
+            open(os.path.join(directory.path, "png", "{0}.{1:04d}.png".format(
+                seed_shot_version.full_name, frame)), "w").close()
+        result = seed_shot_version.scan_frames(push=False)
+        media_reference = seed_shot_version.otio
+        assert result["missing"] == [[3, 4]]
+        assert media_reference.start_frame == 1
+        assert media_reference.available_range.duration.value == 5
+        missing_frames = media_reference.metadata["magla"]["missing_frames"]
+        assert [list(gap) for gap in missing_frames] == [[3, 4]]
+        assert media_reference.target_url_base == os.path.join(directory.path, "png")
+        for frame in [1, 2, 5]:
+            os.remove(os.path.join(directory.path, "png", "{0}.{1:04d}.png".format(
+                seed_shot_version.full_name, frame)))
+        result = seed_shot_version.scan_frames(push=False)
+        media_reference = seed_shot_version.otio
+        assert result["count"] == 0
+        assert media_reference.available_range is None
+        assert list(media_reference.metadata["magla"]["missing_frames"]) == []
+        MaglaDirectory.clear_bookmark_cache()
+        self.reset(seed_shot_version)
+
     def test_can_retieve_directory(self, seed_shot_version):
         backend_data = seed_shot_version.directory.dict()
         seed_data = self.get_seed_data("Directory", seed_shot_version.directory.id-1)
@@ -0,0 +1,43 @@
+"""Testing for `magla.slowlog`"""
+import logging
+
+import pytest
+from magla import slowlog, trace
+from magla.core.shot import MaglaShot
+from magla.test import MaglaEntityTestFixture
+
+
+class TestSlowLog(MaglaEntityTestFixture):
+
+    @pytest.fixture(scope="function")
+    def exporter(self):
+        exporter = slowlog.enable(threshold=0, max_parameter_length=10)
+        yield exporter
+        slowlog.disable(exporter)
+
+    def test_can_log_slow_operations(self, entity_test_fixture, exporter, caplog):
+        with caplog.at_level(logging.WARNING, logger="magla.slowlog"):
+            MaglaShot(id=1).directory
+        messages = [record.getMessage() for record in caplog.records
+                    if record.name == "magla.slowlog"
+                    and record.getMessage().startswith("slow operation MaglaData.pull")]
+        assert messages
+        assert "SELECT" in messages[-1]
+        assert "magla/core/shot.py" in messages[-1] and "test_slowlog.py" in messages[-1]
+
+    def test_can_skip_fast_operations(self, entity_test_fixture, caplog):
+        exporter = slowlog.enable(threshold=60)
+        try:
+            with caplog.at_level(logging.WARNING, logger="magla.slowlog"):
+                MaglaShot(id=1)
+        finally:
+            slowlog.disable(exporter)
+        assert not [record for record in caplog.records if record.name == "magla.slowlog"]
+        assert exporter not in trace.exporters()
+
+    def test_can_truncate_parameters(self, exporter):
+        truncated = exporter.truncate(("x" * 50, 1, {"otio": {"name": "y" * 50}}, b"\0" * 8))
+        assert truncated[0] == "x" * 10 + "... (50 chars)"
+        assert truncated[1] == 1
+        assert truncated[2].startswith('{"otio": ') and truncated[2].endswith("chars)")
+        assert truncated[3] == "<8 bytes>"
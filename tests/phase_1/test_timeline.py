@@ -1,11 +1,17 @@
 """Testing for `magla.core.seed_timeline`"""
 import string
 
+import opentimelineio as otio
 import pytest
 from magla.core.timeline import MaglaTimeline
 from magla.core.shot import MaglaShot
+from magla.db.orm import MaglaORM
+from magla.db.project import Project
+from magla.db.settings_2d import Settings2D
+from magla.db.timeline import Timeline
+from magla.db.timeline_revision import TimelineRevision
 from magla.test import MaglaEntityTestFixture
-from magla.utils import random_string
+from magla.utils import otio_to_dict, random_string
 
 
 class TestTimeline(MaglaEntityTestFixture):
@@ -55,3 +61,116 @@ class TestTimeline(MaglaEntityTestFixture):
         # insert again to test default behavior with no clip index
         # seed_timeline.insert_shot(MaglaShot(id=1))
         # assert len(seed_timeline.otio.tracks[0]) == track_0_len + 2
+
+    def test_can_snapshot_revisions(self, seed_timeline):
+        original_name = seed_timeline.otio.name
+        first_num = seed_timeline.snapshot()
+        # snapshotting an unchanged timeline does not create a new revision
+        assert seed_timeline.snapshot() == first_num
+        seed_timeline.data.otio.name = random_string(string.ascii_letters, 10)
+        second_num = seed_timeline.snapshot()
+        latest_name = seed_timeline.revision().name
+        self.reset(seed_timeline)
+        assert second_num == first_num + 1
+        assert seed_timeline.revision_num == second_num
+        assert seed_timeline.revision(first_num).name == original_name
+        assert seed_timeline.revision(second_num, otio_as_dict=True)["name"] == latest_name
+        assert [r["num"] for r in seed_timeline.revisions(since=first_num)] == [second_num]
+        assert seed_timeline.revisions(since=second_num) == []
+
+    def test_can_snapshot_concurrently_stored_revision(self, seed_timeline, monkeypatch):
+        session = seed_timeline.orm.session
+        commit = session.commit
+        taken = []
+
+        def store_concurrent_revision_then_commit():
+            # another session claims the revision number this one is about to store
+            if not taken and any(isinstance(record, TimelineRevision) for record in session.new):
+                other_session = MaglaORM._Session()
+                taken.append(max(record.num for record in session.new))
+                other_session.add(TimelineRevision(
+                    timeline_id=seed_timeline.id, num=taken[0], checksum="concurrent"))
+                other_session.commit()
+                other_session.close()
+            commit()
+
+        seed_timeline.data.otio.name = random_string(string.ascii_letters, 10)
+        monkeypatch.setattr(session, "commit", store_concurrent_revision_then_commit)
+        num = seed_timeline.snapshot()
+        monkeypatch.undo()
+        assert num == taken[0] + 1
+        assert seed_timeline.revision(num).name == seed_timeline.otio.name
+
+    def test_can_diff_incoming_edit(self, seed_timeline):
+        def clip(name, duration):
+            return otio.schema.Clip(name=name, source_range=otio.opentime.TimeRange(
+                start_time=otio.opentime.RationalTime(0, 30),
+                duration=otio.opentime.RationalTime(duration, 30)))
+
+        current = otio.schema.Timeline(name="current")
+        current.tracks.append(otio.schema.Track())
+        current.tracks[0].extend([clip("test_shot_01", 10), clip("removed_shot", 5)])
+        seed_timeline.data.otio = current
+
+        incoming = otio.schema.Timeline(name="incoming")
+        incoming.tracks.extend([otio.schema.Track(), otio.schema.Track()])
+        incoming.tracks[0].extend([clip("added_shot", 4)])
+        incoming.tracks[1].extend([otio.schema.Gap(duration=otio.opentime.RationalTime(2, 30)),
+                                   clip("test_shot_01", 12)])
+        # counted at the rate of the clips, rates are covered by `test_can_diff_edit_at_other_rate`
+        changes = seed_timeline.diff(incoming, rate=30)
+        self.reset(seed_timeline)
+
+        assert [c["name"] for c in changes["added"]] == ["added_shot"]
+        assert [c["name"] for c in changes["removed"]] == ["removed_shot"]
+        moved, = changes["moved"]
+        assert moved["shot_id"] == seed_timeline.shot_ids().get("test_shot_01")
+        assert (moved["previous"]["track_index"], moved["track_index"]) == (1, 2)
+        retimed, = changes["retimed"]
+        assert (retimed["start_frame"], retimed["duration"]) == (2, 12)
+        assert (retimed["previous"]["start_frame"], retimed["previous"]["duration"]) == (0, 10)
+
+    def test_can_diff_edit_at_other_rate(self, seed_timeline):
+        current = otio.schema.Timeline(name="current")
+        current.tracks.append(otio.schema.Track())
+        current.tracks[0].append(otio.schema.Clip(
+            name="test_shot_01", source_range=otio.opentime.TimeRange(
+                duration=otio.opentime.RationalTime(30, 30))))
+        # the same shot a second later, in an edit cut at 24 fps
+        incoming = otio.schema.Timeline(name="incoming")
+        incoming.tracks.append(otio.schema.Track())
+        incoming.tracks[0].extend([
+            otio.schema.Gap(duration=otio.opentime.RationalTime(24, 24)),
+            otio.schema.Clip(name="test_shot_01", source_range=otio.opentime.TimeRange(
+                duration=otio.opentime.RationalTime(24, 24)))])
+
+        # a project of its own with a single 2d settings record at 30 fps
+        session = seed_timeline.orm.session
+        timeline_record = Timeline(label="diff at 30 fps", otio=otio_to_dict(current))
+        project_record = Project(name="diff_rate_project", settings={}, timeline=timeline_record)
+        project_record.settings_2d = Settings2D(label="HD @30FPS", width=1920, height=1080, rate=30)
+        session.add(project_record)
+        session.commit()
+        try:
+            timeline = MaglaTimeline(id=timeline_record.id)
+            changes = timeline.diff(incoming)
+            edit_rate_changes = timeline.diff(incoming, rate=24)
+        finally:
+            for record in (project_record.settings_2d, project_record, timeline_record):
+                session.delete(record)
+            session.commit()
+
+        retimed, = changes["retimed"]
+        assert (retimed["start_frame"], retimed["duration"], retimed["rate"]) == (30, 30, 30)
+        assert retimed["previous"]["start_frame"] == 0
+        assert edit_rate_changes["retimed"][0]["start_frame"] == 24
+
+    def test_can_summarize_without_otio_objects(self, seed_timeline):
+        seed_otio = self.seed_otio()
+        summary = MaglaTimeline.summarize(otio_to_dict(seed_otio), {"test_shot": 7})
+        assert summary["name"] == seed_otio.name
+        assert summary["duration"] == seed_otio.duration().to_seconds()
+        assert [t["clip_count"] for t in summary["tracks"]] == [len(t) for t in seed_otio.tracks]
+        assert summary["shot_ids"] == [7]
+        summaries = MaglaTimeline.summaries([seed_timeline.id])
+        assert summaries[seed_timeline.id] == seed_timeline.summary()
@@ -0,0 +1,67 @@
+"""Testing for `magla.trace`"""
+import json
+import os
+import tempfile
+import urllib.request
+
+import pytest
+from magla import trace
+from magla.core.shot import MaglaShot
+from magla.test import MaglaEntityTestFixture
+
+
+class TestTrace(MaglaEntityTestFixture):
+
+    @pytest.fixture(scope="function")
+    def exporter(self):
+        exporter = trace.add_exporter(trace.MaglaPrometheusExporter())
+        yield exporter
+        trace.remove_exporter(exporter)
+
+    def test_is_noop_without_exporters(self):
+        assert not trace.exporters()
+        with trace.span("noop", foo=1) as span:
+            span.set("bar", 2)
+        assert not isinstance(span, trace.MaglaSpan)
+
+    def test_can_trace_hot_paths(self, entity_test_fixture):
+        path = os.path.join(tempfile.mkdtemp(), "spans.jsonl")
+        exporter = trace.add_exporter(trace.MaglaJsonLinesExporter(path))
+        try:
+            with trace.span("test", shot_id=1):
+                MaglaShot(id=1).data.push()
+        finally:
+            trace.remove_exporter(exporter)
+        with open(path) as fo:
+            records = [json.loads(line) for line in fo]
+        names = [record["name"] for record in records]
+        assert {"MaglaData.pull", "MaglaData.push", "record_to_dict", "test"} <= set(names)
+        assert records[-1]["name"] == "test" and records[-1]["attributes"] == {"shot_id": 1}
+        assert all(record["parent"] == "test" for record in records
+                   if record["name"] in ("MaglaData.pull", "MaglaData.push"))
+
+    def test_can_serve_prometheus_metrics(self, exporter):
+        @trace.traced("traced_function")
+        def traced_function(fail=False):
+            if fail:
+                raise ValueError("fail")
+        traced_function()
+        with pytest.raises(ValueError):
+            traced_function(fail=True)
+        server = exporter.serve(port=0, host="127.0.0.1")
+        url = "http://127.0.0.1:{0}/metrics".format(server.server_address[1])
+        body = urllib.request.urlopen(url).read().decode("utf-8")
+        assert 'magla_span_seconds_count{span="traced_function"} 2' in body
+        assert 'magla_span_errors_total{span="traced_function"} 1' in body
+
+    def test_can_configure_from_spec(self):
+        path = os.path.join(tempfile.mkdtemp(), "spans.jsonl")
+        added = trace.configure("log,jsonl={0}".format(path))
+        try:
+            assert [type(exporter) for exporter in added] == [
+                trace.MaglaLoggingExporter, trace.MaglaJsonLinesExporter]
+        finally:
+            for exporter in added:
+                trace.remove_exporter(exporter)
+        with pytest.raises(trace.MaglaTraceError):
+            trace.configure("statsd")
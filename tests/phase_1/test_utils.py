@@ -2,6 +2,7 @@ import configparser
 import json
 import os
 import shutil
+import sys
 import tempfile
 import uuid
 import yaml
@@ -46,14 +47,22 @@ class TestUtils:
         uuid_ = utils.generate_machine_uuid()
         assert isinstance(uuid_, uuid.UUID) and len(str(uuid_)) == 36
     
-    def test_can_write_machine_uuid(self):
+    def test_can_write_machine_uuid(self, monkeypatch):
         temp_machine_config_dir = os.path.join(tempfile.gettempdir(), "temp_machine_config")
         if os.path.exists(temp_machine_config_dir):
             shutil.rmtree(temp_machine_config_dir)
-        os.environ["MAGLA_MACHINE_CONFIG_DIR"] = temp_machine_config_dir
+        monkeypatch.setenv("MAGLA_MACHINE_CONFIG_DIR", temp_machine_config_dir)
         utils.write_machine_uuid()
         assert os.path.isfile(os.path.join(temp_machine_config_dir, "machine.ini"))
     
+    def test_can_cache_machine_uuid(self):
+        machine_ini = os.path.join(tempfile.mkdtemp(), "machine.ini")
+        for uuid_ in ["cached", "refreshed"]:
+            with open(machine_ini, "w") as fo:
+                fo.write("[DEFAULT]\nuuid = {0}\n".format(uuid_))
+            assert utils.get_machine_uuid(machine_ini) == "cached"
+        assert utils.get_machine_uuid(machine_ini, refresh=True) == "refreshed"
+
     def test_can_convert_dict_to_otio(self):
         seed_timeline_data = MaglaTestFixture.get_seed_data("Timeline", 0)
         converted = utils.dict_to_otio(seed_timeline_data)
@@ -75,3 +84,70 @@ class TestUtils:
         assert proc
         proc.kill()
 
+    def test_can_copy_files_concurrently(self):
+        temp_dir = tempfile.mkdtemp()
+        jobs = []
+        for i in range(4):
+            src = os.path.join(temp_dir, "src_{}.txt".format(i))
+            with open(src, "w") as fo:
+                fo.write(str(i))
+            jobs.append((src, os.path.join(temp_dir, "dst_{}.txt".format(i))))
+        jobs.append((os.path.join(temp_dir, "missing.txt"), os.path.join(temp_dir, "dst.txt")))
+        results = utils.copy_files(jobs, max_workers=2)
+        assert [r["status"] for r in results] == ["copied"] * 4 + ["missing"]
+        assert [(r["src"], r["dst"]) for r in results] == jobs
+        for src, dst in jobs[:-1]:
+            with open(dst) as fo:
+                assert fo.read() == src[-5]
+
+    @pytest.mark.parametrize("strategy", ["auto", "copy", "reflink", "copy_file_range"])
+    def test_can_copy_file_with_strategy(self, strategy):
+        temp_dir = tempfile.mkdtemp()
+        src = os.path.join(temp_dir, "src.txt")
+        dst = os.path.join(temp_dir, "dst.txt")
+        with open(src, "w") as fo:
+            fo.write(strategy)
+        result = utils.copy_file(src, dst, strategy)
+        if strategy == "reflink" and result["status"] == "failed":
+            # nothing is left behind by a failed clone
+            assert os.listdir(temp_dir) == ["src.txt"]
+            pytest.skip("reflinks not supported by temp filesystem")
+        assert result["status"] == "copied"
+        with open(dst) as fo:
+            assert fo.read() == strategy
+        assert sorted(os.listdir(temp_dir)) == ["dst.txt", "src.txt"]
+        assert not os.path.samefile(src, dst)
+
+    def test_can_fall_back_from_short_copy_file_range(self, monkeypatch):
+        temp_dir = tempfile.mkdtemp()
+        src = os.path.join(temp_dir, "src.txt")
+        dst = os.path.join(temp_dir, "dst.txt")
+        with open(src, "w") as fo:
+            fo.write("short copy")
+        monkeypatch.setattr(os, "copy_file_range", lambda *args: 0, raising=False)
+        result = utils.copy_file(src, dst, "copy_file_range")
+        assert result["status"] == "failed"
+        assert os.listdir(temp_dir) == ["src.txt"]
+        # reflinks are skipped as if `fcntl` wasn't available
+        monkeypatch.setitem(sys.modules, "fcntl", None)
+        result = utils.copy_file(src, dst, "auto")
+        assert (result["status"], result["method"]) == ("copied", "copy")
+        with open(dst) as fo:
+            assert fo.read() == "short copy"
+
+    def test_raise_unknown_copy_strategy(self):
+        with pytest.raises(utils.MaglaUtilsError):
+            utils.copy_file("src", "dst", "teleport")
+
+    def test_can_scan_frame_sequence(self):
+        frames_dir = tempfile.mkdtemp()
+        for frame in [1001, 1002, 1003, 1006, 1010]:
+            open(os.path.join(frames_dir, "shot_v001.{0:04d}.png".format(frame)), "w").close()
+        for name in ["shot_v001.1004.exr", "shot_v002.1004.png", "shot_v001.12.png"]:
+            open(os.path.join(frames_dir, name), "w").close()
+        assert utils.scan_frame_sequence(frames_dir, "shot_v001.", ".png", 4) == {
+            "start_frame": 1001,
+            "end_frame": 1010,
+            "count": 5,
+            "missing": [[1004, 1005], [1007, 1009]]
+        }
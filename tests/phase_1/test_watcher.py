@@ -0,0 +1,73 @@
+"""Testing for `magla.core.watcher`"""
+import os
+import tempfile
+import time
+
+import pytest
+from magla.core.directory import MaglaDirectory
+from magla.core.shot_version import MaglaShotVersion
+from magla.core.watcher import MaglaWatcher
+from magla.test import MaglaEntityTestFixture
+
+
+class TestWatcher(MaglaEntityTestFixture):
+
+    @pytest.fixture(scope="function")
+    def watched_shot_version(self, entity_test_fixture, monkeypatch):
+        shot_version = MaglaShotVersion(id=1)
+        directory = MaglaDirectory(id=shot_version.directory.id)
+        directory.data.path = tempfile.mkdtemp()
+        directory.data.bookmarks = {"png_representation": "png/{shot_version.full_name}.####.png"}
+        monkeypatch.setattr(MaglaShotVersion, "directory", property(lambda self: directory))
+        yield shot_version
+        MaglaDirectory.clear_bookmark_cache()
+        self.reset(shot_version)
+
+    def write_frame(self, shot_version, frame):
+        frames_dir = os.path.join(shot_version.directory.path, "png")
+        os.makedirs(frames_dir, exist_ok=True)
+        open(os.path.join(frames_dir, "{0}.{1:04d}.png".format(
+            shot_version.full_name, frame)), "w").close()
+
+    @pytest.mark.parametrize("polling", [True, False])
+    def test_can_update_frame_ranges(self, watched_shot_version, polling):
+        self.write_frame(watched_shot_version, 1)
+        watcher = MaglaWatcher([watched_shot_version], batch_seconds=0, polling=polling,
+                               poll_interval=0.01)
+        for frame in [2, 3, 6]:
+            self.write_frame(watched_shot_version, frame)
+        updated = []
+        for _ in range(50):
+            updated.extend(watcher.poll(timeout=0.05))
+            if watcher.frames(watched_shot_version.id)["end_frame"] == 6:
+                break
+        watcher.stop()
+        assert updated and set(updated) == {watched_shot_version.id}
+        # the watcher writes through its own session
+        watched_shot_version.orm.session.expire_all()
+        media_reference = MaglaShotVersion(id=watched_shot_version.id).otio
+        assert media_reference.start_frame == 1
+        assert media_reference.available_range.duration.value == 6
+        assert [list(gap) for gap in media_reference.metadata["magla"]["missing_frames"]] == [
+            [4, 5]]
+
+    def test_can_flush_from_background_thread(self, watched_shot_version):
+        self.write_frame(watched_shot_version, 1)
+        watcher = MaglaWatcher([watched_shot_version], batch_seconds=0, polling=True,
+                               poll_interval=0.01)
+        session = watched_shot_version.orm.session
+        # resolved before starting, so only the watcher thread touches the backend meanwhile
+        frame_path = os.path.join(watched_shot_version.directory.path, "png", "{0}.0002.png".format(
+            watched_shot_version.full_name))
+        watcher.start()
+        open(frame_path, "w").close()
+        for _ in range(100):
+            if watcher.frames(watched_shot_version.id)["end_frame"] == 2:
+                break
+            time.sleep(0.01)
+        watcher.stop()
+        # the shared session was left alone by the background thread
+        assert not session.dirty
+        session.expire_all()
+        media_reference = MaglaShotVersion(id=watched_shot_version.id).otio
+        assert media_reference.available_range.duration.value == 2
@@ -1,8 +1,16 @@
+import os
+import tempfile
+
+import opentimelineio as otio
 from attr import validate
 from magla.utils import otio_to_dict
 import pytest
+from sqlalchemy import event
 
+from magla.core.project import MaglaProject
 from magla.core.root import MaglaRoot
+from magla.core.settings_2d import MaglaSettings2D
+from magla.core.timeline import MaglaTimeline
 from magla.test import MaglaEntityTestFixture
 
 class TestRoot(MaglaEntityTestFixture):
@@ -22,4 +30,134 @@ class TestRoot(MaglaEntityTestFixture):
                 seed_data_dict = self.get_seed_data(magla_object.__schema__.__entity_name__, magla_object_list.index(magla_object))
                 if obj_dict != seed_data_dict:
                     obj_dict
-                assert obj_dict == seed_data_dict
\ No newline at end of file
+                assert obj_dict == seed_data_dict
+
+    def test_can_create_project_from_otio(self, dummy_root):
+        seed_otio = self.seed_otio()
+        project_path = os.path.join(tempfile.mkdtemp(), "otio_project")
+        settings = dict(self.get_seed_data("Project", 0)["settings"])
+        settings["shot_directory"] = "{shot.project.directory.path}/shots/{shot.name}"
+        project = dummy_root.create_project_from_otio(
+            os.path.join(os.environ["MAGLA_TEST_DIR"], "test_project.otio"),
+            project_path,
+            settings,
+            project_name="otio_project",
+            create_versions=False)
+        clips = list(MaglaTimeline.clip_placements(seed_otio))
+        shots = project.shots
+        assert [s.name for s in shots] == [clip.name for _, clip, _ in clips]
+        for shot, (track_index, clip, start_time) in zip(shots, clips):
+            assert shot.track_index == track_index
+            assert shot.start_frame_in_parent == start_time.value
+            assert os.path.isdir(shot.directory.path)
+        assert len(project.otio.tracks) == len(seed_otio.tracks)
+
+    def test_can_create_project_from_otio_with_versions(self, dummy_root):
+        settings = dict(self.get_seed_data("Project", 0)["settings"])
+        settings["shot_directory"] = "{shot.project.directory.path}/shots/{shot.name}"
+        commits = {}
+        projects = {}
+        for create_versions in (False, True):
+            def count_commit(session):
+                commits[create_versions] = commits.get(create_versions, 0) + 1
+            event.listen(dummy_root.orm.session, "after_commit", count_commit)
+            try:
+                projects[create_versions] = dummy_root.create_project_from_otio(
+                    self.seed_otio(),
+                    os.path.join(tempfile.mkdtemp(), "otio_project"),
+                    settings,
+                    project_name="versions_{0}".format(create_versions),
+                    create_versions=create_versions)
+            finally:
+                event.remove(dummy_root.orm.session, "after_commit", count_commit)
+        # the project, its shots and their versions are committed together
+        assert commits[True] == commits[False] == 1
+        for shot in projects[True].shots:
+            assert [version.num for version in shot.versions] == [0]
+            assert os.path.isdir(shot.version(0).directory.path)
+            assert shot.version(0).otio.rate == self.seed_otio().duration().rate
+            assert shot.version(0).otio.target_url_base == os.path.dirname(
+                settings["shot_version_bookmarks"]["png_representation"])
+
+    def test_create_project_from_otio_rolls_back_on_failure(self, dummy_root):
+        settings = dict(self.get_seed_data("Project", 0)["settings"])
+        settings["shot_directory"] = "{shot.project.directory.path}/shots/{shot.missing}"
+        with pytest.raises(AttributeError):
+            dummy_root.create_project_from_otio(
+                self.seed_otio(),
+                os.path.join(tempfile.mkdtemp(), "otio_project"),
+                settings,
+                project_name="half_imported_project")
+        assert "half_imported_project" not in [
+            project.name for project in dummy_root.all(MaglaProject)]
+
+    def test_can_version_up_with_copy_results(self, dummy_root):
+        settings = dict(self.get_seed_data("Project", 0)["settings"])
+        settings["shot_directory"] = "{shot.project.directory.path}/shots/{shot.name}"
+        # a bookmark within `shot_version_directory_tree`, so the destination exists
+        settings["shot_version_bookmarks"] = {
+            "png_representation": "_out/representations/png/{shot_version.full_name}.####.png"}
+        project = dummy_root.create_project_from_otio(
+            self.seed_otio(),
+            os.path.join(tempfile.mkdtemp(), "version_up_project"),
+            settings,
+            project_name="version_up_project")
+        dummy_root.create(MaglaSettings2D, {"project_id": project.id, "rate": 30})
+        shot = project.shots[0]
+        src = shot.version(0).directory.resolve_bookmark(
+            "png_representation", shot_version=shot.version(0))
+        open(src, "w").close()
+        new_shot_version = dummy_root.version_up(shot.id, 1)
+        results = new_shot_version.copy_results
+        assert new_shot_version.num == 1
+        assert [(os.path.basename(result["src"]), result["status"]) for result in results] == [
+            (os.path.basename(src), "copied")]
+        assert os.path.isfile(results[0]["dst"])
+
+    def test_can_apply_timeline_diff(self, dummy_root):
+        project_path = os.path.join(tempfile.mkdtemp(), "diff_project")
+        project = dummy_root.create_project_from_otio(
+            self.seed_otio(),
+            project_path,
+            self.get_seed_data("Project", 0)["settings"],
+            project_name="diff_project",
+            create_versions=False)
+        incoming = self.seed_otio()
+        clip = incoming.tracks[0][0]
+        incoming.tracks[0].remove(clip)
+        incoming.tracks.append(otio.schema.Track())
+        incoming.tracks[1].append(clip)
+        changes = project.timeline.diff(incoming)
+        dummy_root.apply_timeline_diff(project.id, changes)
+        assert [s.track_index for s in project.shots] == [2]
+
+    def test_can_apply_timeline_diff_at_project_rate(self, dummy_root):
+        project = dummy_root.create_project_from_otio(
+            self.seed_otio(),
+            os.path.join(tempfile.mkdtemp(), "diff_rate_project"),
+            self.get_seed_data("Project", 0)["settings"],
+            project_name="diff_rate_project",
+            create_versions=False)
+        dummy_root.create(MaglaSettings2D, {"project_id": project.id, "rate": 30})
+        # a new shot a second after the end of the edit, cut at 24 fps
+        incoming = self.seed_otio()
+        end_frame = int(incoming.tracks[0].duration().rescaled_to(30).value)
+        incoming.tracks[0].extend([
+            otio.schema.Gap(duration=otio.opentime.RationalTime(24, 24)),
+            otio.schema.Clip(name="added_shot", source_range=otio.opentime.TimeRange(
+                duration=otio.opentime.RationalTime(48, 24)))])
+        changes = project.timeline.diff(incoming)
+        commits = []
+
+        def count_commit(session):
+            commits.append(session)
+        event.listen(dummy_root.orm.session, "after_commit", count_commit)
+        try:
+            new_shot, = dummy_root.apply_timeline_diff(project.id, changes)
+        finally:
+            event.remove(dummy_root.orm.session, "after_commit", count_commit)
+        assert len(commits) == 1
+        assert (new_shot.name, new_shot.start_frame_in_parent) == ("added_shot", end_frame + 30)
+        assert [version.num for version in new_shot.versions] == [0]
+        assert new_shot.version(0).otio.rate == 30
+        assert os.path.isdir(new_shot.version(0).directory.path)